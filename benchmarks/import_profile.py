@@ -0,0 +1,130 @@
+"""
+Import time profile of the lambda entry points.
+
+Runs python -X importtime -c "import run" in each service folder with the repo root on PYTHONPATH for
+wafer_core, so each service is profiled in a fresh interpreter the same way a cold start imports it, and
+reports the total import time with the modules that take the most cumulative time. With --baseline the
+totals are compared against an earlier --output json and the script fails when a service got slower than
+--max-regression percent.
+
+Usage : python benchmarks/import_profile.py --top 10 --output import_profile.json
+        python benchmarks/import_profile.py --baseline import_profile.json --max-regression 20
+"""
+from argparse import ArgumentParser
+from json import dump, load
+from os import environ, pathsep
+from os.path import abspath, dirname, isfile, join
+from re import compile
+from subprocess import run
+from sys import executable, exit
+
+ROOT = dirname(dirname(abspath(__file__)))
+
+SERVICES = [
+    "raw_train_data_validation",
+    "db_operation_train",
+    "data_transform_train",
+    "preprocessing_train",
+    "clustering",
+    "model_training",
+    "load_prod_model",
+    "raw_pred_data_validation",
+    "db_operation_pred",
+    "data_transform_pred",
+    "preprocessing_pred",
+    "model_prediction",
+]
+
+IMPORT_TIME = compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def get_import_profile(service):
+    proc = run(
+        [executable, "-X", "importtime", "-c", "import run"],
+        cwd=join(ROOT, service),
+        env={
+            **environ,
+            "PYTHONPATH": pathsep.join([ROOT, environ.get("PYTHONPATH", "")]),
+        },
+        capture_output=True,
+        text=True,
+    )
+
+    modules = {}
+
+    for line in proc.stderr.splitlines():
+        match = IMPORT_TIME.match(line)
+
+        if match is not None:
+            modules[match.group(4)] = {
+                "self_ms": int(match.group(1)) / 1000,
+                "cumulative_ms": int(match.group(2)) / 1000,
+                "top_level": len(match.group(3)) == 1,
+            }
+
+    total_ms = sum(m["cumulative_ms"] for m in modules.values() if m["top_level"])
+
+    return {"ok": proc.returncode == 0, "total_ms": total_ms, "modules": modules}
+
+
+def main():
+    parser = ArgumentParser(description=__doc__)
+
+    parser.add_argument("--services", nargs="+", default=SERVICES)
+
+    parser.add_argument("--top", type=int, default=10)
+
+    parser.add_argument("--output")
+
+    parser.add_argument("--baseline")
+
+    parser.add_argument("--max-regression", type=float, default=20.0)
+
+    args = parser.parse_args()
+
+    baseline = {}
+
+    if args.baseline is not None and isfile(args.baseline):
+        with open(args.baseline) as f:
+            baseline = load(f)
+
+    profiles, regressions = {}, []
+
+    for service in args.services:
+        profile = get_import_profile(service)
+
+        profiles[service] = profile
+
+        status = "" if profile["ok"] else " (import failed)"
+
+        print(f"\n{service} : {profile['total_ms']:.1f} ms{status}")
+
+        top_modules = sorted(
+            profile["modules"].items(), key=lambda m: -m[1]["cumulative_ms"]
+        )[: args.top]
+
+        for name, m in top_modules:
+            print(f"    {name:<48}{m['cumulative_ms']:>10.1f} ms")
+
+        if service in baseline:
+            base_ms = baseline[service]["total_ms"]
+
+            change = (profile["total_ms"] - base_ms) / max(base_ms, 1e-9) * 100
+
+            print(f"    baseline {base_ms:.1f} ms, change {change:+.1f} %")
+
+            if change > args.max_regression:
+                regressions.append(service)
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            dump(profiles, f, indent=2)
+
+    if len(regressions) > 0:
+        print(f"\nImport time regressed for {', '.join(regressions)}")
+
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark of the compiled inference backend against the plain model predict.
+
+Trains a random forest and a xgboost classifier on synthetic wafer sensor data, compiles them with
+load_prod_model/model_compiler.py, checks that the compiled predictions of model_prediction/compiled_model.py
+are identical and reports rows/s for each batch size.
+
+Usage : python benchmarks/inference_backend.py --rows 10000 --batch-sizes 1 64 10000
+"""
+from argparse import ArgumentParser
+from os.path import abspath, dirname, join
+from sys import path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from numpy import array_equal
+from numpy.random import default_rng
+from pandas import DataFrame
+from sklearn.ensemble import RandomForestClassifier
+from xgboost import XGBClassifier
+
+ROOT = dirname(dirname(abspath(__file__)))
+
+path[:0] = [join(ROOT, "load_prod_model"), join(ROOT, "model_prediction")]
+
+from compiled_model import Compiled_Model
+from model_compiler import compile_model
+
+
+def get_wafer_data(rows, sensors, seed):
+    rng = default_rng(seed)
+
+    X = DataFrame(
+        rng.normal(size=(rows, sensors)),
+        columns=[f"Sensor-{i}" for i in range(1, sensors + 1)],
+    )
+
+    y = (X.iloc[:, 0] + X.iloc[:, 1] * X.iloc[:, 2] + rng.normal(size=rows) > 0).astype(
+        int
+    )
+
+    return X, y
+
+
+def get_rows_per_sec(func, X, min_time):
+    n_calls, start = 0, perf_counter()
+
+    while perf_counter() - start < min_time:
+        func(X)
+
+        n_calls += 1
+
+    return n_calls * len(X) / (perf_counter() - start)
+
+
+def main():
+    parser = ArgumentParser(description=__doc__)
+
+    parser.add_argument("--rows", type=int, default=10000)
+
+    parser.add_argument("--sensors", type=int, default=590)
+
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 64, 10000])
+
+    parser.add_argument("--min-time", type=float, default=1.0)
+
+    args = parser.parse_args()
+
+    X, y = get_wafer_data(2 * args.rows, args.sensors, seed=0)
+
+    X_train, y_train, X_test = X[: args.rows], y[: args.rows], X[args.rows :]
+
+    models = [
+        RandomForestClassifier(n_estimators=100, random_state=0),
+        XGBClassifier(n_estimators=100, max_depth=6),
+    ]
+
+    print(f"{'model':<24}{'batch':>8}{'predict rows/s':>18}{'compiled rows/s':>18}")
+
+    with TemporaryDirectory() as tmp_dir:
+        for model in models:
+            model.fit(X_train, y_train)
+
+            model_name = model.__class__.__name__
+
+            model_file = join(tmp_dir, model_name + ".joblib")
+
+            compile_model(model, model_file)
+
+            compiled = Compiled_Model(model_file)
+
+            if not array_equal(model.predict(X_test), compiled.predict(X_test)):
+                raise Exception(f"Compiled predictions of {model_name} are different")
+
+            for batch_size in args.batch_sizes:
+                X_batch = X_test[:batch_size]
+
+                predict = get_rows_per_sec(model.predict, X_batch, args.min_time)
+
+                compiled_predict = get_rows_per_sec(
+                    compiled.predict, X_batch, args.min_time
+                )
+
+                print(
+                    f"{model_name:<24}{len(X_batch):>8}{predict:>18.0f}{compiled_predict:>18.0f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,394 @@
+"""
+End to end benchmark of the train and prediction pipelines with local stand-ins.
+
+Generates a synthetic wafer dataset, seeds the schema, regex and raw batch files in S3 and runs the twelve
+stages from raw_train_data_validation through model_prediction in one process, each stage through its own
+run.py entry point from its own service folder, the same way the step functions invoke them. S3 is mocked
+with moto (or --s3-endpoint-url points to MinIO), MongoDB with mongomock (or --mongodb-url points to a
+local mongod) and MLflow tracks to a file store in the work folder.
+
+For every stage the wall time, cpu time, peak and added rss of the process are recorded along with the
+method metrics of the run summary the stage uploads with its logs. With --baseline the stage times are
+compared against an earlier --output json and the script fails when a stage got slower than
+--max-regression percent. With --fused the stages hand dataframes over in memory through the frame store of
+wafer_core/pipeline.py and only the --checkpoint files are written to S3.
+
+Usage : python benchmarks/pipeline.py --wafers 500 --sensors 590 --files 4 --null-ratio 0.05
+        python benchmarks/pipeline.py --stages raw_train_data_validation db_operation_train
+        python benchmarks/pipeline.py --set s3_batch.max_workers=4 --output pipeline.json
+        python benchmarks/pipeline.py --baseline pipeline.json --max-regression 20
+        python benchmarks/pipeline.py --fused --checkpoint feature_store/ --checkpoint io_files/
+"""
+from argparse import ArgumentParser
+from contextlib import ExitStack
+from json import dump, dumps, load, loads
+from os import environ, sysconf
+from os.path import abspath, dirname, isfile, join
+from sys import exit, path
+from tempfile import TemporaryDirectory
+from threading import Event, Thread
+from time import perf_counter, process_time
+from traceback import format_exc
+
+from boto3 import client
+from numpy.random import default_rng
+from pandas import DataFrame
+from yaml import safe_load
+
+ROOT = dirname(dirname(abspath(__file__)))
+
+path.insert(0, ROOT)
+
+from wafer_core.frame_store import disable_frames, enable_frames
+from wafer_core.pipeline import DAGS, DEFAULT_CHECKPOINTS, get_checkpoints, invoke_stage
+
+STAGES = DAGS["train"] + DAGS["pred"]
+
+SMALL_GRID = {
+    "PARAMS__TRAIN_MODEL": dumps(
+        {
+            "RandomForestClassifier": {"n_estimators": [10], "max_depth": [3]},
+            "XGBClassifier": {"n_estimators": [10], "max_depth": [3]},
+        }
+    ),
+    "PARAMS__MODEL_UTILS__CV": "2",
+    "PARAMS__MODEL_UTILS__VERBOSE": "0",
+}
+
+BENCHMARK_PARAMS = {"PARAMS__METRICS__EMF": "False"}
+
+REGEX = "['wafer']+['\\_'']+[\\d_]+[\\d]+\\.csv"
+
+
+def get_params(stage):
+    with open(join(ROOT, stage, "params.yaml")) as f:
+        return safe_load(f)
+
+
+def get_schema(sensors, train):
+    cols = {"Wafer": "varchar"}
+
+    cols.update({f"Sensor-{i}": "float" for i in range(1, sensors + 1)})
+
+    if train is True:
+        cols["Good/Bad"] = "Integer"
+
+    return {
+        "SampleFileName": "wafer_31052010_101010.csv",
+        "LengthOfDateStampInFile": 8,
+        "LengthOfTimeStampInFile": 6,
+        "NumberofColumns": len(cols),
+        "ColName": cols,
+    }
+
+
+def get_wafer_batch(wafers, sensors, null_ratio, start, rng, train):
+    X = rng.normal(size=(wafers, sensors))
+
+    y = X[:, 0] + X[:, 1] * X[:, 2] + rng.normal(size=wafers) > 0
+
+    X[rng.random(size=X.shape) < null_ratio] = float("nan")
+
+    df = DataFrame(X, columns=[f"Sensor-{i}" for i in range(1, sensors + 1)])
+
+    df.insert(0, "Wafer", [f"Wafer-{start + i}" for i in range(wafers)])
+
+    if train is True:
+        df["Good/Bad"] = y.astype(int) * 2 - 1
+
+    return df
+
+
+def seed_data(s3, args):
+    raw_train, raw_pred = get_params(STAGES[0]), get_params(STAGES[7])
+
+    buckets = {
+        bucket for stage in STAGES for bucket in get_params(stage)["s3_bucket"].values()
+    }
+
+    for bucket in sorted(buckets):
+        try:
+            s3.create_bucket(Bucket=bucket)
+
+        except s3.exceptions.BucketAlreadyOwnedByYou:
+            pass
+
+    io_files = raw_train["s3_bucket"]["io_files"]
+
+    s3.put_object(Bucket=io_files, Key=raw_train["files"]["regex"], Body=REGEX)
+
+    for params, train in [(raw_train, True), (raw_pred, False)]:
+        schema_key = "train_schema" if train is True else "pred_schema"
+
+        s3.put_object(
+            Bucket=io_files,
+            Key=params["files"][schema_key],
+            Body=dumps(get_schema(args.sensors, train)),
+        )
+
+    rng = default_rng(args.seed)
+
+    wafers_per_file = max(args.wafers // args.files, 1)
+
+    batches = [
+        (
+            raw_train["s3_bucket"]["raw_train_data"],
+            raw_train["dir"]["raw_train_batch_data"],
+            True,
+        ),
+        (
+            raw_pred["s3_bucket"]["raw_pred_data"],
+            raw_pred["dir"]["raw_pred_batch_data"],
+            False,
+        ),
+    ]
+
+    for bucket, folder, train in batches:
+        for i in range(args.files):
+            df = get_wafer_batch(
+                wafers_per_file,
+                args.sensors,
+                args.null_ratio,
+                i * wafers_per_file,
+                rng,
+                train,
+            )
+
+            fname = f"{folder}/wafer_{1 + i % 28:02d}012020_{i // 28:06d}.csv"
+
+            s3.put_object(Bucket=bucket, Key=fname, Body=df.to_csv(index=False))
+
+
+class RSS_Sampler(Thread):
+    def __init__(self, interval):
+        super().__init__(daemon=True)
+
+        self.interval = interval
+
+        self.stopped = Event()
+
+        self.peak = self.start_rss = get_rss_mb()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.peak = max(self.peak, get_rss_mb())
+
+    def stop(self):
+        self.stopped.set()
+
+        self.join()
+
+        self.peak = max(self.peak, get_rss_mb())
+
+        return self.peak
+
+
+def get_rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * sysconf("SC_PAGE_SIZE") / 1024 ** 2
+
+
+def get_stage_summary(s3, stage):
+    params = get_params(stage)
+
+    key = "/tmp/" + params["dir"]["log"] + "/" + params["metrics"]["summary_file"]
+
+    try:
+        obj = s3.get_object(Bucket=params["s3_bucket"]["logs"], Key=key)
+
+        return loads(obj["Body"].read())
+
+    except Exception:
+        return None
+
+
+def run_stage(stage, interval):
+    sampler = RSS_Sampler(interval)
+
+    sampler.start()
+
+    start_wall, start_cpu, error = perf_counter(), process_time(), None
+
+    try:
+        invoke_stage(stage)
+
+    except BaseException:
+        error = format_exc(limit=-3)
+
+    finally:
+        wall_s, cpu_s = perf_counter() - start_wall, process_time() - start_cpu
+
+        peak_rss_mb = sampler.stop()
+
+    return {
+        "ok": error is None,
+        "error": error,
+        "wall_s": wall_s,
+        "cpu_s": cpu_s,
+        "peak_rss_mb": peak_rss_mb,
+        "rss_added_mb": peak_rss_mb - sampler.start_rss,
+    }
+
+
+def get_overrides(args):
+    overrides = dict(BENCHMARK_PARAMS)
+
+    if args.grid == "small":
+        overrides.update(SMALL_GRID)
+
+    for item in args.set:
+        key, value = item.split("=", 1)
+
+        overrides["PARAMS__" + key.upper().replace(".", "__")] = value
+
+    return overrides
+
+
+def main():
+    parser = ArgumentParser(description=__doc__)
+
+    parser.add_argument("--wafers", type=int, default=500)
+
+    parser.add_argument("--sensors", type=int, default=590)
+
+    parser.add_argument("--files", type=int, default=4)
+
+    parser.add_argument("--null-ratio", type=float, default=0.05)
+
+    parser.add_argument("--seed", type=int, default=0)
+
+    parser.add_argument("--stages", nargs="+", default=STAGES)
+
+    parser.add_argument("--grid", choices=["small", "full"], default="small")
+
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE")
+
+    parser.add_argument("--fused", action="store_true")
+
+    parser.add_argument("--checkpoint", action="append", metavar="BUCKET/PREFIX")
+
+    parser.add_argument("--s3-endpoint-url")
+
+    parser.add_argument("--mongodb-url")
+
+    parser.add_argument("--sample-ms", type=float, default=10.0)
+
+    parser.add_argument("--stop-on-error", action="store_true")
+
+    parser.add_argument("--top", type=int, default=5)
+
+    parser.add_argument("--output")
+
+    parser.add_argument("--baseline")
+
+    parser.add_argument("--max-regression", type=float, default=20.0)
+
+    args = parser.parse_args()
+
+    baseline = {}
+
+    if args.baseline is not None and isfile(args.baseline):
+        with open(args.baseline) as f:
+            baseline = load(f)["stages"]
+
+    with TemporaryDirectory() as work_dir, ExitStack() as stack:
+        environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+        environ["MLFLOW_TRACKING_URI"] = "file://" + join(work_dir, "mlruns")
+
+        environ.update(get_overrides(args))
+
+        if args.s3_endpoint_url is not None:
+            environ["AWS_ENDPOINT_URL_S3"] = args.s3_endpoint_url
+
+        else:
+            from moto import mock_aws
+
+            stack.enter_context(mock_aws())
+
+        if args.mongodb_url is not None:
+            environ["MONGODB_URL"] = args.mongodb_url
+
+        else:
+            from mongomock import patch
+
+            environ["MONGODB_URL"] = "mongodb://localhost:27017"
+
+            stack.enter_context(patch(servers=(("localhost", 27017),)))
+
+        s3 = client("s3")
+
+        seed_data(s3, args)
+
+        if args.fused is True:
+            checkpoints = args.checkpoint or DEFAULT_CHECKPOINTS
+
+            enable_frames(get_checkpoints(checkpoints))
+
+            stack.callback(disable_frames)
+
+        print(
+            f"{args.files} files of {args.wafers // args.files} wafers, {args.sensors} sensors, "
+            + f"{args.null_ratio:.0%} nulls\n"
+        )
+
+        print(
+            f"{'stage':<28}{'wall s':>10}{'cpu s':>10}{'peak MB':>10}{'added MB':>10}"
+        )
+
+        stages, regressions = {}, []
+
+        for stage in args.stages:
+            result = run_stage(stage, args.sample_ms / 1000)
+
+            result["summary"] = get_stage_summary(s3, stage)
+
+            stages[stage] = result
+
+            status = "" if result["ok"] else "  (failed)"
+
+            print(
+                f"{stage:<28}{result['wall_s']:>10.2f}{result['cpu_s']:>10.2f}"
+                + f"{result['peak_rss_mb']:>10.0f}{result['rss_added_mb']:>10.0f}{status}"
+            )
+
+            if result["summary"] is not None:
+                methods = list(result["summary"]["methods"].items())[: args.top]
+
+                for name, m in methods:
+                    print(f"    {name:<52}{m['wall_ms']:>10.1f} ms")
+
+            if result["ok"] is False:
+                print("    " + result["error"].strip().splitlines()[-1])
+
+            if stage in baseline:
+                base_s = baseline[stage]["wall_s"]
+
+                change = (result["wall_s"] - base_s) / max(base_s, 1e-9) * 100
+
+                print(f"    baseline {base_s:.2f} s, change {change:+.1f} %")
+
+                if change > args.max_regression:
+                    regressions.append(stage)
+
+            if result["ok"] is False and args.stop_on_error is True:
+                break
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            dump({"args": vars(args), "stages": stages}, f, indent=2)
+
+    failed = [stage for stage, result in stages.items() if result["ok"] is False]
+
+    if len(failed) > 0:
+        print(f"\nStages failed : {', '.join(failed)}")
+
+    if len(regressions) > 0:
+        print(f"\nStage time regressed for {', '.join(regressions)}")
+
+    if len(failed) > 0 or len(regressions) > 0:
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,9 @@
 from json import dumps
 
 from clustering import KMeans_Clustering
-from utils.logger import App_Logger
-from utils.main_utils import Main_Utils
+from utils.bootstrap import get_log_writer, get_utils
 from utils.read_params import get_log_dic
+from wafer_core.stage_cache import Stage_Cache
 
 
 class Run:
@@ -15,9 +15,9 @@ class Run:
     """
 
     def __init__(self):
-        self.utils = Main_Utils()
+        self.utils = get_utils()
 
-        self.log_writer = App_Logger()
+        self.log_writer = get_log_writer()
 
         self.kmeans_op = KMeans_Clustering("clustering")
 
@@ -92,9 +92,14 @@ class Run:
 
 def lambda_handler(event, context):
     try:
-        run = Run()
+        cache = Stage_Cache(event)
 
-        run.run_clustering()
+        if cache.is_cached() is False:
+            run = Run()
+
+            run.run_clustering()
+
+            cache.record()
 
         return {"statusCode": 200, "body": dumps("Clustering Function executed")}
 
@@ -102,6 +107,6 @@ def lambda_handler(event, context):
         raise e
 
     finally:
-        utils = Main_Utils()
+        utils = get_utils()
 
         utils.upload_logs()
@@ -1,11 +1,10 @@
-from datetime import datetime
 from shutil import rmtree
 
-from matplotlib.pyplot import plot, savefig, title, xlabel, ylabel
-
 from s3_operations import S3_Operation
 from utils.logger import App_Logger
 from utils.read_params import get_log_dic, read_params
+from wafer_core.bootstrap import get_current_date
+from wafer_core.metrics import write_run_summary
 
 
 class Main_Utils:
@@ -27,7 +26,9 @@ class Main_Utils:
 
         self.log_dir = self.config["dir"]["log"]
 
-        self.current_date = f"{datetime.now().strftime('%Y-%m-%d')}"
+    @property
+    def current_date(self):
+        return get_current_date()
 
     def upload_logs(self):
         """
@@ -49,6 +50,8 @@ class Main_Utils:
         try:
             log_folder = "/tmp" + "/" + self.log_dir
 
+            write_run_summary(log_folder)
+
             self.s3.upload_folder(log_folder, "logs", log_dic["log_file"])
 
             self.log_writer.log(f"Uploaded logs to s3 bucket", **log_dic)
@@ -131,7 +134,6 @@ class Main_Utils:
                 cluster_fname,
                 "feature_store",
                 log_dic["log_file"],
-                index=True,
             )
 
             self.log_writer.log(
@@ -198,6 +200,8 @@ class Main_Utils:
         self.log_writer.start_log("start", **log_dic)
 
         try:
+            from matplotlib.pyplot import plot, savefig, title, xlabel, ylabel
+
             plot(range(1, max_clusters), wcss)
 
             title("The Elbow Method")
@@ -214,9 +218,7 @@ class Main_Utils:
                 "Saved elbow plot based on max_clusters and wcss", **log_dic
             )
 
-            self.s3.upload_file(
-                fname, fname, "io_files", log_dic["log_file"], index=True
-            )
+            self.s3.upload_file(fname, fname, "io_files", log_dic["log_file"])
 
             self.log_writer.log("Uploaded elbow plot to s3 bucket", **log_dic)
 
@@ -20,10 +20,11 @@ class Data_Transform_Pred:
 
         self.col = self.config["col"]
 
-    def rename_column(self, from_col, to_col):
+    def rename_column(self, from_col, to_col, fnames=None):
         """
         Method Name :   rename_column
-        Description :   This method renames the column name from from_col to_col 
+        Description :   This method renames the column name from from_col to_col, only the given files
+                        of the good data folder when fnames is set
         
         Output      :   A dataframe is returned with column name renamed 
         On Failure  :   Write an exception log and then raise an exception
@@ -42,7 +43,7 @@ class Data_Transform_Pred:
 
         try:
             lst = self.s3.read_csv_from_folder(
-                "pred_good_data", "pred_data", log_dic["log_file"]
+                "pred_good_data", "pred_data", log_dic["log_file"], fnames=fnames
             )
 
             for _, f in enumerate(lst):
@@ -67,11 +68,12 @@ class Data_Transform_Pred:
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
-    def replace_missing_with_null(self):
+    def replace_missing_with_null(self, fnames=None):
         """
         Method Name :   replace_missing_with_null
         Description :   This method replaces the missing values with null values and uploades the null
-                        values csv file to s3 bucket
+                        values csv file to s3 bucket, only the given files of the good data folder
+                        when fnames is set
         
         Output      :   The column name is renamed 
         On Failure  :   Write an exception log and then raise an exception
@@ -90,7 +92,7 @@ class Data_Transform_Pred:
 
         try:
             lst = self.s3.read_csv_from_folder(
-                "pred_good_data", "pred_data", log_dic["log_file"]
+                "pred_good_data", "pred_data", log_dic["log_file"], fnames=fnames
             )
 
             for _, f in enumerate(lst):
@@ -102,7 +104,11 @@ class Data_Transform_Pred:
 
                 df.fillna("NULL", inplace=True)
 
-                df["Wafer"] = df["Wafer"].str[6:]
+                ## good data files of earlier runs are already transformed, the prefix is removed only once
+
+                df["Wafer"] = (
+                    df["Wafer"].astype(str).str.replace(r"^Wafer-", "", regex=True)
+                )
 
                 self.log_writer.log(
                     f"Replaced missing values with null for the file {file}", **log_dic
@@ -116,3 +122,42 @@ class Data_Transform_Pred:
 
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
+
+    def get_good_files(self):
+        """
+        Method Name :   get_good_files
+        Description :   This method gets the csv files of the good data folder, which are the keys the shards of
+                        the data transformation are planned on
+
+        Output      :   A sorted list of good data files is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.get_good_files.__name__,
+            __file__,
+            "data_transform",
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            files = self.s3.get_files_from_folder(
+                self.config["dir"]["pred_good_data"], "pred_data", log_dic["log_file"]
+            )
+
+            good_files = sorted(f for f in files if f.endswith(".csv"))
+
+            self.log_writer.log(
+                f"Got {len(good_files)} good prediction data files", **log_dic
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return good_files
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
@@ -1,9 +1,9 @@
 from json import dumps
 
 from data_transformation_pred import Data_Transform_Pred
-from utils.logger import App_Logger
-from utils.main_utils import Main_Utils
+from utils.bootstrap import get_log_writer, get_utils
 from utils.read_params import get_log_dic
+from wafer_core.shards import get_mode, run_shard_mode
 
 
 class Run:
@@ -15,18 +15,18 @@ class Run:
     """
 
     def __init__(self):
-        self.log_writer = App_Logger()
+        self.log_writer = get_log_writer()
 
         self.data_transform = Data_Transform_Pred()
 
-    def pred_data_transform(self):
+    def pred_data_transform(self, fnames=None):
         """
         Method Name :   pred_data_transform
         Description :   This method performs the prediction data transformation and artifacts are stored in 
                         s3 buckets
         
         Output      :   The data transformation is done on the prediction data and artifacts are stored in 
-                        s3 buckets
+                        s3 buckets, only the good files in fnames are transformed when fnames is set
         On Failure  :   Write an exception log and then raise an exception
         
         Version     :   1.2
@@ -42,33 +42,83 @@ class Run:
         try:
             self.log_writer.log("Starting Data Transformation", **log_dic)
 
-            self.data_transform.rename_column("unnamed", "wafer")
+            self.data_transform.rename_column("unnamed", "wafer", fnames=fnames)
 
-            self.data_transform.rename_column("good_bad", "output")
+            self.data_transform.rename_column("good_bad", "output", fnames=fnames)
 
-            self.data_transform.replace_missing_with_null()
+            self.data_transform.replace_missing_with_null(fnames=fnames)
 
             self.log_writer.log("Data Transformation completed !!", **log_dic)
 
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
+    def plan_shards(self):
+        """
+        Method Name :   plan_shards
+        Description :   This method gets the keys the prediction data transform is sharded on, which are the good
+                        prediction data files
+        
+        Output      :   A sorted list of good prediction data files is returned
+        On Failure  :   Write an exception log and then raise an exception
+        
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        return self.data_transform.get_good_files()
+
+    def run_shard(self, keys):
+        """
+        Method Name :   run_shard
+        Description :   This method transforms the good prediction data files of one shard
+        
+        Output      :   The data transformation is done on the files of the shard
+        On Failure  :   Write an exception log and then raise an exception
+        
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        self.pred_data_transform(fnames=keys)
+
+    def reduce_shards(self):
+        """
+        Method Name :   reduce_shards
+        Description :   This method finishes the sharded prediction data transform, every file is transformed in
+                        place by its shard, so there is nothing left to do
+        
+        Output      :   None
+        On Failure  :   Write an exception log and then raise an exception
+        
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        pass
+
 
 def lambda_handler(event, context):
     try:
-        run = Run()
+        mode = get_mode(event)
+
+        result = {}
+
+        if mode == "batch":
+            run = Run()
+
+            run.pred_data_transform()
 
-        run.pred_data_transform()
+        else:
+            result = run_shard_mode(Run(), mode, event)
 
         return {
             "statusCode": 200,
             "body": dumps("Data Transform Prediction Function executed"),
+            **result,
         }
 
     except Exception as e:
         raise e
 
     finally:
-        utils = Main_Utils()
+        utils = get_utils()
 
         utils.upload_logs()
@@ -2,7 +2,7 @@ from mongo_db_operations import MongoDB_Operation
 from s3_operations import S3_Operation
 from utils.logger import App_Logger
 from utils.main_utils import Main_Utils
-from utils.read_params import get_log_dic
+from utils.read_params import get_log_dic, read_params
 
 
 class DB_Operation_Train:
@@ -14,6 +14,8 @@ class DB_Operation_Train:
     """
 
     def __init__(self):
+        self.config = read_params()
+
         self.s3 = S3_Operation()
 
         self.mongo = MongoDB_Operation()
@@ -22,10 +24,14 @@ class DB_Operation_Train:
 
         self.utils = Main_Utils()
 
-    def insert_good_data_as_record(self, good_data_db_name, good_data_collection_name):
+    def insert_good_data_as_record(
+        self, good_data_db_name, good_data_collection_name, fnames=None
+    ):
         """
         Method Name :   insert_good_data_as_record
-        Description :   This method inserts the good data in MongoDB as collection
+        Description :   This method inserts the good data in MongoDB as collection, only the good files in
+                        fnames are inserted when fnames is set. The records are tagged with their file, so that
+                        inserting a file again, like a retried shard does, replaces its records
 
         Output      :   A MongoDB collection is created with good data present in it
         On Failure  :   Write an exception log and then raise an exception
@@ -44,7 +50,7 @@ class DB_Operation_Train:
 
         try:
             lst = self.s3.read_csv_from_folder(
-                "train_good_data", "train_data", log_dic["log_file"]
+                "train_good_data", "train_data", log_dic["log_file"], fnames=fnames
             )
 
             for _, f in enumerate(lst):
@@ -55,6 +61,7 @@ class DB_Operation_Train:
                     good_data_db_name,
                     good_data_collection_name,
                     log_dic["log_file"],
+                    source=f[1],
                 )
 
                 self.log_writer.log(
@@ -97,12 +104,7 @@ class DB_Operation_Train:
                 "train_export", log_dic["log_file"]
             )
             self.s3.upload_df_as_csv(
-                df,
-                export_fname,
-                export_fname,
-                "feature_store",
-                log_dic["log_file"],
-                fidx=True,
+                df, export_fname, export_fname, "feature_store", log_dic["log_file"]
             )
 
             self.log_writer.log("Exported dataframe to csv file", **log_dic)
@@ -111,3 +113,42 @@ class DB_Operation_Train:
 
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
+
+    def get_good_files(self):
+        """
+        Method Name :   get_good_files
+        Description :   This method gets the csv files of the good data folder, which are the keys the shards of
+                        the database insert are planned on
+
+        Output      :   A sorted list of good data files is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.get_good_files.__name__,
+            __file__,
+            "db_insert",
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            files = self.s3.get_files_from_folder(
+                self.config["dir"]["train_good_data"], "train_data", log_dic["log_file"]
+            )
+
+            good_files = sorted(f for f in files if f.endswith(".csv"))
+
+            self.log_writer.log(
+                f"Got {len(good_files)} good training data files", **log_dic
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return good_files
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
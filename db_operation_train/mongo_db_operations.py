@@ -24,6 +24,8 @@ class MongoDB_Operation:
 
         self.mongo_config = self.config["mongodb"]
 
+        self.source_key = self.mongo_config["source_key"]
+
         self.client = MongoClient(self.DB_URL)
 
         self.utils = Main_Utils()
@@ -90,8 +92,9 @@ class MongoDB_Operation:
 
             df = DataFrame(list(collection.find()))
 
-            if "_id" in df.columns.to_list():
-                df = df.drop(columns=["_id"], axis=1)
+            df = df.drop(
+                columns=[c for c in ["_id", self.source_key] if c in df.columns]
+            )
 
             self.log_writer.log("Converted collection to dataframe", **log_dic)
 
@@ -103,11 +106,13 @@ class MongoDB_Operation:
             self.log_writer.exception_log(e, **log_dic)
 
     def insert_dataframe_as_record(
-        self, data_frame, db_name, collection_name, log_file
+        self, data_frame, db_name, collection_name, log_file, source=None
     ):
         """
         Method Name :   insert_dataframe_as_record
-        Description :   This method inserts the dataframe as record in database collection
+        Description :   This method inserts the dataframe as record in database collection, when source is set
+                        the records are tagged with it and the records of an earlier insert of the same source
+                        are deleted first, so that a retried insert does not duplicate the records
 
         Output      :   The dataframe is inserted in database collection
         On Failure  :   Write an exception log and then raise an exception
@@ -125,7 +130,7 @@ class MongoDB_Operation:
         self.log_writer.start_log("start", **log_dic)
 
         try:
-            records = loads(data_frame.T.to_json()).values()
+            records = list(loads(data_frame.T.to_json()).values())
 
             self.log_writer.log(f"Converted dataframe to json records", **log_dic)
 
@@ -137,6 +142,17 @@ class MongoDB_Operation:
 
             collection = database.get_collection(collection_name)
 
+            if source is not None:
+                for record in records:
+                    record[self.source_key] = source
+
+                res = collection.delete_many({self.source_key: source})
+
+                self.log_writer.log(
+                    f"Deleted {res.deleted_count} records of {source} from MongoDB",
+                    **log_dic,
+                )
+
             self.log_writer.log("Inserting records to MongoDB", **log_dic)
 
             collection.insert_many(records)
@@ -1,9 +1,10 @@
 from json import dumps
 
 from data_type_valid_train import DB_Operation_Train
-from utils.logger import App_Logger
-from utils.main_utils import Main_Utils
+from utils.bootstrap import get_log_writer, get_utils
 from utils.read_params import get_log_dic
+from wafer_core.shards import get_mode, run_cached_shard_mode
+from wafer_core.stage_cache import Stage_Cache
 
 
 class Run:
@@ -15,7 +16,7 @@ class Run:
     """
 
     def __init__(self):
-        self.log_writer = App_Logger()
+        self.log_writer = get_log_writer()
 
         self.db_operation = DB_Operation_Train()
 
@@ -56,22 +57,79 @@ class Run:
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
+    def plan_shards(self):
+        """
+        Method Name :   plan_shards
+        Description :   This method gets the keys the training database insert is sharded on, which are the good
+                        training data files
+
+        Output      :   A sorted list of good training data files is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        return self.db_operation.get_good_files()
+
+    def run_shard(self, keys):
+        """
+        Method Name :   run_shard
+        Description :   This method inserts the good training data files of one shard in MongoDB
+
+        Output      :   The files of the shard are inserted in the MongoDB collection
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        self.db_operation.insert_good_data_as_record(
+            "db_name", "collection_name", fnames=keys
+        )
+
+    def reduce_shards(self):
+        """
+        Method Name :   reduce_shards
+        Description :   This method exports the MongoDB collection the shards inserted the training data in as
+                        csv file, once all the shards are inserted
+
+        Output      :   The training data is exported as csv file and uploaded to s3 bucket
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        self.db_operation.export_collection_to_csv("db_name", "collection_name")
+
 
 def lambda_handler(event, context):
     try:
-        run = Run()
+        mode = get_mode(event)
+
+        result = {}
+
+        if mode == "batch":
+            cache = Stage_Cache(event)
+
+            if cache.is_cached() is False:
+                run = Run()
+
+                run.train_data_type_valid()
+
+                cache.record()
 
-        run.train_data_type_valid()
+        else:
+            result = run_cached_shard_mode(Run, mode, event)
 
         return {
             "statusCode": 200,
             "body": dumps("Train Database Operation Function executed"),
+            **result,
         }
 
     except Exception as e:
         raise e
 
     finally:
-        utils = Main_Utils()
+        utils = get_utils()
 
         utils.upload_logs()
@@ -0,0 +1,51 @@
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def get_log_writer():
+    """
+    Method Name :   get_log_writer
+    Description :   This method gets the app logger which is created once per container
+
+    Output      :   The app logger is returned
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = get_log_writer.__name__
+
+    try:
+        from utils.logger import App_Logger
+
+        return App_Logger()
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
+
+
+@lru_cache(maxsize=None)
+def get_utils():
+    """
+    Method Name :   get_utils
+    Description :   This method gets the main utils which is created once per container
+
+    Output      :   The main utils is returned
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = get_utils.__name__
+
+    try:
+        from utils.main_utils import Main_Utils
+
+        return Main_Utils()
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
@@ -1,9 +1,10 @@
-from datetime import datetime
 from shutil import rmtree
 
 from s3_operations import S3_Operation
 from utils.logger import App_Logger
 from utils.read_params import get_log_dic, read_params
+from wafer_core.bootstrap import get_current_date
+from wafer_core.metrics import write_run_summary
 
 
 class Main_Utils:
@@ -21,14 +22,16 @@ class Main_Utils:
 
         self.config = read_params()
 
-        self.current_date = f"{datetime.now().strftime('%Y-%m-%d')}"
-
         self.log_dir = self.config["dir"]["log"]
 
         self.files = self.config["files"]
 
         self.mongodb_config = self.config["mongodb"]
 
+    @property
+    def current_date(self):
+        return get_current_date()
+
     def upload_logs(self):
         """
         Method Name :   upload_logs
@@ -49,7 +52,9 @@ class Main_Utils:
         try:
             log_folder = "/tmp" + "/" + self.log_dir
 
-            self.s3.upload_folder(self.log_dir, "logs", log_dic["log_file"])
+            write_run_summary(log_folder)
+
+            self.s3.upload_folder(log_folder, "logs", log_dic["log_file"])
 
             self.log_writer.log(f"Uploaded logs to logs bucket", **log_dic)
 
@@ -1,12 +1,13 @@
+from concurrent.futures import ThreadPoolExecutor
 from os import environ
 
-from mlflow import get_experiment_by_name, search_runs, set_tracking_uri
-from mlflow.tracking import MlflowClient
-
 from s3_operations import S3_Operation
+from utils.bootstrap import get_mlflow_client
 from utils.logger import App_Logger
 from utils.main_utils import Main_Utils
 from utils.read_params import get_log_dic, read_params
+from wafer_core.bootstrap import get_current_date
+from wafer_core.metrics import bind_spans
 
 
 class MLFlow_Operation:
@@ -32,7 +33,11 @@ class MLFlow_Operation:
 
         self.remote_server_uri = environ["MLFLOW_TRACKING_URI"]
 
-        self.client = MlflowClient(self.remote_server_uri)
+        self.client = get_mlflow_client(self.remote_server_uri)
+
+    @property
+    def current_date(self):
+        return get_current_date()
 
     def set_mlflow_tracking_uri(self):
         """
@@ -55,6 +60,8 @@ class MLFlow_Operation:
         self.log_writer.start_log("start", **log_dic)
 
         try:
+            from mlflow import set_tracking_uri
+
             set_tracking_uri(self.remote_server_uri)
 
             self.log_writer.log("Set mlflow tracking uri", **log_dic)
@@ -86,6 +93,8 @@ class MLFlow_Operation:
         self.log_writer.start_log("start", **log_dic)
 
         try:
+            from mlflow import get_experiment_by_name
+
             exp = get_experiment_by_name(self.mlflow_config[exp_name])
 
             self.log_writer.log(f"Got {exp_name} experiment from mlflow", **log_dic)
@@ -97,20 +106,23 @@ class MLFlow_Operation:
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
-    def get_runs_from_mlflow(self, exp_id):
+    def get_best_cluster_run(self, exp_id, idx, train_id=None):
         """
-        Method Name :   get_runs_from_mlflow
-        Description :   This method gets the runs from the mlflow server based on the experiment id
-        
-        Output      :   A pandas series object consisting of runs based on the experiment id
+        Method Name :   get_best_cluster_run
+        Description :   This method searches the mlflow server for the run of the cluster in the training run,
+                        or for the latest run of the cluster by train_date when the training run is not known,
+                        the runs are filtered and ordered on the server so only a single run is returned however
+                        many runs the experiment has
+
+        Output      :   The latest run of the cluster with the best score is returned
         On Failure  :   Write an exception log and then raise an exception
-        
+
         Version     :   1.2
         Revisions   :   moved setup to cloud
         """
         log_dic = get_log_dic(
             self.__class__.__name__,
-            self.get_runs_from_mlflow.__name__,
+            self.get_best_cluster_run.__name__,
             __file__,
             self.log_file,
         )
@@ -118,16 +130,33 @@ class MLFlow_Operation:
         self.log_writer.start_log("start", **log_dic)
 
         try:
-            runs = search_runs(exp_id)
+            filter_string = f"tags.cluster = '{idx}'"
+
+            if train_id is not None:
+                filter_string += f" and tags.train_id = '{train_id}'"
+
+            runs = self.client.search_runs(
+                [exp_id],
+                filter_string=filter_string,
+                order_by=[
+                    "tags.train_date DESC",
+                    "attributes.start_time DESC",
+                    "metrics.best_score DESC",
+                ],
+                max_results=1,
+            )
+
+            if len(runs) == 0:
+                raise Exception(f"No run found in mlflow for {filter_string}")
 
             self.log_writer.log(
-                f"Completed searching for runs in mlflow with experiment ids as {exp_id}",
+                f"Got {runs[0].info.run_id} run in mlflow for {filter_string}",
                 **log_dic,
             )
 
             self.log_writer.start_log("exit", **log_dic)
 
-            return runs
+            return runs[0]
 
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
@@ -199,15 +228,17 @@ class MLFlow_Operation:
             self.log_writer.exception_log(e, **log_dic)
 
     def transition_mlflow_model(
-        self, model_version, stage, model_name, from_bucket, to_bucket
+        self, model_version, stage, model_name, model_source, model_score, bucket
     ):
         """
         Method Name :   transition_mlflow_model
-        Description :   This method transitions mlflow model from one stage to other stage, and does the 
-                        same in s3 bucket
+        Description :   This method transitions mlflow model from one stage to other stage, production models
+                        are not copied, their manifest entry points to the s3 object the model version was
+                        registered with, pinned by its etag and version id, so the promoted file is exactly the
+                        registered one
         
-        Output      :   A mlflow model is transitioned from one stage to another, and same is reflected in 
-                        s3 bucket
+        Output      :   A mlflow model is transitioned from one stage to another, and for production models the
+                        manifest entry is returned
         On Failure  :   Write an exception log and then raise an exception
         
         Version     :   1.2
@@ -225,27 +256,19 @@ class MLFlow_Operation:
         try:
             current_version = model_version
 
+            entry = None
+
             self.log_writer.log(
                 f"Got {current_version} as the current model version", **log_dic
             )
 
-            train_model_file = self.utils.get_model_file(
-                "trained_model", model_name, log_dic["log_file"]
-            )
-
-            stag_model_file = self.utils.get_model_file(
-                "stag_model", model_name, log_dic["log_file"]
-            )
-
-            prod_model_file = self.utils.get_model_file(
-                "prod_model", model_name, log_dic["log_file"]
-            )
-
-            self.log_writer.log("Created trained,stag and prod model files", **log_dic)
-
             if stage == "Production":
                 self.log_writer.log(f"{stage} is selected for transition", **log_dic)
 
+                model_key = self.utils.get_model_key(
+                    model_source, model_name, log_dic["log_file"]
+                )
+
                 self.client.transition_model_version_stage(
                     model_name, current_version, stage
                 )
@@ -254,13 +277,24 @@ class MLFlow_Operation:
                     f"Transitioned {model_name} to {stage} in mlflow", **log_dic
                 )
 
-                self.s3.copy_data(
-                    train_model_file,
-                    from_bucket,
-                    prod_model_file,
-                    to_bucket,
-                    log_dic["log_file"],
-                )
+                entry = {
+                    "model": model_name,
+                    "version": str(current_version),
+                    **self.utils.get_object_version(
+                        model_key, bucket, log_dic["log_file"]
+                    ),
+                    "score": model_score,
+                }
+
+                if self.config["compile_models"] is True:
+                    compiled_key = self.utils.compile_prod_model(
+                        model_key, bucket, log_dic["log_file"]
+                    )
+
+                    if compiled_key is not None:
+                        entry["compiled"] = self.utils.get_object_version(
+                            compiled_key, bucket, log_dic["log_file"]
+                        )
 
             elif stage == "Staging":
                 self.log_writer.log(f"{stage} is selected for transition", **log_dic)
@@ -273,14 +307,6 @@ class MLFlow_Operation:
                     f"Transitioned {model_name} to {stage} in mlflow", **log_dic
                 )
 
-                self.s3.copy_data(
-                    train_model_file,
-                    from_bucket,
-                    stag_model_file,
-                    to_bucket,
-                    log_dic["log_file"],
-                )
-
             else:
                 self.log_writer.log(
                     "Please select stage for model transition", **log_dic
@@ -288,16 +314,87 @@ class MLFlow_Operation:
 
             self.log_writer.start_log("exit", **log_dic)
 
+            return entry
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def get_model_transitions(self, results, top_models, prod_models):
+        """
+        Method Name :   get_model_transitions
+        Description :   This method computes the diff between the currently promoted models and the new top models,
+                        the top models and the latest kmeans model belong in production and the rest in staging,
+                        model versions which are already in their stage, and for production also in the
+                        production manifest, are left as they are
+
+        Output      :   A list of model versions with the stage they need to be transitioned to is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.get_model_transitions.__name__,
+            __file__,
+            self.log_file,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            model_versions = [mv for res in results for mv in res.latest_versions]
+
+            ## In the registered models, even kmeans model is present, so during Prediction,
+            ## this model also needs to be in present in production, the results are in descending
+            ## order of name, so the first kmeans model is the one trained last
+
+            kmeans_models = [mv.name for mv in model_versions if "KMeans" in mv.name]
+
+            prod_names = set(top_models) | set(kmeans_models[:1])
+
+            transitions = []
+
+            for mv in model_versions:
+                stage = "Production" if mv.name in prod_names else "Staging"
+
+                if stage == "Production":
+                    target = self.utils.get_model_target(mv.name, log_dic["log_file"])
+
+                    entry = prod_models.get(target, {})
+
+                    unchanged = (
+                        mv.current_stage == stage
+                        and entry.get("model") == mv.name
+                        and entry.get("version") == str(mv.version)
+                    )
+
+                else:
+                    unchanged = mv.current_stage == stage
+
+                if unchanged is False:
+                    transitions.append((mv, stage))
+
+            self.log_writer.log(
+                f"{len(transitions)} of {len(model_versions)} model versions need a transition",
+                **log_dic,
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return transitions
+
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
-    def transition_best_models(self, model, top_models):
+    def transition_best_models(self, results, top_models, prod_models):
         """
         Method Name :   transition_best_models
-        Description :   This method transitions the models to staging or production based on the condition 
-                        and moves the models within s3 buckets also.
-        
-        Output      :   Top models are transitioned to production folder and rest to staging folder 
+        Description :   This method transitions only the models whose stage changed to staging or production, the
+                        transitions are run in parallel
+
+        Output      :   Top models are transitioned to production and rest to staging, a dict of the promoted
+                        models for the production manifest is returned
         On Failure  :   Write an exception log and then raise an exception
         
         Version     :   1.2
@@ -318,23 +415,44 @@ class MLFlow_Operation:
                 **log_dic,
             )
 
-            if model.name in top_models:
-                self.transition_mlflow_model(
-                    model.version, "Production", model.name, "model", "model"
-                )
+            transitions = self.get_model_transitions(results, top_models, prod_models)
 
-            ## In the registered models, even kmeans model is present, so during Prediction,
-            ## this model also needs to be in present in production, the code logic is present below
+            max_workers = max(
+                min(self.mlflow_config["max_workers"], len(transitions)), 1
+            )
 
-            elif "KMeans" in model.name:
-                self.transition_mlflow_model(
-                    model.version, "Production", model.name, "model", "model"
+            with ThreadPoolExecutor(max_workers) as executor:
+                entries = list(
+                    executor.map(
+                        bind_spans(
+                            lambda t: self.transition_mlflow_model(
+                                t[0].version,
+                                t[1],
+                                t[0].name,
+                                t[0].source,
+                                top_models.get(t[0].name),
+                                "model",
+                            )
+                        ),
+                        transitions,
+                    )
                 )
 
-            else:
-                self.transition_mlflow_model(
-                    model.version, "Staging", model.name, "model", "model"
-                )
+            promoted = {
+                self.utils.get_model_target(entry["model"], log_dic["log_file"]): entry
+                for entry in entries
+                if entry is not None
+            }
+
+            demoted = {mv.name for mv, stage in transitions if stage == "Staging"}
+
+            models = {
+                target: entry
+                for target, entry in prod_models.items()
+                if entry["model"] not in demoted
+            }
+
+            models.update(promoted)
 
             self.log_writer.log(
                 "Transitioned best models to production and rest to staging", **log_dic
@@ -342,16 +460,18 @@ class MLFlow_Operation:
 
             self.log_writer.start_log("exit", **log_dic)
 
+            return models
+
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
-    def get_best_models(self, runs, num_clusters):
+    def get_best_models(self, exp_id, num_clusters, train_id=None):
         """
         Method Name :   get_best_models
-        Description :   This method get the best models from the runs dataframe and based on the number of 
-                        clusters
+        Description :   This method gets the best model of every cluster from the best_model tag of the run of
+                        the cluster in the training run, the runs of the clusters are searched in parallel
         
-        Output      :   A list of top models is returned based on the number of clusters and runs
+        Output      :   A dict of top model names to their best score is returned based on the number of clusters
         On Failure  :   Write an exception log and then raise an exception
         
         Version     :   1.2
@@ -367,83 +487,31 @@ class MLFlow_Operation:
         self.log_writer.start_log("start", **log_dic)
 
         try:
-            reg_model_names = self.get_mlflow_models()
-
-            cols = [
-                "metrics." + str(model) + "-best_score"
-                for model in reg_model_names
-                if model != "KMeans"
-            ]
-
-            self.log_writer.log(
-                "Created cols list based on registered models", **log_dic
-            )
-
-            runs_cols = runs.filter(cols).max().sort_values(ascending=False)
-
-            self.log_writer.log(
-                "Filtered the runs dataframe based on the cols in descending order",
-                **log_dic,
-            )
-
-            metrics_dict = runs_cols.to_dict()
-
-            self.log_writer.log("Converted runs_cols to dict", **log_dic)
-
-            """ 
-                        Eg-output: For 3 clusters, 
-                            [
-                            metrics.XGBoost0-best_score,
-                            metrics.XGBoost1-best_score,
-                            metrics.XGBoost2-best_score,
-                            metrics.RandomForest0-best_score,
-                            metrics.RandomForest1-best_score,
-                            metrics.RandomForest2-best_score
-                        ] 
-
-                        Eg- runs_dataframe: I am only showing for 3 cols,actual runs dataframe will be different
-                                            based on the number of clusters
-                                    since for every run cluster values changes, rest two cols will be left as blank,
-                            so only we are taking the max value of each col, which is nothing but the value of the metric
-                            
-
-            run_number  metrics.XGBoost0-best_score metrics.RandomForest1-best_score metrics.XGBoost1-best_score
-                0                   1                       0.5
-                1                                                                                   1             2                                                                               """
-
-            top_mn_lst = [
-                max(
-                    [
-                        (file, metrics_dict[file])[0]
-                        .split(".")[1]
-                        .split("-best_score")[0]
-                        for file in metrics_dict
-                        if str(i)
-                        in file.split(".")[1].split("-best_score")[0].split("-")[-1]
-                    ]
+            max_workers = max(min(self.mlflow_config["max_workers"], num_clusters), 1)
+
+            with ThreadPoolExecutor(max_workers) as executor:
+                runs = list(
+                    executor.map(
+                        bind_spans(
+                            lambda idx: self.get_best_cluster_run(exp_id, idx, train_id)
+                        ),
+                        range(num_clusters),
+                    )
                 )
-                for i in range(0, num_clusters)
-            ]
 
-            self.log_writer.log(
-                "Got the best metric names from the metrics_dict and number of clusters",
-                **log_dic,
-            )
-
-            ## best_metrics will store the value of metrics, but we want the names of the models,
-            ## so best_metrics.index will return the name of the metric as registered in mlflow
-
-            ## Eg. metrics.XGBoost1-best_score
-
-            ## top_mn_lst - will store the top 3 model names
+            top_models = {
+                run.data.tags["best_model"]: run.data.metrics["best_score"]
+                for run in runs
+            }
 
             self.log_writer.log(
-                "Got the top model list from best_metrics names", **log_dic
+                f"Got {list(top_models)} as the best models of {num_clusters} clusters",
+                **log_dic,
             )
 
             self.log_writer.start_log("exit", **log_dic)
 
-            return top_mn_lst
+            return top_models
 
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
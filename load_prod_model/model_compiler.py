@@ -0,0 +1,143 @@
+from joblib import dump
+from numpy import arange, array, concatenate, frombuffer, stack, uint8, where
+
+
+def compile_forest(model):
+    """
+    Method Name :   compile_forest
+    Description :   This method flattens the trees of a random forest into node arrays, leaves point to
+                    themselves and the leaf values are normalized the same way as the tree predict_proba
+
+    Output      :   A dict of node arrays of the forest is returned
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = compile_forest.__name__
+
+    try:
+        feature, threshold, left, right, value, roots = [], [], [], [], [], []
+
+        offset = 0
+
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+
+            proba = tree.value[:, 0, : model.n_classes_].copy()
+
+            normalizer = proba.sum(axis=1)[:, None]
+
+            normalizer[normalizer == 0.0] = 1.0
+
+            proba /= normalizer
+
+            nodes = arange(tree.node_count) + offset
+
+            is_leaf = tree.children_left == -1
+
+            feature.append(where(is_leaf, 0, tree.feature))
+
+            threshold.append(tree.threshold)
+
+            left.append(where(is_leaf, nodes, tree.children_left + offset))
+
+            right.append(where(is_leaf, nodes, tree.children_right + offset))
+
+            value.append(proba)
+
+            roots.append(offset)
+
+            offset += tree.node_count
+
+        arrays = {
+            "kind": array("forest"),
+            "feature": concatenate(feature).astype("int32"),
+            "threshold": concatenate(threshold).astype("float64"),
+            "children": stack([concatenate(left), concatenate(right)], axis=1)
+            .ravel()
+            .astype("int64"),
+            "value": concatenate(value).astype("float64"),
+            "roots": array(roots, dtype="int32"),
+            "max_depth": array(max(e.tree_.max_depth for e in model.estimators_)),
+            "classes": model.classes_,
+        }
+
+        return arrays
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
+
+
+def compile_booster(model):
+    """
+    Method Name :   compile_booster
+    Description :   This method gets the raw booster of a xgboost classifier with the settings its predict uses
+
+    Output      :   A dict of the raw booster and predict settings is returned
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = compile_booster.__name__
+
+    try:
+        try:
+            iteration_end = model.best_iteration + 1
+
+        except AttributeError:
+            iteration_end = 0
+
+        arrays = {
+            "kind": array("booster"),
+            "raw": frombuffer(bytes(model.get_booster().save_raw()), dtype=uint8),
+            "missing": array(model.missing, dtype="float64"),
+            "iteration_end": array(iteration_end),
+            "n_classes": array(model.n_classes_),
+        }
+
+        return arrays
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
+
+
+def compile_model(model, model_file):
+    """
+    Method Name :   compile_model
+    Description :   This method compiles a random forest or xgboost classifier into a joblib file of plain
+                    arrays which is memory mapped and scored by the compiled inference backend of model prediction
+
+    Output      :   True is returned if the model was compiled, False if the model type is not supported
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = compile_model.__name__
+
+    try:
+        model_name = model.__class__.__name__
+
+        if model_name == "RandomForestClassifier":
+            arrays = compile_forest(model)
+
+        elif model_name == "XGBClassifier":
+            arrays = compile_booster(model)
+
+        else:
+            return False
+
+        dump(arrays, model_file)
+
+        return True
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
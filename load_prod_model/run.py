@@ -1,7 +1,7 @@
 from mlflow_operations import MLFlow_Operation
-from utils.logger import App_Logger
-from utils.main_utils import Main_Utils
+from utils.bootstrap import get_log_writer, get_utils
 from utils.read_params import get_log_dic
+from wafer_core.stage_cache import Stage_Cache
 
 
 class Run:
@@ -13,9 +13,9 @@ class Run:
     """
 
     def __init__(self):
-        self.log_writer = App_Logger()
+        self.log_writer = get_log_writer()
 
-        self.utils = Main_Utils()
+        self.utils = get_utils()
 
         self.mlflow_op = MLFlow_Operation("load_prod_model")
 
@@ -41,43 +41,49 @@ class Run:
         self.log_writer.start_log("start", **log_dic)
 
         try:
-            self.utils.create_prod_and_stag_dirs("model", log_dic["log_file"])
-
             self.mlflow_op.set_mlflow_tracking_uri()
 
             exp = self.mlflow_op.get_experiment("exp_name")
 
-            runs = self.mlflow_op.get_runs_from_mlflow(exp.experiment_id)
-
             num_clusters = self.utils.get_number_of_clusters(log_dic["log_file"])
 
             """
             Code Explaination: 
             num_clusters - Dynamically allocated based on the number of clusters created using elbow plot
 
-            Here, we are trying to iterate over the number of clusters and then dynamically create the cols 
-            where in the best model names can be found, and then copied to production or staging depending on
-            the condition
+            Here, we are searching the run of every cluster in the latest training run, whose id model
+            training writes to the train run marker, where the best model name of the cluster is stored as
+            tag, and then put in production or staging depending on the condition, without a marker the
+            latest run of the cluster by train_date is taken
 
-            Eg- metrics.XGBoost1-best_score
+            Eg- tags.cluster = '1' and tags.train_id = '2022-04-01-<uuid>' -> tags.best_model
             """
 
-            top_mn_lst = self.mlflow_op.get_best_models(runs, num_clusters)
+            train_id = self.utils.get_train_id("model", log_dic["log_file"])
+
+            top_models = self.mlflow_op.get_best_models(
+                exp.experiment_id, num_clusters, train_id
+            )
 
             self.log_writer.log(f"Got the top model names", **log_dic)
 
             results = self.mlflow_op.search_mlflow_models("DESC")
 
             ## results - This will store all the registered models in mlflow
-            ## Here we are iterating through all the registered model and for every latest registered model
-            ## we are checking if the model name is in the top 3 model list, if present we are putting that
-            ## model into production or staging
+            ## Here we are comparing the latest version of every registered model against the production
+            ## manifest of the currently promoted models, only the models whose stage changed are put into
+            ## production or staging, and the promoted models are written as the next manifest version which
+            ## points to the trained model files, no model file is copied
+
+            manifest = self.utils.get_prod_manifest("model", log_dic["log_file"])
 
-            [
-                self.mlflow_op.transition_best_models(mv, top_mn_lst)
-                for res in results
-                for mv in res.latest_versions
-            ]
+            prod_models = self.mlflow_op.transition_best_models(
+                results, top_models, manifest["models"]
+            )
+
+            self.utils.write_prod_manifest(
+                manifest, prod_models, "model", log_dic["log_file"]
+            )
 
             self.log_writer.log(
                 "Transitioning of models based on scores successfully done", **log_dic
@@ -91,14 +97,19 @@ class Run:
 
 def lambda_handler(event, context):
     try:
-        run = Run()
+        cache = Stage_Cache(event)
+
+        if cache.is_cached() is False:
+            run = Run()
+
+            run.load_production_model()
 
-        run.load_production_model()
+            cache.record()
 
     except Exception as e:
         raise e
 
     finally:
-        utils = Main_Utils()
+        utils = get_utils()
 
         utils.upload_logs()
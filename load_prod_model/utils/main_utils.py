@@ -1,8 +1,17 @@
+from datetime import datetime
+from json import loads
+from os import remove
+from os.path import basename, splitext
+from re import search
 from shutil import rmtree
 
+from joblib import load
+
+from model_compiler import compile_model
 from s3_operations import S3_Operation
 from utils.logger import App_Logger
 from utils.read_params import get_log_dic, read_params
+from wafer_core.metrics import add_count, write_run_summary
 
 
 class Main_Utils:
@@ -26,8 +35,12 @@ class Main_Utils:
 
         self.file_format = self.config["model_save_format"]
 
+        self.compiled_format = self.config["compiled_format"]
+
         self.feats_pattern = self.config["feature_pattern"]
 
+        self.files = self.config["files"]
+
     def upload_logs(self):
         """
         Method Name :   upload_logs
@@ -48,6 +61,8 @@ class Main_Utils:
         try:
             log_folder = "/tmp" + "/" + self.log_dir
 
+            write_run_summary(log_folder)
+
             self.s3.upload_folder(log_folder, "logs", log_dic["log_file"])
 
             self.log_writer.log(f"Uploaded logs to logs s3 bucket", **log_dic)
@@ -79,7 +94,7 @@ class Main_Utils:
         self.log_writer.start_log("start", **log_dic)
 
         try:
-            model_file = "/tmp" + self.dir[key] + "/" + model_name + self.file_format
+            model_file = self.dir[key] + "/" + model_name + self.file_format
 
             self.log_writer.log(f"Got model file for {key}", **log_dic)
 
@@ -90,12 +105,55 @@ class Main_Utils:
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
-    def create_prod_and_stag_dirs(self, bucket, log_file):
+    def get_model_key(self, model_source, model_name, log_file):
         """
-        Method Name :   create_prod_and_stag_dirs
-        Description :   This method creates folders for production and staging in s3 bucket
+        Method Name :   get_model_key
+        Description :   This method gets the key of the model file in s3 bucket from the source of the mlflow
+                        model version, which is the s3 uri the model was saved to during training, versions
+                        registered before the source was an s3 uri fall back to the trained model file
 
-        Output      :   Production and staging folders are created in s3 bucket
+        Output      :   The key of the model file in model bucket is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.get_model_key.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            bucket_uri = "s3://" + self.config["s3_bucket"]["model"] + "/"
+
+            if model_source.startswith(bucket_uri):
+                model_key = model_source[len(bucket_uri) :]
+
+            else:
+                model_key = self.get_model_file(
+                    "trained_model", model_name, log_dic["log_file"]
+                )
+
+            self.log_writer.log(
+                f"Got {model_key} as model key from {model_source} source", **log_dic
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return model_key
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def compile_prod_model(self, model_key, bucket, log_file):
+        """
+        Method Name :   compile_prod_model
+        Description :   This method compiles the trained model for the compiled inference backend and uploads
+                        it next to the trained model file
+
+        Output      :   The compiled model is uploaded to s3 bucket if the model type is supported and its key is
+                        returned, None otherwise
         On Failure  :   Write an exception log and then raise an exception
 
         Version     :   1.2
@@ -103,7 +161,7 @@ class Main_Utils:
         """
         log_dic = get_log_dic(
             self.__class__.__name__,
-            self.create_prod_and_stag_dirs.__name__,
+            self.compile_prod_model.__name__,
             __file__,
             log_file,
         )
@@ -111,12 +169,42 @@ class Main_Utils:
         self.log_writer.start_log("start", **log_dic)
 
         try:
-            self.s3.create_folder("prod_model", bucket, log_dic["log_file"])
+            local_model_file = "/tmp" + "/" + basename(model_key)
+
+            self.s3.download_file(
+                model_key, bucket, local_model_file, log_dic["log_file"]
+            )
 
-            self.s3.create_folder("stag_model", bucket, log_dic["log_file"])
+            model = load(local_model_file)
+
+            remove(local_model_file)
+
+            compiled_model_file = splitext(local_model_file)[0] + self.compiled_format
+
+            compiled_key = None
+
+            if compile_model(model, compiled_model_file) is True:
+                compiled_key = splitext(model_key)[0] + self.compiled_format
+
+                self.s3.upload_file(
+                    compiled_model_file, compiled_key, bucket, log_dic["log_file"]
+                )
+
+                self.log_writer.log(
+                    f"Compiled {model_key} for the compiled inference backend",
+                    **log_dic,
+                )
+
+            else:
+                self.log_writer.log(
+                    f"{model.__class__.__name__} is not supported by the compiled inference backend",
+                    **log_dic,
+                )
 
             self.log_writer.start_log("exit", **log_dic)
 
+            return compiled_key
+
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
@@ -163,3 +251,222 @@ class Main_Utils:
 
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
+
+    def get_model_target(self, model_name, log_file):
+        """
+        Method Name :   get_model_target
+        Description :   This method gets the target of the model in the production manifest from the model name,
+                        which is the cluster number for the cluster models and the model name for the kmeans
+                        model
+
+        Output      :   The target of the model in the production manifest is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.get_model_target.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            match = search(r"(?P<model>[A-Za-z]+)(?P<cluster>\d*)$", model_name)
+
+            target = match["cluster"] if match["cluster"] != "" else match["model"]
+
+            self.log_writer.log(f"Got {target} as target of {model_name}", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return target
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def get_object_version(self, key, bucket, log_file):
+        """
+        Method Name :   get_object_version
+        Description :   This method gets the etag and, when the bucket is versioned, the version id of the object
+                        key from s3 bucket without downloading the object, so the manifest pins the exact object
+                        which was promoted even if a later training writes the same key
+
+        Output      :   A dict of the key, the etag without quotes and the version id of the object is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.get_object_version.__name__,
+            __file__,
+            log_file,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            response = self.s3.s3_client.head_object(
+                Bucket=self.config["s3_bucket"][bucket], Key=key
+            )
+
+            version = {"key": key, "etag": response["ETag"].strip('"')}
+
+            if response.get("VersionId", "null") != "null":
+                version["version_id"] = response["VersionId"]
+
+            self.log_writer.log(f"Got {version} for {key} from {bucket}", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return version
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def get_train_id(self, bucket, log_file):
+        """
+        Method Name :   get_train_id
+        Description :   This method gets the id of the latest training run from the train run marker written by
+                        model training, None is returned when the marker is not present
+
+        Output      :   The training run id is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.get_train_id.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            s3_client = self.s3.s3_client
+
+            try:
+                response = s3_client.get_object(
+                    Bucket=self.config["s3_bucket"][bucket],
+                    Key=self.files["train_run"],
+                )
+
+                body = response["Body"].read()
+
+                add_count("s3_bytes_read", len(body))
+
+                train_id = loads(body)["train_id"]
+
+            except s3_client.exceptions.NoSuchKey:
+                train_id = None
+
+            self.log_writer.log(f"Got {train_id} as latest training run", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return train_id
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def get_prod_manifest(self, bucket, log_file):
+        """
+        Method Name :   get_prod_manifest
+        Description :   This method gets the production manifest which records the currently promoted model of
+                        every cluster, an empty manifest is returned when nothing was promoted yet
+
+        Output      :   A dict of the manifest version and the promoted models is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.get_prod_manifest.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            s3_client = self.s3.s3_client
+
+            try:
+                response = s3_client.get_object(
+                    Bucket=self.config["s3_bucket"][bucket],
+                    Key=self.files["prod_manifest"],
+                )
+
+                body = response["Body"].read()
+
+                add_count("s3_bytes_read", len(body))
+
+                manifest = loads(body)
+
+            except s3_client.exceptions.NoSuchKey:
+                manifest = {"version": 0, "models": {}}
+
+            self.log_writer.log(
+                f"Got version {manifest['version']} of production manifest", **log_dic
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return manifest
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def write_prod_manifest(self, manifest, models, bucket, log_file):
+        """
+        Method Name :   write_prod_manifest
+        Description :   This method writes the promoted models as the next version of the production manifest in
+                        a single put, so readers see either the previous or the new set of models, the
+                        manifest points to the trained model files so promotion does not copy any model
+
+        Output      :   The production manifest is written to s3 bucket if the promoted models changed
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.write_prod_manifest.__name__,
+            __file__,
+            log_file,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            if models == manifest["models"]:
+                self.log_writer.log(
+                    f"Promoted models are unchanged, kept version {manifest['version']} of production manifest",
+                    **log_dic,
+                )
+
+            else:
+                new_manifest = {
+                    "version": manifest["version"] + 1,
+                    "updated_at": datetime.now().isoformat(),
+                    "models": models,
+                }
+
+                self.s3.upload_json(
+                    new_manifest,
+                    self.files["prod_manifest"],
+                    bucket,
+                    log_dic["log_file"],
+                )
+
+                self.log_writer.log(
+                    f"Wrote version {new_manifest['version']} of production manifest",
+                    **log_dic,
+                )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
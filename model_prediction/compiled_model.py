@@ -0,0 +1,94 @@
+from joblib import load
+from numpy import arange, ascontiguousarray, float32, float64, repeat, zeros
+
+
+class Compiled_Model:
+    """
+    Description :   This class shall be used for scoring the compiled production models, random forests are
+                    scored by vectorized traversal of the node arrays and xgboost models by inplace predict
+                    of the raw booster
+    Version     :   1.2
+
+    Revisions   :   Moved to setup to cloud
+    """
+
+    def __init__(self, model_file, mmap_mode=None):
+        self.arrays = load(model_file, mmap_mode=mmap_mode)
+
+        self.kind = str(self.arrays["kind"])
+
+        if self.kind == "booster":
+            from xgboost import Booster
+
+            self.booster = Booster(model_file=bytearray(self.arrays["raw"].tobytes()))
+
+    def predict_forest(self, X):
+        """
+        Method Name :   predict_forest
+        Description :   This method walks all the trees for all the rows at once, features are compared as
+                        float32 against float64 thresholds and the tree probabilities are summed in tree order
+
+        Output      :   The predicted classes are returned
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        a = self.arrays
+
+        X = ascontiguousarray(X, dtype=float32)
+
+        offsets = (arange(X.shape[0]) * X.shape[1])[:, None]
+
+        X = X.ravel()
+
+        nodes = repeat(a["roots"][None, :], len(offsets), axis=0)
+
+        for _ in range(int(a["max_depth"])):
+            go_right = ~(X[offsets + a["feature"][nodes]] <= a["threshold"][nodes])
+
+            nodes = a["children"][2 * nodes + go_right]
+
+        proba = zeros((len(offsets), a["value"].shape[1]), dtype=float64)
+
+        for t in range(nodes.shape[1]):
+            proba += a["value"][nodes[:, t]]
+
+        proba /= nodes.shape[1]
+
+        return a["classes"].take(proba.argmax(axis=1), axis=0)
+
+    def predict_booster(self, X):
+        """
+        Method Name :   predict_booster
+        Description :   This method scores the raw booster with inplace predict and converts the probabilities
+                        to classes the same way as the xgboost classifier predict
+
+        Output      :   The predicted classes are returned
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        a = self.arrays
+
+        proba = self.booster.inplace_predict(
+            X,
+            iteration_range=(0, int(a["iteration_end"])),
+            missing=float(a["missing"]),
+            validate_features=False,
+        )
+
+        if len(proba.shape) > 1 and (int(a["n_classes"]) != 2 or proba.shape[1] != 1):
+            return proba.argmax(axis=1)
+
+        return (proba.reshape(-1) > 0.5).astype("int64")
+
+    def predict(self, X):
+        func = (
+            lambda: self.predict_forest(X)
+            if self.kind == "forest"
+            else self.predict_booster(X)
+        )
+
+        return func()
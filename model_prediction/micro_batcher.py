@@ -0,0 +1,240 @@
+from bisect import bisect_left
+from concurrent.futures import Future
+from queue import Empty, Queue
+from threading import Lock, Thread
+from time import monotonic
+
+from pandas import concat
+
+from utils.logger import App_Logger
+from utils.read_params import get_log_dic, read_params
+
+
+class Micro_Batcher:
+    """
+    Description :   This class shall be used for collecting the scoring requests into micro batches, so that
+                    each cluster model runs one vectorized predict per batch instead of one per request
+    Version     :   1.2
+
+    Revisions   :   Moved to setup to cloud
+    """
+
+    def __init__(self, predict_func, log_file):
+        self.config = read_params()
+
+        self.batch_config = self.config["online"]["micro_batch"]
+
+        self.buckets = self.batch_config["histogram_buckets"]
+
+        self.predict_func = predict_func
+
+        self.log_file = log_file
+
+        self.log_writer = App_Logger()
+
+        self.requests = Queue()
+
+        self.stats_lock = Lock()
+
+        self.stats = {
+            "batches": 0,
+            "rows": 0,
+            "batch_size_histogram": dict.fromkeys(self.get_labels(), 0),
+            "queue_depth_histogram": dict.fromkeys(self.get_labels(), 0),
+        }
+
+        self.worker = Thread(target=self.run, name="micro_batcher", daemon=True)
+
+        self.worker.start()
+
+    def get_labels(self):
+        return [f"le_{b}" for b in self.buckets] + ["le_inf"]
+
+    def observe(self, histogram, value):
+        idx = bisect_left(self.buckets, value)
+
+        self.stats[histogram][self.get_labels()[idx]] += 1
+
+    def submit(self, features):
+        """
+        Method Name :   submit
+        Description :   This method queues the features of a request for the next micro batch
+
+        Output      :   A future resolving to the predictions and clusters of the request is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.submit.__name__, __file__, self.log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            future = Future()
+
+            self.requests.put((features, future))
+
+            self.log_writer.log(
+                f"Queued {len(features)} rows, queue depth is {self.requests.qsize()}",
+                **log_dic,
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return future
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def get_batch(self, batch):
+        """
+        Method Name :   get_batch
+        Description :   This method waits for a request and then collects requests into the batch until it has
+                        max rows or max wait milliseconds have passed since the first request, the requests are
+                        added to the given list as they are dequeued so the caller sees every dequeued request
+                        even when collecting fails
+
+        Output      :   The list of dequeued requests is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.get_batch.__name__, __file__, self.log_file
+        )
+
+        batch.append(self.requests.get())
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            queue_depth = self.requests.qsize() + 1
+
+            rows = len(batch[0][0])
+
+            deadline = monotonic() + self.batch_config["max_wait_ms"] / 1000
+
+            while rows < self.batch_config["max_rows"]:
+                timeout = deadline - monotonic()
+
+                if timeout <= 0:
+                    break
+
+                try:
+                    request = self.requests.get(timeout=timeout)
+
+                except Empty:
+                    break
+
+                batch.append(request)
+
+                rows += len(request[0])
+
+            with self.stats_lock:
+                self.observe("queue_depth_histogram", queue_depth)
+
+                self.observe("batch_size_histogram", rows)
+
+                self.stats["batches"] += 1
+
+                self.stats["rows"] += rows
+
+            self.log_writer.log(
+                f"Collected {len(batch)} requests with {rows} rows", **log_dic
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return batch
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def score_batch(self, batch):
+        """
+        Method Name :   score_batch
+        Description :   This method scores the micro batch in one predict call and fans the predictions back
+                        out to the futures of the requests
+
+        Output      :   The futures of the requests are resolved
+        On Failure  :   Write an exception log and set the exception on the futures of the requests
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.score_batch.__name__, __file__, self.log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            features = concat([f for f, _ in batch], ignore_index=True)
+
+            predictions, clusters = self.predict_func(features, log_dic["log_file"])
+
+            start = 0
+
+            for f, future in batch:
+                end = start + len(f)
+
+                future.set_result((predictions[start:end], clusters[start:end]))
+
+                start = end
+
+            self.log_writer.log(
+                f"Fanned out predictions to {len(batch)} requests", **log_dic
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+            self.log_writer.log(f"Scoring micro batch failed : {e}", **log_dic)
+
+    def run(self):
+        while True:
+            batch = []
+
+            try:
+                self.score_batch(self.get_batch(batch))
+
+            except Exception:
+                continue
+
+            finally:
+                ## a request dequeued but not resolved, because collecting or scoring the batch failed in
+                ## a way score_batch did not handle, is failed here so its caller does not wait forever
+
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(
+                            Exception("Micro batch of the request was not scored")
+                        )
+
+    def get_stats(self):
+        """
+        Method Name :   get_stats
+        Description :   This method gets the queue depth and the batch size and queue depth histograms
+
+        Output      :   A dict of micro batching stats is returned
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        with self.stats_lock:
+            return {
+                "queue_depth": self.requests.qsize(),
+                "batches": self.stats["batches"],
+                "rows": self.stats["rows"],
+                "batch_size_histogram": dict(self.stats["batch_size_histogram"]),
+                "queue_depth_histogram": dict(self.stats["queue_depth_histogram"]),
+            }
@@ -0,0 +1,388 @@
+from collections import OrderedDict
+from io import BytesIO
+from json import loads
+from os import environ, makedirs, replace
+from os.path import exists, join, splitext
+from threading import Lock
+from time import monotonic
+
+from botocore.exceptions import ClientError
+from joblib import load
+
+from compiled_model import Compiled_Model
+from s3_operations import S3_Operation
+from utils.logger import App_Logger
+from utils.read_params import get_log_dic, read_params
+from wafer_core.metrics import add_count
+
+MANIFEST_CACHE = {}
+
+MODEL_CACHE = OrderedDict()
+
+ARTIFACT_CACHE = {}
+
+CACHE_LOCK = Lock()
+
+
+class Model_Registry:
+    """
+    Description :   This class shall be used for resolving and caching the production models, the manifest
+                    and the deserialized models are kept at module level so that they survive lambda warm starts
+    Version     :   1.2
+
+    Revisions   :   Moved to setup to cloud
+    """
+
+    def __init__(self, s3_resource=None):
+        self.config = read_params()
+
+        self.compiled_format = self.config["compiled_format"]
+
+        self.backend = environ.get(
+            "INFERENCE_BACKEND", self.config["inference_backend"]
+        )
+
+        self.files = self.config["files"]
+
+        self.cache_config = self.config["model_cache"]
+
+        self.disk_dir = "/tmp" + "/" + self.cache_config["disk_dir"]
+
+        self.s3 = S3_Operation(s3_resource)
+
+        self.log_writer = App_Logger()
+
+    def get_manifest(self, log_file):
+        """
+        Method Name :   get_manifest
+        Description :   This method gets the production manifest written by load_prod_model which maps the
+                        cluster number to the model file, the manifest is read with a single get only when the
+                        cached manifest has expired, and not downloaded again when its etag is unchanged
+
+        Output      :   A dict of cluster number to model file, etag and compiled model file is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.get_manifest.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            with CACHE_LOCK:
+                age = monotonic() - MANIFEST_CACHE.get("loaded_at", float("-inf"))
+
+                if age < self.cache_config["manifest_ttl"]:
+                    self.log_writer.log(
+                        f"Using cached production manifest loaded {age:.0f}s ago",
+                        **log_dic,
+                    )
+
+                    self.log_writer.start_log("exit", **log_dic)
+
+                    return MANIFEST_CACHE["manifest"]
+
+                request = {
+                    "Bucket": self.s3.bucket["model"],
+                    "Key": self.files["prod_manifest"],
+                }
+
+                if "etag" in MANIFEST_CACHE:
+                    request["IfNoneMatch"] = MANIFEST_CACHE["etag"]
+
+                try:
+                    response = self.s3.s3_client.get_object(**request)
+
+                    body = response["Body"].read()
+
+                    add_count("s3_bytes_read", len(body))
+
+                    prod_manifest = loads(body)
+
+                    manifest = {
+                        int(target) if target.isdigit() else target: entry
+                        for target, entry in prod_manifest["models"].items()
+                    }
+
+                    MANIFEST_CACHE.update(
+                        {"manifest": manifest, "etag": response["ETag"]}
+                    )
+
+                    self.log_writer.log(
+                        f"Got version {prod_manifest['version']} of production manifest",
+                        **log_dic,
+                    )
+
+                except ClientError as e:
+                    if e.response["Error"]["Code"] != "304":
+                        raise
+
+                    manifest = MANIFEST_CACHE["manifest"]
+
+                    self.log_writer.log(
+                        "Production manifest is not modified since it was cached",
+                        **log_dic,
+                    )
+
+                MANIFEST_CACHE["loaded_at"] = monotonic()
+
+            self.log_writer.log(
+                f"Resolved production manifest with {list(manifest.keys())} models",
+                **log_dic,
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return manifest
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def get_model_object(self, entry, log_file):
+        """
+        Method Name :   get_model_object
+        Description :   This method gets the model file pinned by the manifest entry, by its version id when the
+                        model bucket is versioned and otherwise only if it still has the etag of the entry, so a
+                        model file overwritten by a later training is never served under the promoted etag
+
+        Output      :   The bytes of the model file are returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.get_model_object.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            request = {"Bucket": self.s3.bucket["model"], "Key": entry["key"]}
+
+            if "version_id" in entry:
+                request["VersionId"] = entry["version_id"]
+
+            else:
+                request["IfMatch"] = entry["etag"]
+
+            try:
+                response = self.s3.s3_client.get_object(**request)
+
+            except ClientError as e:
+                if e.response["Error"]["Code"] not in ("412", "PreconditionFailed"):
+                    raise
+
+                raise Exception(
+                    f"{entry['key']} changed since it was promoted with {entry['etag']} etag"
+                )
+
+            if response["ETag"].strip('"') != entry["etag"].strip('"'):
+                raise Exception(
+                    f"{entry['key']} has {response['ETag']} etag instead of the promoted {entry['etag']} etag"
+                )
+
+            body = response["Body"].read()
+
+            add_count("s3_bytes_read", len(body))
+
+            self.log_writer.log(
+                f"Got {entry['key']} with {entry['etag']} etag from model bucket",
+                **log_dic,
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return body
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def read_model(self, entry, log_file):
+        """
+        Method Name :   read_model
+        Description :   This method reads and deserializes the model pinned by the manifest entry, when disk
+                        caching is enabled the model file is downloaded once to /tmp, keyed by its etag and its
+                        arrays are memory mapped
+
+        Output      :   The deserialized model is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.read_model.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            ext = splitext(entry["key"])[1]
+
+            if self.cache_config["disk_cache"] is True:
+                makedirs(self.disk_dir, exist_ok=True)
+
+                model_file = join(self.disk_dir, entry["etag"] + ext)
+
+                if exists(model_file):
+                    self.log_writer.log(
+                        f"Found {entry['key']} in disk cache as {model_file}", **log_dic
+                    )
+
+                else:
+                    model_obj = self.get_model_object(entry, log_dic["log_file"])
+
+                    with open(model_file + ".part", "wb") as f:
+                        f.write(model_obj)
+
+                    replace(model_file + ".part", model_file)
+
+                mmap_mode = self.cache_config["mmap_mode"]
+
+                func = (
+                    lambda: Compiled_Model(model_file, mmap_mode=mmap_mode)
+                    if ext == self.compiled_format
+                    else load(model_file, mmap_mode=mmap_mode)
+                )
+
+                model = func()
+
+            else:
+                model_obj = self.get_model_object(entry, log_dic["log_file"])
+
+                func = (
+                    lambda: Compiled_Model(BytesIO(model_obj))
+                    if ext == self.compiled_format
+                    else load(BytesIO(model_obj))
+                )
+
+                model = func()
+
+            self.log_writer.log(f"Deserialized {entry['key']} model", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return model
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def load_model(self, idx, log_file):
+        """
+        Method Name :   load_model
+        Description :   This method loads the production model for the cluster number or model name, the
+                        compiled model is used when the inference backend is compiled, models are kept in an
+                        in-process lru cache keyed by model file, etag and version id
+
+        Output      :   The production model is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.load_model.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            manifest = self.get_manifest(log_dic["log_file"])
+
+            entry = manifest[idx]
+
+            if self.backend == "compiled" and "compiled" in entry:
+                entry = entry["compiled"]
+
+            cache_key = (entry["key"], entry["etag"], entry.get("version_id"))
+
+            with CACHE_LOCK:
+                model = MODEL_CACHE.get(cache_key)
+
+                if model is not None:
+                    MODEL_CACHE.move_to_end(cache_key)
+
+            if model is None:
+                model = self.read_model(entry, log_dic["log_file"])
+
+                with CACHE_LOCK:
+                    MODEL_CACHE[cache_key] = model
+
+                    while len(MODEL_CACHE) > self.cache_config["max_models"]:
+                        MODEL_CACHE.popitem(last=False)
+
+                self.log_writer.log(f"Added {entry['key']} to model cache", **log_dic)
+
+            else:
+                self.log_writer.log(f"Got {entry['key']} from model cache", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return model
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def load_preprocess_artifact(self, log_file):
+        """
+        Method Name :   load_preprocess_artifact
+        Description :   This method loads the preprocessing artifact saved by the training preprocessing, the
+                        artifact is revalidated by etag only when the cached copy has expired
+
+        Output      :   The preprocessing artifact is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.load_preprocess_artifact.__name__,
+            __file__,
+            log_file,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            with CACHE_LOCK:
+                age = monotonic() - ARTIFACT_CACHE.get("loaded_at", float("-inf"))
+
+                if age >= self.cache_config["manifest_ttl"]:
+                    f_obj = self.s3.get_file_object(
+                        self.files["preprocess_artifact"],
+                        "feature_store",
+                        log_dic["log_file"],
+                    )
+
+                    if f_obj.e_tag != ARTIFACT_CACHE.get("etag"):
+                        artifact_obj = self.s3.read_object(
+                            f_obj, log_dic["log_file"], decode=False
+                        )
+
+                        ARTIFACT_CACHE.update(
+                            {
+                                "artifact": load(BytesIO(artifact_obj)),
+                                "etag": f_obj.e_tag,
+                            }
+                        )
+
+                        self.log_writer.log(
+                            f"Loaded preprocessing artifact with {f_obj.e_tag} etag",
+                            **log_dic,
+                        )
+
+                    ARTIFACT_CACHE["loaded_at"] = monotonic()
+
+                artifact = ARTIFACT_CACHE["artifact"]
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return artifact
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
@@ -0,0 +1,280 @@
+from base64 import b64decode
+from io import BytesIO
+from json import dumps, loads
+from time import perf_counter
+
+from numpy import empty, int64, percentile, unique
+from pandas import DataFrame
+
+from micro_batcher import Micro_Batcher
+from model_registry import Model_Registry
+from utils.logger import App_Logger
+from utils.read_params import get_log_dic, read_params
+
+LATENCIES = []
+
+
+class Online_Prediction:
+    """
+    Description :   This class shall be used for scoring wafers on request, the preprocessing artifact and
+                    the models are taken from the warm model registry
+    Version     :   1.2
+
+    Revisions   :   Moved to setup to cloud
+    """
+
+    def __init__(self, s3_resource=None):
+        self.config = read_params()
+
+        self.online_config = self.config["online"]
+
+        self.registry = Model_Registry(s3_resource)
+
+        self.log_writer = App_Logger()
+
+        func = (
+            lambda: Micro_Batcher(self.predict, "online")
+            if self.online_config["micro_batch"]["enabled"] is True
+            else None
+        )
+
+        self.batcher = func()
+
+    def parse_payload(self, event, log_file):
+        """
+        Method Name :   parse_payload
+        Description :   This method parses the request payload of one or many wafers, the payload is either
+                        json records or an arrow ipc stream when the content type is arrow
+
+        Output      :   A dataframe of the wafers in the request is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.parse_payload.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            headers = {k.lower(): v for k, v in (event.get("headers") or {}).items()}
+
+            body = event.get("body", event)
+
+            if event.get("isBase64Encoded") is True:
+                body = b64decode(body)
+
+            if "arrow" in headers.get("content-type", ""):
+                from pyarrow import ipc
+
+                body = body.encode() if isinstance(body, str) else body
+
+                df = ipc.open_stream(BytesIO(body)).read_pandas()
+
+            else:
+                body = loads(body) if isinstance(body, (str, bytes)) else body
+
+                records = body.get("wafers", body) if isinstance(body, dict) else body
+
+                df = DataFrame(records if isinstance(records, list) else [records])
+
+            self.log_writer.log(f"Parsed payload of {len(df)} wafers", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return df
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def preprocess(self, data, log_file):
+        """
+        Method Name :   preprocess
+        Description :   This method applies the training preprocessing artifact to the wafers, missing values
+                        are imputed with the fitted imputer and only the training features are kept
+
+        Output      :   The wafer names and the features dataframe are returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.preprocess.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            artifact = self.registry.load_preprocess_artifact(log_dic["log_file"])
+
+            wafers = data["Wafer"].to_numpy() if "Wafer" in data else data.index
+
+            data = data.reindex(columns=artifact["input_cols"]).astype("float64")
+
+            if data.isna().to_numpy().any():
+                if artifact["imputer"] is not None:
+                    data = DataFrame(
+                        artifact["imputer"].transform(data), columns=data.columns
+                    )
+
+                else:
+                    data = data.fillna(artifact["fill_values"])
+
+                self.log_writer.log("Imputed missing values of the wafers", **log_dic)
+
+            features = data[artifact["features"]]
+
+            self.log_writer.log(
+                f"Applied preprocessing artifact to {len(features)} wafers", **log_dic
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return wafers, features
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def predict(self, features, log_file):
+        """
+        Method Name :   predict
+        Description :   This method assigns the wafers to clusters with the kmeans model and each cluster model
+                        predicts only its wafers into a preallocated array
+
+        Output      :   The predictions and clusters of the wafers in request order are returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.predict.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            kmeans_model = self.registry.load_model("KMeans", log_dic["log_file"])
+
+            clusters = kmeans_model.predict(features)
+
+            predictions = empty(len(features), dtype=int64)
+
+            for idx in unique(clusters):
+                rows = (clusters == idx).nonzero()[0]
+
+                model = self.registry.load_model(idx, log_dic["log_file"])
+
+                predictions[rows] = model.predict(features.iloc[rows])
+
+            self.log_writer.log(
+                f"Got predictions for {len(features)} wafers", **log_dic
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return predictions, clusters
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def record_latency(self, latency_ms, log_file):
+        """
+        Method Name :   record_latency
+        Description :   This method records the request latency in the rolling latency window
+
+        Output      :   The p50 and p99 latency of the window in milliseconds are returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.record_latency.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            LATENCIES.append(latency_ms)
+
+            del LATENCIES[: -self.online_config["latency_window"]]
+
+            p50, p99 = percentile(LATENCIES, [50, 99])
+
+            self.log_writer.log(
+                f"Request took {latency_ms:.2f} ms, p50 : {p50:.2f} ms, p99 : {p99:.2f} ms over {len(LATENCIES)} requests",
+                **log_dic,
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return {"p50_ms": float(p50), "p99_ms": float(p99)}
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def handle(self, event, log_file):
+        """
+        Method Name :   handle
+        Description :   This method scores the wafers in the request and returns the predictions with the
+                        request latency and the rolling p50 and p99 latency
+
+        Output      :   A json response of predictions and latency is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.handle.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            start = perf_counter()
+
+            data = self.parse_payload(event, log_dic["log_file"])
+
+            wafers, features = self.preprocess(data, log_dic["log_file"])
+
+            if self.batcher is not None:
+                future = self.batcher.submit(features)
+
+                predictions, clusters = future.result(
+                    timeout=self.online_config["micro_batch"]["result_timeout_s"]
+                )
+
+            else:
+                predictions, clusters = self.predict(features, log_dic["log_file"])
+
+            latency_ms = (perf_counter() - start) * 1000
+
+            latency = self.record_latency(latency_ms, log_dic["log_file"])
+
+            body = {
+                "predictions": [
+                    {"Wafer": str(w), "Prediction": int(p), "Cluster": int(c)}
+                    for w, p, c in zip(wafers, predictions, clusters)
+                ],
+                "latency_ms": latency_ms,
+                **latency,
+            }
+
+            if self.batcher is not None:
+                body["micro_batch"] = self.batcher.get_stats()
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return {
+                "statusCode": 200,
+                "headers": {"Content-Type": "application/json"},
+                "body": dumps(body),
+            }
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
@@ -0,0 +1,317 @@
+from os import makedirs, remove
+from os.path import basename, join, splitext
+
+from numpy import empty, flatnonzero, int32, int64, unique
+from numpy.lib.format import open_memmap
+from pandas import DataFrame
+
+from s3_operations import S3_Operation
+from utils.logger import App_Logger
+from utils.read_params import get_log_dic, read_params
+
+
+class Prediction_Sink:
+    """
+    Description :   This class shall be used for accumulating the per cluster predictions of a batch and
+                    writing them as one prediction output
+    Version     :   1.2
+
+    Revisions   :   Moved to setup to cloud
+    """
+
+    def __init__(self):
+        self.config = read_params()
+
+        self.sink_config = self.config["prediction_sink"]
+
+        self.sink_dir = "/tmp" + "/" + self.sink_config["sink_dir"]
+
+        self.s3 = S3_Operation()
+
+        self.log_writer = App_Logger()
+
+        self.spill_files = []
+
+    def get_buffer(self, name, n_rows, dtype, log_file):
+        """
+        Method Name :   get_buffer
+        Description :   This method allocates a column buffer for the batch, batches larger than spill rows
+                        are spilled to a memory mapped npy file in the sink folder
+
+        Output      :   A numpy array or memory map of n_rows is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.get_buffer.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            if n_rows > self.sink_config["spill_rows"]:
+                makedirs(self.sink_dir, exist_ok=True)
+
+                spill_file = join(self.sink_dir, name + ".npy")
+
+                buffer = open_memmap(
+                    spill_file, mode="w+", dtype=dtype, shape=(n_rows,)
+                )
+
+                self.spill_files.append(spill_file)
+
+                self.log_writer.log(
+                    f"Spilled {name} buffer of {n_rows} rows to {spill_file}", **log_dic
+                )
+
+            else:
+                buffer = empty(n_rows, dtype=dtype)
+
+                self.log_writer.log(
+                    f"Allocated {name} buffer of {n_rows} rows in memory", **log_dic
+                )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return buffer
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def open(self, wafers, log_file):
+        """
+        Method Name :   open
+        Description :   This method opens the sink for a batch of wafers in the original wafer order
+
+        Output      :   The prediction and cluster buffers are allocated
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.open.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            self.wafers = wafers
+
+            self.rows = {}
+
+            self.predictions = self.get_buffer(
+                "predictions", len(wafers), int64, log_dic["log_file"]
+            )
+
+            self.clusters = self.get_buffer(
+                "clusters", len(wafers), int32, log_dic["log_file"]
+            )
+
+            self.log_writer.log(f"Opened sink for {len(wafers)} wafers", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def add(self, rows, predictions, cluster, log_file):
+        """
+        Method Name :   add
+        Description :   This method scatters the predictions of a cluster into the rows of the batch
+
+        Output      :   The predictions and cluster number are written to the buffers, the rows are kept per
+                        cluster
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.add.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            self.predictions[rows] = predictions
+
+            self.clusters[rows] = cluster
+
+            self.rows[cluster] = rows
+
+            self.log_writer.log(
+                f"Added {len(rows)} predictions for {cluster} cluster", **log_dic
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def to_df(self, log_file, rows=None):
+        """
+        Method Name :   to_df
+        Description :   This method gets the predictions of the batch, or of the given rows, as a dataframe
+
+        Output      :   A dataframe of wafer names and predictions is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.to_df.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            func = lambda x: x if rows is None else x[rows]
+
+            df = DataFrame(
+                {"Wafer": func(self.wafers), "Prediction": func(self.predictions)}
+            )
+
+            self.log_writer.log(f"Created a dataframe of {len(df)} results", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return df
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def write_output(self, df, fname, bucket, log_file):
+        """
+        Method Name :   write_output
+        Description :   This method writes the dataframe as a local csv file and uploads it to s3 bucket
+
+        Output      :   The csv file is uploaded to s3 bucket
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.write_output.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            makedirs(self.sink_dir, exist_ok=True)
+
+            local_fname = join(self.sink_dir, basename(fname))
+
+            df.to_csv(local_fname, index=None, header=True)
+
+            self.s3.upload_file(local_fname, fname, bucket, log_dic["log_file"])
+
+            self.log_writer.log(f"Uploaded {len(df)} results as {fname}", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def flush(self, fname, bucket, log_file):
+        """
+        Method Name :   flush
+        Description :   This method writes the predictions of the batch as one csv file, or as one csv file per
+                        cluster when partition by cluster is set, and removes the spilled buffers
+
+        Output      :   The prediction output of the batch is uploaded to s3 bucket
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.flush.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            if self.sink_config["partition_by_cluster"] is True:
+                fname_root, ext = splitext(fname)
+
+                for cluster in unique(self.clusters):
+                    rows = flatnonzero(self.clusters == cluster)
+
+                    df = self.to_df(log_dic["log_file"], rows=rows)
+
+                    self.write_output(
+                        df,
+                        f"{fname_root}-cluster{cluster}{ext}",
+                        bucket,
+                        log_dic["log_file"],
+                    )
+
+            else:
+                df = self.to_df(log_dic["log_file"])
+
+                self.write_output(df, fname, bucket, log_dic["log_file"])
+
+            self.log_writer.log(
+                f"Flushed predictions with partition by cluster as {self.sink_config['partition_by_cluster']}",
+                **log_dic,
+            )
+
+            for spill_file in self.spill_files:
+                remove(spill_file)
+
+            self.spill_files = []
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def flush_partials(self, fname, bucket, log_file):
+        """
+        Method Name :   flush_partials
+        Description :   This method writes the predictions of every cluster added to the sink as a partial csv
+                        file with the rows of the batch they belong to, so the partial outputs of the shards of a
+                        sharded prediction can be merged in the original wafer order
+
+        Output      :   A partial output per cluster is uploaded to s3 bucket
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.flush_partials.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            fname_root, ext = splitext(fname)
+
+            for cluster, rows in self.rows.items():
+                df = self.to_df(log_dic["log_file"], rows=rows)
+
+                df.insert(0, "row", rows)
+
+                self.write_output(
+                    df, f"{fname_root}-part{cluster}{ext}", bucket, log_dic["log_file"],
+                )
+
+            self.log_writer.log(
+                f"Flushed partial predictions of {len(self.rows)} clusters", **log_dic
+            )
+
+            for spill_file in self.spill_files:
+                remove(spill_file)
+
+            self.spill_files = []
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
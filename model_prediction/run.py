@@ -1,6 +1,12 @@
-from utils.logger import App_Logger
-from utils.main_utils import Main_Utils
+from json import dumps
+from uuid import uuid4
+
+from online_prediction import Online_Prediction
+from utils.bootstrap import get_log_writer, get_utils
 from utils.read_params import get_log_dic
+from wafer_core.shards import get_mode, run_shard_mode
+
+ONLINE = {}
 
 
 class Run:
@@ -12,9 +18,9 @@ class Run:
     """
 
     def __init__(self):
-        self.log_writer = App_Logger()
+        self.log_writer = get_log_writer()
 
-        self.utils = Main_Utils()
+        self.utils = get_utils()
 
     def predict_from_model(self):
         """
@@ -38,10 +44,9 @@ class Run:
 
             self.log_writer.log(f"Got {unique_clusters} clusters", **log_dic)
 
-            for i in unique_clusters:
-                result = self.utils.get_predictions(i, data, log_dic["log_file"])
+            sink = self.utils.get_predictions(data, log_dic["log_file"])
 
-                self.utils.upload_results(result, log_dic["log_file"])
+            self.utils.upload_results(sink, log_dic["log_file"])
 
             self.log_writer.log(
                 "Prediction file is created in io_files bucket", **log_dic
@@ -54,32 +59,142 @@ class Run:
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
+    def plan_shards(self):
+        """
+        Method Name :   plan_shards
+        Description :   This method gets the keys the prediction is sharded on, which are the clusters of the
+                        prediction data, the partial outputs of a previous sharded prediction are deleted
 
-if __name__ == "__main__":
+        Output      :   A sorted list of clusters is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.plan_shards.__name__, __file__, "pred"
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            unique_clusters, _ = self.utils.get_unique_clusters(log_dic["log_file"])
+
+            self.utils.delete_partials(log_dic["log_file"])
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return sorted(int(cluster) for cluster in unique_clusters)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def run_shard(self, keys):
+        """
+        Method Name :   run_shard
+        Description :   This method predicts the rows of the clusters of one shard with their cluster models
+
+        Output      :   The partial prediction outputs of the clusters are stored in s3 bucket
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.run_shard.__name__, __file__, "pred"
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            _, data = self.utils.get_unique_clusters(log_dic["log_file"])
+
+            sink = self.utils.get_predictions(data, log_dic["log_file"], clusters=keys)
+
+            self.utils.upload_partials(sink, log_dic["log_file"])
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def reduce_shards(self):
+        """
+        Method Name :   reduce_shards
+        Description :   This method merges the partial prediction outputs of the shards into the prediction
+                        output, once all the shards are predicted
+
+        Output      :   The prediction output is stored in s3 bucket and the partial outputs are deleted
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.reduce_shards.__name__, __file__, "pred"
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            sink = self.utils.merge_partials(log_dic["log_file"])
+
+            self.utils.upload_results(sink, log_dic["log_file"])
+
+            self.utils.delete_partials(log_dic["log_file"])
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+
+def lambda_handler(event, context):
     try:
-        run = Run()
+        mode = get_mode(event)
+
+        result = {}
 
-        run.predict_from_model()
+        if mode == "batch":
+            run = Run()
+
+            run.predict_from_model()
+
+        else:
+            result = run_shard_mode(Run(), mode, event)
+
+        return {
+            "statusCode": 200,
+            "body": dumps("Model Prediction Function executed"),
+            **result,
+        }
 
     except Exception as e:
         raise e
 
     finally:
-        utils = Main_Utils()
+        utils = get_utils()
 
         utils.upload_logs()
 
 
-def lambda_handler(event, context):
+def online_handler(event, context):
     try:
-        run = Run()
+        if "prediction" not in ONLINE:
+            ONLINE["prediction"] = Online_Prediction()
 
-        run.predict_from_model()
+        return ONLINE["prediction"].handle(event, "online")
 
     except Exception as e:
         raise e
 
     finally:
-        utils = Main_Utils()
+        utils = get_utils()
 
-        utils.upload_logs()
+        utils.upload_request_logs(
+            uuid4().hex if context is None else context.aws_request_id
+        )
+
+
+if __name__ == "__main__":
+    lambda_handler({}, None)
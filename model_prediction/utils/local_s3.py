@@ -0,0 +1,169 @@
+from datetime import datetime, timezone
+from hashlib import md5
+from io import BytesIO
+from shutil import copyfileobj
+from types import SimpleNamespace
+from uuid import uuid4
+
+from botocore.exceptions import ClientError
+
+
+class Local_S3_Object:
+    """
+    Description :   This class is the in-process stand in for the s3 object summary
+    Version     :   1.2
+
+    Revisions   :   Moved to setup to cloud
+    """
+
+    def __init__(self, bucket_name, key, body):
+        self.bucket_name = bucket_name
+
+        self.key = key
+
+        self.body = body
+
+        self.size = len(body)
+
+        self.e_tag = '"' + md5(body).hexdigest() + '"'
+
+        self.version_id = uuid4().hex
+
+        self.last_modified = datetime.now(timezone.utc)
+
+    def get(self):
+        return {
+            "Body": BytesIO(self.body),
+            "ETag": self.e_tag,
+            "VersionId": self.version_id,
+        }
+
+
+class Local_S3_Objects:
+    """
+    Description :   This class is the in-process stand in for the objects collection of a s3 bucket
+    Version     :   1.2
+
+    Revisions   :   Moved to setup to cloud
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    def all(self):
+        return [self.store[key] for key in sorted(self.store)]
+
+    def filter(self, Prefix=""):
+        return [obj for obj in self.all() if obj.key.startswith(Prefix)]
+
+
+class Local_S3_Bucket:
+    """
+    Description :   This class is the in-process stand in for the s3 bucket
+    Version     :   1.2
+
+    Revisions   :   Moved to setup to cloud
+    """
+
+    def __init__(self, name, store):
+        self.name = name
+
+        self.objects = Local_S3_Objects(store)
+
+    def __repr__(self):
+        return f"s3.Bucket(name='{self.name}')"
+
+
+class Local_S3_Client:
+    """
+    Description :   This class is the in-process stand in for the subset of the s3 client used by S3_Operation,
+                    the buckets are versioned and conditional gets fail with the error codes of s3
+    Version     :   1.2
+
+    Revisions   :   Moved to setup to cloud
+    """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+
+        self.versions = {}
+
+    def get_store(self, bucket):
+        return self.buckets.setdefault(bucket, {})
+
+    def put_object(self, Bucket, Key, Body):
+        body = Body.encode() if isinstance(Body, str) else bytes(Body)
+
+        obj = Local_S3_Object(Bucket, Key, body)
+
+        self.get_store(Bucket)[Key] = obj
+
+        self.versions[(Bucket, Key, obj.version_id)] = obj
+
+        return {"ETag": obj.e_tag, "VersionId": obj.version_id}
+
+    def get_object(self, Bucket, Key, VersionId=None, IfMatch=None, IfNoneMatch=None):
+        if VersionId is None:
+            obj = self.get_store(Bucket)[Key]
+
+        elif (Bucket, Key, VersionId) in self.versions:
+            obj = self.versions[(Bucket, Key, VersionId)]
+
+        else:
+            raise ClientError(
+                {"Error": {"Code": "NoSuchVersion", "Message": VersionId}}, "GetObject"
+            )
+
+        if IfMatch is not None and IfMatch.strip('"') != obj.e_tag.strip('"'):
+            raise ClientError(
+                {
+                    "Error": {
+                        "Code": "PreconditionFailed",
+                        "Message": "At least one of the pre-conditions you specified did not hold",
+                    }
+                },
+                "GetObject",
+            )
+
+        if IfNoneMatch is not None and IfNoneMatch.strip('"') == obj.e_tag.strip('"'):
+            raise ClientError(
+                {"Error": {"Code": "304", "Message": "Not Modified"}}, "GetObject"
+            )
+
+        return obj.get()
+
+    def head_object(self, Bucket, Key):
+        obj = self.get_store(Bucket)[Key]
+
+        return {
+            "ETag": obj.e_tag,
+            "ContentLength": obj.size,
+            "LastModified": obj.last_modified,
+            "VersionId": obj.version_id,
+        }
+
+    def upload_file(self, Filename, Bucket, Key):
+        with open(Filename, "rb") as f:
+            self.put_object(Bucket, Key, f.read())
+
+    def download_file(self, Bucket, Key, Filename):
+        with open(Filename, "wb") as f:
+            copyfileobj(self.get_object(Bucket, Key)["Body"], f)
+
+
+class Local_S3_Resource:
+    """
+    Description :   This class is an in-process stand in for the boto3 s3 resource, it is passed to S3_Operation
+                    for running the service locally without aws
+    Version     :   1.2
+
+    Revisions   :   Moved to setup to cloud
+    """
+
+    def __init__(self):
+        self.buckets = {}
+
+        self.meta = SimpleNamespace(client=Local_S3_Client(self.buckets))
+
+    def Bucket(self, name):
+        return Local_S3_Bucket(name, self.meta.client.get_store(name))
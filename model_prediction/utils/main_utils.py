@@ -1,11 +1,14 @@
 from datetime import datetime
+from os import listdir
+from os.path import join, splitext
 from shutil import rmtree
 
-from pandas import DataFrame
-
+from model_registry import Model_Registry
+from prediction_sink import Prediction_Sink
 from s3_operations import S3_Operation
 from utils.logger import App_Logger
 from utils.read_params import get_log_dic, read_params
+from wafer_core.metrics import write_run_summary
 
 
 class Main_Utils:
@@ -19,6 +22,8 @@ class Main_Utils:
     def __init__(self):
         self.s3 = S3_Operation()
 
+        self.registry = Model_Registry()
+
         self.log_writer = App_Logger()
 
         self.config = read_params()
@@ -47,7 +52,9 @@ class Main_Utils:
         try:
             log_folder = "/tmp" + "/" + self.log_dir
 
-            self.s3.upload_folder(self.log_dir, "logs", log_dic["log_file"])
+            write_run_summary(log_folder)
+
+            self.s3.upload_folder(log_folder, "logs", log_dic["log_file"])
 
             self.log_writer.log(f"Uploaded logs to logs s3 bucket", **log_dic)
 
@@ -60,10 +67,59 @@ class Main_Utils:
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
+    def upload_request_logs(self, request_id):
+        """
+        Method Name :   upload_request_logs
+        Description :   This method uploads the logs of one online request to s3 bucket with the request id in the
+                        file names, so the requests of a warm container do not overwrite each other, and clears
+                        the log folder and the metrics for the next request
+
+        Output      :   The logs of the request are uploaded to s3 bucket
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.upload_request_logs.__name__,
+            __file__,
+            "upload",
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            log_folder = "/tmp" + "/" + self.log_dir
+
+            write_run_summary(log_folder)
+
+            for f in listdir(log_folder):
+                self.s3.upload_file(
+                    join(log_folder, f),
+                    log_folder + "/" + request_id + "-" + f,
+                    "logs",
+                    log_dic["log_file"],
+                    delete=False,
+                )
+
+            self.log_writer.log(
+                f"Uploaded logs of {request_id} request to logs s3 bucket", **log_dic
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            self.log_writer.stop_log()
+
+            rmtree(log_folder)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
     def find_correct_model_file(self, cluster_number, bucket, log_file):
         """
         Method Name :   find_correct_model_file
-        Description :   This method gets correct model file based on cluster number during prediction
+        Description :   This method gets correct model file based on cluster number from the production manifest
         
         Output      :   A correct model file is found 
         On Failure  :   Write an exception log and then raise an exception
@@ -81,22 +137,13 @@ class Main_Utils:
         self.log_writer.start_log("start", **log_dic)
 
         try:
-            list_of_files = self.s3.get_files_from_folder(
-                "prod_model", bucket, log_dic["log_file"]
-            )
-
-            for file in list_of_files:
-                try:
-                    if file.split("-")[-1].index(str(cluster_number)) != -1:
-                        model_name = file
-
-                except:
-                    continue
+            manifest = self.registry.get_manifest(log_dic["log_file"])
 
-            model_name = model_name.split("/")[1].split(".")[0]
+            model_name = manifest[cluster_number]["model"]
 
             self.log_writer.log(
-                f"Got {model_name} from prod model folder in {bucket} bucket", **log_dic
+                f"Got {model_name} from production manifest in {bucket} bucket",
+                **log_dic,
             )
 
             self.log_writer.start_log("exit", **log_dic)
@@ -131,13 +178,7 @@ class Main_Utils:
 
             self.log_writer.log("Got the prediction input csv file", **log_dic)
 
-            kmeans_model = self.s3.load_model(
-                "KMeans",
-                "model",
-                log_dic["log_file"],
-                model_dir="prod_model",
-                model_pattern=True,
-            )
+            kmeans_model = self.registry.load_model("KMeans", log_dic["log_file"])
 
             self.log_writer.log("Got kmeans model", **log_dic)
 
@@ -185,9 +226,7 @@ class Main_Utils:
                 "pred_input_file_preprocess", log_dic["log_file"]
             )
 
-            data = self.s3.read_csv(
-                fname, "feature_store", log_dic["log_file"], fidx=True
-            )
+            data = self.s3.read_csv(fname, "feature_store", log_dic["log_file"])
 
             self.log_writer.log("Got the prediction input file", **log_dic)
 
@@ -198,7 +237,19 @@ class Main_Utils:
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
-    def get_predictions(self, idx, data, log_file):
+    def get_predictions(self, data, log_file, clusters=None):
+        """
+        Method Name :   get_predictions
+        Description :   This method gets the predictions for the prediction data, rows are grouped by cluster
+                        once and each cluster model predicts only its rows into the prediction sink, only the
+                        rows of the given clusters are predicted when clusters is set
+
+        Output      :   A prediction sink holding the predictions in the original wafer order is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
         log_dic = get_log_dic(
             self.__class__.__name__, self.get_predictions.__name__, __file__, log_file
         )
@@ -206,52 +257,160 @@ class Main_Utils:
         self.log_writer.start_log("start", **log_dic)
 
         try:
-            cluster_data = data[data["clusters"] == idx]
+            features = data.drop(labels=["Wafer", "clusters"], axis=1)
 
-            wafer_names = list(cluster_data["Wafer"])
+            cluster_rows = data.groupby("clusters", sort=False).indices
 
-            cluster_data = data.drop(labels=["Wafer"], axis=1)
+            cluster_rows = {
+                idx: rows
+                for idx, rows in cluster_rows.items()
+                if clusters is None or idx in clusters
+            }
 
-            cluster_data = cluster_data.drop(["clusters"], axis=1)
+            self.log_writer.log(
+                f"Grouped {len(data)} rows into {len(cluster_rows)} clusters", **log_dic
+            )
 
-            self.log_writer.log("Got cluster data", **log_dic)
+            sink = Prediction_Sink()
 
-            model_name = self.find_correct_model_file(idx, "model", log_dic["log_file"])
+            sink.open(data["Wafer"].to_numpy(), log_dic["log_file"])
+
+            for idx, rows in cluster_rows.items():
+                model = self.registry.load_model(idx, log_dic["log_file"])
+
+                sink.add(
+                    rows, model.predict(features.iloc[rows]), idx, log_dic["log_file"]
+                )
 
             self.log_writer.log(
-                f"Found the correct model file based on {idx} cluster number", **log_dic
+                "Added the predictions of all clusters to sink", **log_dic
             )
 
-            model = self.s3.load_model(
-                model_name,
-                "model",
-                log_dic["log_file"],
-                model_dir="prod_model",
-                model_pattern=True,
+            self.log_writer.start_log("exit", **log_dic)
+
+            return sink
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def upload_results(self, sink, log_file):
+        """
+        Method Name :   upload_results
+        Description :   This method flushes the prediction sink as the prediction output to s3 bucket
+
+        Output      :   The prediction output of the batch is uploaded to s3 bucket
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.upload_results.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            fname = self.get_file_with_timestamp("pred_output", log_dic["log_file"])
+
+            sink.flush(fname, "io_files", log_dic["log_file"])
+
+            self.log_writer.log("Uploaded results as csv file to s3 bucket", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def get_partial_fnames(self, log_file):
+        """
+        Method Name :   get_partial_fnames
+        Description :   This method gets the partial prediction outputs the shards of a sharded prediction
+                        uploaded to io_files bucket
+
+        Output      :   A sorted list of partial prediction outputs is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.get_partial_fnames.__name__,
+            __file__,
+            log_file,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            fname = self.get_file_with_timestamp("pred_output", log_dic["log_file"])
+
+            fname_root, ext = splitext(fname)
+
+            files = self.s3.get_files_from_folder(
+                fname_root + "-part", "io_files", log_dic["log_file"]
             )
 
-            result = list(model.predict(cluster_data))
+            partial_fnames = sorted(f for f in files if f.endswith(ext))
 
             self.log_writer.log(
-                "Got the list of predictions for the cluster data", **log_dic
+                f"Got {len(partial_fnames)} partial prediction outputs", **log_dic
             )
 
-            result = DataFrame(
-                list(zip(wafer_names, result)), columns=["Wafer", "Prediction"]
-            )
+            self.log_writer.start_log("exit", **log_dic)
 
-            self.log_writer.log("Created a dataframe of results", **log_dic)
+            return partial_fnames
 
-            self.log_writer.start_log("exit", **log_dic)
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
 
-            return result
+    def delete_partials(self, log_file):
+        """
+        Method Name :   delete_partials
+        Description :   This method deletes the partial prediction outputs from io_files bucket, before the shards
+                        of a sharded prediction are run and after they are merged
+
+        Output      :   The partial prediction outputs are deleted from s3 bucket
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.delete_partials.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            partial_fnames = self.get_partial_fnames(log_dic["log_file"])
+
+            self.s3.delete_files(partial_fnames, "io_files", log_dic["log_file"])
+
+            self.log_writer.log(
+                f"Deleted {len(partial_fnames)} partial prediction outputs", **log_dic
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
 
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
-    def upload_results(self, result_df, log_file):
+    def upload_partials(self, sink, log_file):
+        """
+        Method Name :   upload_partials
+        Description :   This method flushes the predictions of the clusters of a shard as partial prediction
+                        outputs to s3 bucket
+
+        Output      :   The partial prediction outputs of the shard are uploaded to s3 bucket
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
         log_dic = get_log_dic(
-            self.__class__.__name__, self.upload_results.__name__, __file__, log_file
+            self.__class__.__name__, self.upload_partials.__name__, __file__, log_file
         )
 
         self.log_writer.start_log("start", **log_dic)
@@ -259,14 +418,73 @@ class Main_Utils:
         try:
             fname = self.get_file_with_timestamp("pred_output", log_dic["log_file"])
 
-            self.s3.upload_df_as_csv(
-                result_df, fname, fname, "io_files", log_dic["log_file"], fidx=True
+            sink.flush_partials(fname, "io_files", log_dic["log_file"])
+
+            self.log_writer.log(
+                "Uploaded partial results as csv files to s3 bucket", **log_dic
             )
 
-            self.log_writer.log("Uploaded results as csv file to s3 bucket", **log_dic)
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def merge_partials(self, log_file):
+        """
+        Method Name :   merge_partials
+        Description :   This method merges the partial prediction outputs of the shards into a prediction sink in
+                        the original wafer order, every row of the prediction input has to be predicted by
+                        exactly one shard
+
+        Output      :   A prediction sink holding the predictions of all the shards is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.merge_partials.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            data = self.get_pred_input_file(log_dic["log_file"])
+
+            sink = Prediction_Sink()
+
+            sink.open(data["Wafer"].to_numpy(), log_dic["log_file"])
+
+            merged_rows = []
+
+            for fname in self.get_partial_fnames(log_dic["log_file"]):
+                df = self.s3.read_csv(fname, "io_files", log_dic["log_file"])
+
+                cluster = int(splitext(fname)[0].rpartition("-part")[2])
+
+                sink.add(
+                    df["row"].to_numpy(),
+                    df["Prediction"].to_numpy(),
+                    cluster,
+                    log_dic["log_file"],
+                )
+
+                merged_rows += df["row"].tolist()
+
+            if len(merged_rows) != len(data) or len(set(merged_rows)) != len(data):
+                raise Exception(
+                    f"Partial prediction outputs have {len(merged_rows)} rows, prediction input has {len(data)} rows"
+                )
+
+            self.log_writer.log(
+                f"Merged {len(merged_rows)} rows of {len(sink.rows)} clusters",
+                **log_dic,
+            )
 
             self.log_writer.start_log("exit", **log_dic)
 
+            return sink
+
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
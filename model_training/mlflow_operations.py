@@ -1,10 +1,14 @@
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from os import environ
+from time import time
 
-from mlflow import log_metric, log_param, set_experiment, set_tracking_uri
-from mlflow.sklearn import log_model
+from mlflow import active_run, set_experiment, set_tracking_uri
+from mlflow.entities import Metric, Param, RunTag
+from mlflow.exceptions import MlflowException
+from mlflow.tracking import MlflowClient
 from utils.logger import App_Logger
 from utils.read_params import get_log_dic, read_params
+from wafer_core.bootstrap import get_current_date
 
 
 class MLFlow_Operation:
@@ -24,7 +28,19 @@ class MLFlow_Operation:
 
         self.mlflow_config = self.config["mlflow_config"]
 
-        self.current_date = f"{datetime.now().strftime('%Y-%m-%d')}"
+        self.batch = {"params": {}, "metrics": {}, "tags": {}}
+
+        self.async_artifacts = self.mlflow_config["async_artifacts"]
+
+        self.executor = None
+
+        self.artifact_futures = []
+
+        self.client = None
+
+    @property
+    def current_date(self):
+        return get_current_date()
 
     def set_mlflow_experiment(self, exp_name):
         """
@@ -81,6 +97,8 @@ class MLFlow_Operation:
         try:
             set_tracking_uri(environ["MLFLOW_TRACKING_URI"])
 
+            self.client = MlflowClient(tracking_uri=environ["MLFLOW_TRACKING_URI"])
+
             self.log_writer.log("Set mlflow tracking uri", **log_dic)
 
             self.log_writer.start_log("exit", **log_dic)
@@ -88,12 +106,15 @@ class MLFlow_Operation:
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
-    def log_sklearn_model(self, model, model_name):
+    def register_model_version(self, model_name, model_uri, run_id):
         """
-        Method Name :   log_sklearn_model
-        Description :   This method logs the model to mlflow server
+        Method Name :   register_model_version
+        Description :   This method registers the model file saved in s3 bucket as a new version of the
+                        registered model, the version points to the s3 uri so the model is not serialized
+                        or uploaded again, the run is passed explicitly so it can run on a background thread
+                        after the run has ended
 
-        Output      :   A model is logged to the mlflow server
+        Output      :   A model version is created in the mlflow server with the s3 uri as source
         On Failure  :   Write an exception log and then raise an exception
 
         Version     :   1.2
@@ -101,7 +122,7 @@ class MLFlow_Operation:
         """
         log_dic = get_log_dic(
             self.__class__.__name__,
-            self.log_sklearn_model.__name__,
+            self.register_model_version.__name__,
             __file__,
             self.log_file,
         )
@@ -109,14 +130,68 @@ class MLFlow_Operation:
         self.log_writer.start_log("start", **log_dic)
 
         try:
-            log_model(
-                sk_model=model,
-                serialization_format=self.mlflow_config["serialization_format"],
-                registered_model_name=model_name,
-                artifact_path=model_name,
+            try:
+                self.client.create_registered_model(model_name)
+
+            except MlflowException as e:
+                if e.error_code != "RESOURCE_ALREADY_EXISTS":
+                    raise e
+
+            mv = self.client.create_model_version(model_name, model_uri, run_id=run_id)
+
+            self.log_writer.log(
+                f"Registered {model_uri} as version {mv.version} of {model_name} model for {run_id} run",
+                **log_dic,
             )
 
-            self.log_writer.log(f"Logged {model_name} model in mlflow", **log_dic)
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def log_model_uri(self, model_name, model_uri):
+        """
+        Method Name :   log_model_uri
+        Description :   This method adds the s3 uri of the model to the batch of the active run and registers
+                        it as model version, on a background thread when async_artifacts is set so training
+                        of the next cluster is not blocked
+
+        Output      :   A model version is registered in the mlflow server or queued for the background thread
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.log_model_uri.__name__,
+            __file__,
+            self.log_file,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            run_id = active_run().info.run_id
+
+            self.set_model_tag(model_name, "model_uri", model_uri)
+
+            if self.async_artifacts is True:
+                if self.executor is None:
+                    self.executor = ThreadPoolExecutor(max_workers=1)
+
+                self.artifact_futures.append(
+                    self.executor.submit(
+                        self.register_model_version, model_name, model_uri, run_id
+                    )
+                )
+
+                self.log_writer.log(
+                    f"Queued {model_name} model for registration in mlflow", **log_dic
+                )
+
+            else:
+                self.register_model_version(model_name, model_uri, run_id)
 
             self.log_writer.start_log("exit", **log_dic)
 
@@ -126,9 +201,9 @@ class MLFlow_Operation:
     def log_model_metric(self, model_name, metric):
         """
         Method Name :   log_model_metric
-        Description :   This method logs the model metric to mlflow server
+        Description :   This method adds the model metric to the batch of the active run
 
-        Output      :   A model metric is logged to mlflow server
+        Output      :   A model metric is added to the batch, it is sent to mlflow server by flush_batch
         On Failure  :   Write an exception log and then raise an exception
 
         Version     :   1.2
@@ -146,9 +221,11 @@ class MLFlow_Operation:
         try:
             model_score_name = f"{model_name}-best_score"
 
-            log_metric(model_score_name, metric)
+            self.batch["metrics"][model_score_name] = Metric(
+                model_score_name, metric, int(time() * 1000), 0
+            )
 
-            self.log_writer.log(f"{model_score_name} logged in mlflow", **log_dic)
+            self.log_writer.log(f"{model_score_name} added to batch", **log_dic)
 
             self.log_writer.start_log("exit", **log_dic)
 
@@ -158,9 +235,9 @@ class MLFlow_Operation:
     def log_model_param(self, model, model_name, param):
         """
         Method Name :   log_model_param
-        Description :   This method logs the model param to mlflow server
+        Description :   This method adds the model param to the batch of the active run
 
-        Output      :   A model param is logged to mlflow server
+        Output      :   A model param is added to the batch, it is sent to mlflow server by flush_batch
         On Failure  :   Write an exception log and then raise an exception
 
         Version     :   1.2
@@ -178,19 +255,23 @@ class MLFlow_Operation:
         try:
             model_param_name = model_name + f"-{param}"
 
-            log_param(model_param_name, model.__dict__[param])
+            self.batch["params"][model_param_name] = Param(
+                model_param_name, str(model.__dict__[param])
+            )
 
-            self.log_writer.log(f"{model_param_name} logged in mlflow", **log_dic)
+            self.log_writer.log(f"{model_param_name} added to batch", **log_dic)
 
             self.log_writer.start_log("exit", **log_dic)
 
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
-    def log_all_for_model(self, model, model_score, idx):
+    def log_all_for_model(self, model, model_score, idx, model_uri):
         """
         Method Name :   log_all_for_model
-        Description :   This method logs model,model params and model score to mlflow server
+        Description :   This method logs model,model params and model score to mlflow server, the model is
+                        registered by the s3 uri it was saved to, the params, score and tags are batched until
+                        flush_batch is called for the run
 
         Output      :   Model,model parameters and model score are logged to mlflow server
         On Failure  :   Write an exception log and then raise an exception
@@ -225,7 +306,7 @@ class MLFlow_Operation:
                 for param in model_params_list
             ]
 
-            self.log_sklearn_model(model, model_name)
+            self.log_model_uri(model_name, model_uri)
 
             self.log_model_metric(model_name, float(model_score))
 
@@ -238,3 +319,166 @@ class MLFlow_Operation:
 
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
+
+    def log_best_model(self, model, model_score, idx, train_id):
+        """
+        Method Name :   log_best_model
+        Description :   This method adds the cluster, training run id, training date and best model name as tags
+                        and the best score as metric to the batch of the active run, so the best model of a
+                        cluster can be found with a filtered search of runs instead of reading all the runs
+
+        Output      :   The best model tags and metric are added to the batch of the active run
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.log_best_model.__name__,
+            __file__,
+            self.log_file,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            model_name = self.current_date + "-" + model.__class__.__name__ + str(idx)
+
+            tags = {
+                "cluster": str(idx),
+                "train_id": train_id,
+                "train_date": self.current_date,
+                "best_model": model_name,
+            }
+
+            for key, value in tags.items():
+                self.batch["tags"][key] = RunTag(key, value)
+
+            self.batch["metrics"]["best_score"] = Metric(
+                "best_score", float(model_score), int(time() * 1000), 0
+            )
+
+            self.log_writer.log(
+                f"{model_name} added to batch as best model of cluster {idx}", **log_dic
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def set_model_tag(self, model_name, key, value):
+        """
+        Method Name :   set_model_tag
+        Description :   This method adds the model tag to the batch of the active run
+
+        Output      :   A model tag is added to the batch, it is sent to mlflow server by flush_batch
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.set_model_tag.__name__,
+            __file__,
+            self.log_file,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            model_tag_name = model_name + f"-{key}"
+
+            self.batch["tags"][model_tag_name] = RunTag(model_tag_name, value)
+
+            self.log_writer.log(f"{model_tag_name} added to batch", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def flush_batch(self):
+        """
+        Method Name :   flush_batch
+        Description :   This method sends the batched params, metrics and tags of the active run to mlflow
+                        server with log_batch, in chunks of 100 entities of each kind which is the limit
+                        of a single log_batch request
+
+        Output      :   The batch is logged to mlflow server and cleared
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.flush_batch.__name__, __file__, self.log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            run_id = active_run().info.run_id
+
+            params = list(self.batch["params"].values())
+
+            metrics = list(self.batch["metrics"].values())
+
+            tags = list(self.batch["tags"].values())
+
+            n_entities = max(len(params), len(metrics), len(tags))
+
+            for i in range(0, n_entities, 100):
+                self.client.log_batch(
+                    run_id,
+                    metrics=metrics[i : i + 100],
+                    params=params[i : i + 100],
+                    tags=tags[i : i + 100],
+                )
+
+            self.batch = {"params": {}, "metrics": {}, "tags": {}}
+
+            self.log_writer.log(
+                f"Logged {len(params)} params, {len(metrics)} metrics and {len(tags)} tags for {run_id} run",
+                **log_dic,
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def wait_for_artifacts(self):
+        """
+        Method Name :   wait_for_artifacts
+        Description :   This method waits for the models queued for the background thread to be registered
+
+        Output      :   All the queued models are registered in mlflow server
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.wait_for_artifacts.__name__,
+            __file__,
+            self.log_file,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            futures, self.artifact_futures = self.artifact_futures, []
+
+            for future in futures:
+                future.result()
+
+            self.log_writer.log(f"Registered {len(futures)} queued models", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
@@ -1,7 +1,10 @@
+from json import dumps
+
 from tuner import Model_Finder
-from utils.logger import App_Logger
-from utils.main_utils import Main_Utils
+from utils.bootstrap import get_log_writer, get_utils
 from utils.read_params import get_log_dic
+from wafer_core.shards import get_mode, run_cached_shard_mode
+from wafer_core.stage_cache import Stage_Cache
 
 
 class Run:
@@ -15,9 +18,9 @@ class Run:
     def __init__(self):
         self.model = Model_Finder("model_train")
 
-        self.utils = Main_Utils()
+        self.utils = get_utils()
 
-        self.log_writer = App_Logger()
+        self.log_writer = get_log_writer()
 
     def training_model(self):
         """
@@ -58,17 +61,83 @@ class Run:
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
+    def plan_shards(self):
+        """
+        Method Name :   plan_shards
+        Description :   This method starts the training run and gets the keys the model training is sharded on,
+                        which are the clusters of the training data
 
-if __name__ == "__main__":
+        Output      :   A list of clusters is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        self.utils.start_train_run("model", "model_train")
+
+        return list(range(self.utils.get_number_of_clusters("model_train")))
+
+    def run_shard(self, keys):
+        """
+        Method Name :   run_shard
+        Description :   This method trains and logs the models of the clusters of one shard
+
+        Output      :   The models of the clusters are trained, logged and stored in s3 bucket
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        self.model.train_clusters(keys)
+
+    def reduce_shards(self):
+        """
+        Method Name :   reduce_shards
+        Description :   This method logs the kmeans model to mlflow, once the models of all the clusters are
+                        trained
+
+        Output      :   The kmeans model uri is logged to mlflow
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        self.model.log_kmeans_model()
+
+
+def lambda_handler(event, context):
     try:
-        run = Run()
+        mode = get_mode(event)
 
-        run.training_model()
+        result = {}
+
+        if mode == "batch":
+            cache = Stage_Cache(event)
+
+            if cache.is_cached() is False:
+                run = Run()
+
+                run.training_model()
+
+                cache.record()
+
+        else:
+            result = run_cached_shard_mode(Run, mode, event)
+
+        return {
+            "statusCode": 200,
+            "body": dumps("Model Training Function executed"),
+            **result,
+        }
 
     except Exception as e:
         raise e
 
     finally:
-        utils = Main_Utils()
+        utils = get_utils()
 
         utils.upload_logs()
+
+
+if __name__ == "__main__":
+    lambda_handler({}, None)
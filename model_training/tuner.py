@@ -1,5 +1,3 @@
-from datetime import datetime
-
 from mlflow import end_run, start_run
 from sklearn.model_selection import train_test_split
 
@@ -8,6 +6,7 @@ from s3_operations import S3_Operation
 from utils.logger import App_Logger
 from utils.main_utils import Main_Utils
 from utils.read_params import get_log_dic, read_params
+from wafer_core.bootstrap import get_current_date
 
 
 class Model_Finder:
@@ -35,7 +34,9 @@ class Model_Finder:
 
         self.s3 = S3_Operation()
 
-        self.current_date = f"{datetime.now().strftime('%Y-%m-%d')}"
+    @property
+    def current_date(self):
+        return get_current_date()
 
     def get_trained_models(self, X_data, Y_data):
         log_dic = get_log_dic(
@@ -73,7 +74,7 @@ class Model_Finder:
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
-    def train_and_log_models(self, X_data, Y_data, idx):
+    def train_and_log_models(self, X_data, Y_data, idx, train_id):
         """
         Method Name :   train_and_log_models
         Description :   This methods trains all the models based on train data and used mlflow to log all the models
@@ -103,11 +104,17 @@ class Model_Finder:
 
                 self.model_score = tm[1]
 
-                self.s3.save_model(
+                model_uri = self.s3.save_model(
                     self.model, "train_model", "model", log_dic["log_file"], idx=idx
                 )
 
-                self.mlflow_op.log_all_for_model(self.model, self.model_score, idx)
+                self.mlflow_op.log_all_for_model(
+                    self.model, self.model_score, idx, model_uri
+                )
+
+            best_model, best_score = max(lst, key=lambda tm: tm[1])
+
+            self.mlflow_op.log_best_model(best_model, best_score, idx, train_id)
 
             self.log_writer.log(
                 "Saved and logged all trained models to mlflow", **log_dic
@@ -118,10 +125,21 @@ class Model_Finder:
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
-    def perform_training(self, lst_clusters):
+    def log_kmeans_model(self):
+        """
+        Method Name :   log_kmeans_model
+        Description :   This method logs the uri of the kmeans model the training data was clustered with to mlflow
+                        and waits for the kmeans model to be registered
+
+        Output      :   The kmeans model uri is logged and the kmeans model is registered in mlflow
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
         log_dic = get_log_dic(
             self.__class__.__name__,
-            self.perform_training.__name__,
+            self.log_kmeans_model.__name__,
             __file__,
             self.log_file,
         )
@@ -141,12 +159,58 @@ class Model_Finder:
 
             self.mlflow_op.set_mlflow_experiment("exp_name")
 
+            kmeans_model_uri = self.s3.get_model_uri(
+                kmeans_model_name + self.config["save_format"],
+                "train_model",
+                "model",
+                log_dic["log_file"],
+            )
+
             with start_run(run_name=self.mlflow_config["run_name"]):
-                self.mlflow_op.log_sklearn_model(kmeans_model, kmeans_model_name)
+                self.mlflow_op.log_model_uri(kmeans_model_name, kmeans_model_uri)
+
+                self.mlflow_op.flush_batch()
 
                 end_run()
 
-            for i in range(lst_clusters):
+            ## the kmeans model is registered in the background, reduce mode returns right after this
+            self.mlflow_op.wait_for_artifacts()
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def train_clusters(self, clusters):
+        """
+        Method Name :   train_clusters
+        Description :   This method trains and logs the models of the given clusters, each cluster in a mlflow run
+                        of its own tagged with the id of the current training run, so the clusters can be trained
+                        by different shards
+
+        Output      :   The models of the clusters are trained, saved to s3 bucket and logged to mlflow
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.train_clusters.__name__,
+            __file__,
+            self.log_file,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            self.mlflow_op.set_mlflow_tracking_uri()
+
+            self.mlflow_op.set_mlflow_experiment("exp_name")
+
+            train_id = self.utils.get_train_id("model", log_dic["log_file"])
+
+            for i in clusters:
                 cluster_feat = self.utils.get_cluster_features(i, log_dic["log_file"])
 
                 cluster_label = self.utils.get_cluster_targets(i, log_dic["log_file"])
@@ -156,7 +220,35 @@ class Model_Finder:
                 )
 
                 with start_run(run_name=self.mlflow_config["run_name"] + str(i)):
-                    self.train_and_log_models(cluster_feat, cluster_label, idx=i)
+                    self.train_and_log_models(
+                        cluster_feat, cluster_label, idx=i, train_id=train_id
+                    )
+
+                    self.mlflow_op.flush_batch()
+
+            self.mlflow_op.wait_for_artifacts()
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def perform_training(self, lst_clusters):
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.perform_training.__name__,
+            __file__,
+            self.log_file,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            self.utils.start_train_run("model", log_dic["log_file"])
+
+            self.log_kmeans_model()
+
+            self.train_clusters(range(lst_clusters))
 
             self.log_writer.start_log("exit", **log_dic)
 
@@ -1,5 +1,5 @@
-from datetime import datetime
 from shutil import rmtree
+from uuid import uuid4
 
 import xgboost
 from sklearn.metrics import accuracy_score, roc_auc_score
@@ -9,6 +9,8 @@ from sklearn.utils import all_estimators
 from s3_operations import S3_Operation
 from utils.logger import App_Logger
 from utils.read_params import get_log_dic, read_params
+from wafer_core.bootstrap import get_current_date
+from wafer_core.metrics import write_run_summary
 
 
 class Main_Utils:
@@ -28,12 +30,16 @@ class Main_Utils:
 
         self.tuner_kwargs = self.config["model_utils"]
 
-        self.current_date = f"{datetime.now().strftime('%Y-%m-%d')}"
+        self.files = self.config["files"]
 
         self.s3 = S3_Operation()
 
         self.log_writer = App_Logger()
 
+    @property
+    def current_date(self):
+        return get_current_date()
+
     def upload_logs(self):
         """
         Method Name :   upload_logs
@@ -54,6 +60,8 @@ class Main_Utils:
         try:
             log_folder = "/tmp" + "/" + self.log_dir
 
+            write_run_summary(log_folder)
+
             self.s3.upload_folder(log_folder, "logs", log_dic["log_file"])
 
             self.log_writer.log("Uploaded logs to s3 bucket", **log_dic)
@@ -208,6 +216,78 @@ class Main_Utils:
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
+    def start_train_run(self, bucket, log_file):
+        """
+        Method Name :   start_train_run
+        Description :   This method starts a training run by writing a new training run id to the train run marker
+                        in s3 bucket, the cluster runs of the training are tagged with it so load prod model
+                        picks the runs of this training whatever day it runs on
+
+        Output      :   The training run id is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.start_train_run.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            train_run = {
+                "train_id": self.current_date + "-" + uuid4().hex,
+                "train_date": self.current_date,
+            }
+
+            self.s3.upload_json(
+                train_run, self.files["train_run"], bucket, log_dic["log_file"]
+            )
+
+            self.log_writer.log(
+                f"Started {train_run['train_id']} training run", **log_dic
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return train_run["train_id"]
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def get_train_id(self, bucket, log_file):
+        """
+        Method Name :   get_train_id
+        Description :   This method gets the id of the current training run from the train run marker in s3
+                        bucket, so the shards of a training tag their cluster runs with the same id
+
+        Output      :   The training run id is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.get_train_id.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            train_id = self.s3.read_json("train_run", bucket, log_dic["log_file"])[
+                "train_id"
+            ]
+
+            self.log_writer.log(f"Got {train_id} training run", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return train_id
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
     def get_cluster_features(self, cluster_num, log_file):
         """
         Method Name :   get_cluster_features
@@ -1,7 +1,6 @@
 from data_loader_pred import Data_Getter_Pred
 from preprocessing import Preprocessor
-from utils.logger import App_Logger
-from utils.main_utils import Main_Utils
+from utils.bootstrap import get_log_writer, get_utils
 from utils.read_params import get_log_dic
 
 
@@ -14,13 +13,13 @@ class Run:
     """
 
     def __init__(self):
-        self.utils = Main_Utils()
+        self.utils = get_utils()
 
         self.data_getter_pred = Data_Getter_Pred("preprocess_pred")
 
         self.preprocess = Preprocessor("preprocess_pred")
 
-        self.log_writer = App_Logger()
+        self.log_writer = get_log_writer()
 
     def run_preprocess(self):
         """
@@ -91,6 +90,6 @@ if __name__ == "__main__":
         raise e
 
     finally:
-        utils = Main_Utils()
+        utils = get_utils()
 
         utils.upload_logs()
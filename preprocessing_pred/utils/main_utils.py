@@ -7,6 +7,7 @@ from pandas import DataFrame
 from s3_operations import S3_Operation
 from utils.logger import App_Logger
 from utils.read_params import get_log_dic, read_params
+from wafer_core.metrics import write_run_summary
 
 
 class Main_Utils:
@@ -48,7 +49,9 @@ class Main_Utils:
         try:
             log_folder = "/tmp" + "/" + self.log_dir
 
-            self.s3.upload_folder(self.log_dir, "logs", log_dic["log_file"])
+            write_run_summary(log_folder)
+
+            self.s3.upload_folder(log_folder, "logs", log_dic["log_file"])
 
             self.log_writer.log("Uploaded logs to logs bucket", **log_dic)
 
@@ -83,7 +86,7 @@ class Main_Utils:
             fname = self.get_file_with_timestamp("null_values", log_dic["log_file"])
 
             self.s3.upload_df_as_csv(
-                null_df, fname, fname, "io_files", log_dic["log_file"], fidx=True
+                null_df, fname, fname, "io_files", log_dic["log_file"]
             )
 
             self.log_writer.log("Uploaded null values csv file to s3 bucket", **log_dic)
@@ -109,7 +112,7 @@ class Main_Utils:
             )
 
             self.s3.upload_df_as_csv(
-                data, fname, fname, "feature_store", log_dic["log_file"], fidx=True
+                data, fname, fname, "feature_store", log_dic["log_file"]
             )
 
             self.log_writer.log("Uploaded preprocessed data to s3 bucket", **log_dic)
@@ -43,9 +43,7 @@ class Data_Getter_Train:
                 "train_export", log_dic["log_file"]
             )
 
-            df = self.s3.read_csv(
-                ip_fname, "feature_store", log_dic["log_file"], fidx=True
-            )
+            df = self.s3.read_csv(ip_fname, "feature_store", log_dic["log_file"])
 
             self.log_writer.log(
                 "Training data loaded from feature store bucket", **log_dic
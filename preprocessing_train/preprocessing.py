@@ -31,6 +31,8 @@ class Preprocessor:
 
         self.le = LabelEncoder()
 
+        self.imputer = None
+
     def remove_columns(self, data, columns):
         """
         Method Name :   remove_columns
@@ -178,6 +180,8 @@ class Preprocessor:
 
             self.new_array = imputer.fit_transform(self.data)
 
+            self.imputer = imputer
+
             self.new_data = DataFrame(data=self.new_array, columns=self.data.columns)
 
             self.log_writer.log("Imputing missing values Successful", **log_dic)
@@ -235,6 +239,47 @@ class Preprocessor:
 
             self.log_writer.exception_log(e, **log_dic)
 
+    def get_preprocess_artifact(self, input_cols, data):
+        """
+        Method Name :   get_preprocess_artifact
+        Description :   This method gets the preprocessing artifact which is used to apply the training
+                        preprocessing to wafers scored online
+
+        Output      :   A dict of input columns, feature columns, fitted imputer and fill values is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.get_preprocess_artifact.__name__,
+            __file__,
+            self.log_file,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            artifact = {
+                "input_cols": list(input_cols),
+                "features": list(data.columns),
+                "imputer": self.imputer,
+                "fill_values": data.median().to_dict(),
+            }
+
+            self.log_writer.log(
+                f"Got preprocessing artifact with {len(artifact['features'])} features",
+                **log_dic,
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return artifact
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
     def encode_target_col(self, data):
         """
         Method Name :   encode_target_col
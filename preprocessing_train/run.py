@@ -1,8 +1,8 @@
 from data_loader_train import Data_Getter_Train
 from preprocessing import Preprocessor
-from utils.logger import App_Logger
-from utils.main_utils import Main_Utils
+from utils.bootstrap import get_log_writer, get_utils
 from utils.read_params import get_log_dic
+from wafer_core.stage_cache import Stage_Cache
 
 
 class Run:
@@ -14,13 +14,13 @@ class Run:
     """
 
     def __init__(self):
-        self.utils = Main_Utils()
+        self.utils = get_utils()
 
         self.preprocessor = Preprocessor("preprocess")
 
         self.data_getter_train = Data_Getter_Train("preprocess")
 
-        self.log_writer = App_Logger()
+        self.log_writer = get_log_writer()
 
     def run_preprocess(self):
         """
@@ -49,6 +49,8 @@ class Run:
 
             X, Y = self.preprocessor.separate_label_feature(data)
 
+            input_cols = X.columns
+
             is_null_present = self.preprocessor.is_null_present(X)
 
             if is_null_present:
@@ -60,6 +62,10 @@ class Run:
 
             Y = self.preprocessor.encode_target_col(Y)
 
+            artifact = self.preprocessor.get_preprocess_artifact(input_cols, X)
+
+            self.utils.upload_preprocess_artifact(artifact, log_dic["log_file"])
+
             self.utils.upload_data_to_feature_store(
                 X, "wafer_features", log_dic["log_file"]
             )
@@ -78,14 +84,19 @@ class Run:
 
 def lambda_handler(event, context):
     try:
-        run = Run()
+        cache = Stage_Cache(event)
+
+        if cache.is_cached() is False:
+            run = Run()
+
+            run.run_preprocess()
 
-        run.run_preprocess()
+            cache.record()
 
     except Exception as e:
         raise e
 
     finally:
-        utils = Main_Utils()
+        utils = get_utils()
 
         utils.upload_logs()
@@ -1,4 +1,5 @@
 from datetime import datetime
+from pickle import dump
 from shutil import rmtree
 
 from numpy import asarray
@@ -7,6 +8,7 @@ from pandas import DataFrame
 from s3_operations import S3_Operation
 from utils.logger import App_Logger
 from utils.read_params import get_log_dic, read_params
+from wafer_core.metrics import write_run_summary
 
 
 class Main_Utils:
@@ -48,6 +50,8 @@ class Main_Utils:
         try:
             log_folder = "/tmp" + "/" + self.log_dir
 
+            write_run_summary(log_folder)
+
             self.s3.upload_folder(log_folder, "logs", log_dic["log_file"])
 
             self.log_writer.log(f"Uploaded logs to logs s3 bucket", **log_dic)
@@ -85,7 +89,7 @@ class Main_Utils:
             fname = self.get_file_with_timestamp(key, log_dic["log_file"])
 
             self.s3.upload_df_as_csv(
-                data, fname, fname, "feature_store", log_dic["log_file"], fidx=True
+                data, fname, fname, "feature_store", log_dic["log_file"]
             )
 
             self.log_writer.log(f"Uploaded {key} to feature store bucket", **log_dic)
@@ -117,7 +121,7 @@ class Main_Utils:
             fname = self.get_file_with_timestamp("null_values", log_dic["log_file"])
 
             self.s3.upload_df_as_csv(
-                null_df, fname, fname, "io_files", log_dic["log_file"], fidx=True
+                null_df, fname, fname, "io_files", log_dic["log_file"]
             )
 
             self.log_writer.log("Uploaded null values csv file to s3 bucket", **log_dic)
@@ -127,6 +131,47 @@ class Main_Utils:
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
+    def upload_preprocess_artifact(self, artifact, log_file):
+        """
+        Method Name :   upload_preprocess_artifact
+        Description :   This method uploads the preprocessing artifact to the feature store bucket
+
+        Output      :   The preprocessing artifact is uploaded to feature store bucket
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.upload_preprocess_artifact.__name__,
+            __file__,
+            log_file,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            fname = self.files["preprocess_artifact"]
+
+            artifact_file = "/tmp" + "/" + fname
+
+            with open(file=artifact_file, mode="wb") as f:
+                dump(artifact, f)
+
+            self.s3.upload_file(
+                artifact_file, fname, "feature_store", log_dic["log_file"]
+            )
+
+            self.log_writer.log(
+                "Uploaded preprocessing artifact to feature store bucket", **log_dic
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
     def get_file_with_timestamp(self, file, log_file):
         log_dic = get_log_dic(
             self.__class__.__name__,
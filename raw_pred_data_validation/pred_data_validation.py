@@ -1,9 +1,50 @@
-from re import match, split
+from functools import lru_cache
+from os.path import splitext
+from re import compile
+from urllib.parse import unquote_plus
+
+from numpy import array, flatnonzero, float64, isnan, where
+from pandas import to_numeric
 
 from s3_operations import S3_Operation
 from utils.logger import App_Logger
 from utils.main_utils import Main_Utils
-from utils.read_params import get_log_dic
+from utils.read_params import get_log_dic, read_params
+from wafer_core.bootstrap import get_current_date
+from wafer_core.ingest_ledger import Ingest_Ledger
+
+SCHEMA_CACHE = {}
+
+
+@lru_cache(maxsize=None)
+def get_fname_pattern(regex, LengthOfDateStampInFile, LengthOfTimeStampInFile):
+    """
+    Method Name :   get_fname_pattern
+    Description :   This method compiles the regex pattern along with the date and time stamp lengths into 
+                    a single pattern with named groups, compiled patterns are cached across lambda warm starts
+
+    Output      :   A compiled regex pattern is returned
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = get_fname_pattern.__name__
+
+    try:
+        fname_pattern = compile(
+            f"(?=(?:{regex}))[^_]*"
+            + f"_(?P<date>[^_]{{{LengthOfDateStampInFile}}})"
+            + f"_(?P<time>[^_]{{{LengthOfTimeStampInFile}}})"
+            + r"(?:_|\.csv)"
+        )
+
+        return fname_pattern
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
 
 
 class Raw_Pred_Data_Validation:
@@ -21,10 +62,74 @@ class Raw_Pred_Data_Validation:
 
         self.s3 = S3_Operation()
 
+        self.ledger = Ingest_Ledger("pred_data")
+
+        self.config = read_params()
+
+        self.dir = self.config["dir"]
+
+        self.schema_dtypes = self.config["schema_dtypes"]
+
+        self.col = self.config["col"]
+
+        self.files = self.config["files"]
+
+        self.coerce_numeric = self.config["schema_validation"]["coerce_numeric"]
+
+        self.max_report_cols = self.config["schema_validation"]["max_report_cols"]
+
+    @property
+    def current_date(self):
+        return get_current_date()
+
+    def get_cached_entry(self, fname, log_file):
+        """
+        Method Name :   get_cached_entry
+        Description :   This method revalidates the cached entry of the file against the etag of the file 
+                        present in io_files bucket
+
+        Output      :   The etag and the cached entry are returned, cached entry is None if the file has changed
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.get_cached_entry.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            etag = self.s3.get_etag(fname, "io_files", log_dic["log_file"])
+
+            entry = SCHEMA_CACHE.get(fname)
+
+            if entry is not None and entry["etag"] == etag:
+                self.log_writer.log(
+                    f"Etag of {fname} file is unchanged, using cached entry", **log_dic
+                )
+
+            else:
+                self.log_writer.log(
+                    f"No cached entry found for {fname} file with {etag} etag",
+                    **log_dic,
+                )
+
+                entry = None
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return etag, entry
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
     def values_from_schema(self):
         """
         Method Name :   values_from_schema
-        Description :   This method gets schema values from the schema_prediction.json file
+        Description :   This method gets schema values from the schema_prediction.json file, the schema values 
+                        are cached and revalidated using the etag of the file
 
         Output      :   Schema values are extracted from the schema_prediction.json file
         On Failure  :   Write an exception log and then raise an exception
@@ -42,15 +147,45 @@ class Raw_Pred_Data_Validation:
         try:
             self.log_writer.start_log("start", **log_dic)
 
-            dic = self.s3.read_json("pred_schema", "io_files", log_dic["log_file"])
+            etag, entry = self.get_cached_entry("pred_schema", log_dic["log_file"])
+
+            if entry is None:
+                dic = self.s3.read_json("pred_schema", "io_files", log_dic["log_file"])
+
+                LengthOfDateStampInFile = dic["LengthOfDateStampInFile"]
 
-            LengthOfDateStampInFile = dic["LengthOfDateStampInFile"]
+                LengthOfTimeStampInFile = dic["LengthOfTimeStampInFile"]
 
-            LengthOfTimeStampInFile = dic["LengthOfTimeStampInFile"]
+                column_names = {
+                    col: self.schema_dtypes.get(col_type.lower(), "object")
+                    for col, col_type in dic["ColName"].items()
+                }
 
-            column_names = dic["ColName"]
+                NumberofColumns = dic["NumberofColumns"]
 
-            NumberofColumns = dic["NumberofColumns"]
+                entry = {
+                    "etag": etag,
+                    "values": (
+                        LengthOfDateStampInFile,
+                        LengthOfTimeStampInFile,
+                        column_names,
+                        NumberofColumns,
+                    ),
+                }
+
+                SCHEMA_CACHE["pred_schema"] = entry
+
+                self.log_writer.log(
+                    "Cached schema values along with column name and dtype map",
+                    **log_dic,
+                )
+
+            (
+                LengthOfDateStampInFile,
+                LengthOfTimeStampInFile,
+                column_names,
+                NumberofColumns,
+            ) = entry["values"]
 
             message = (
                 "LengthOfDateStampInFile:: %s" % LengthOfDateStampInFile
@@ -65,12 +200,7 @@ class Raw_Pred_Data_Validation:
 
             self.log_writer.start_log("exit", **log_dic)
 
-            return (
-                LengthOfDateStampInFile,
-                LengthOfTimeStampInFile,
-                column_names,
-                NumberofColumns,
-            )
+            return entry["values"]
 
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
@@ -78,7 +208,8 @@ class Raw_Pred_Data_Validation:
     def get_regex_pattern(self):
         """
         Method Name :   get_regex_pattern
-        Description :   This method gets regex pattern from input files s3 bucket
+        Description :   This method gets regex pattern from input files s3 bucket, the regex pattern is cached 
+                        and revalidated using the etag of the file
 
         Output      :   A regex pattern is extracted
         On Failure  :   Write an exception log and then raise an exception
@@ -96,7 +227,16 @@ class Raw_Pred_Data_Validation:
         try:
             self.log_writer.start_log("start", **log_dic)
 
-            regex = self.s3.read_text("regex", "io_files", log_dic["log_file"])
+            etag, entry = self.get_cached_entry("regex", log_dic["log_file"])
+
+            if entry is None:
+                regex = self.s3.read_text("regex", "io_files", log_dic["log_file"])
+
+                entry = {"etag": etag, "values": regex.strip()}
+
+                SCHEMA_CACHE["regex"] = entry
+
+            regex = entry["values"]
 
             self.log_writer.log(f"Got {regex} pattern", **log_dic)
 
@@ -107,14 +247,100 @@ class Raw_Pred_Data_Validation:
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
+    def get_raw_objects(self, log_file):
+        """
+        Method Name :   get_raw_objects
+        Description :   This method gets the raw files of the raw batch folder and the validated files of the good
+                        and bad data folders, which the ingest ledger compares to get the pending raw files
+
+        Output      :   A dict of raw file to its etag and last modified time and a dict of validated files are
+                        returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.get_raw_objects.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            objects = self.s3.get_objects_from_folder(
+                "raw_pred_batch_data", "raw_pred_data", log_dic["log_file"]
+            )
+
+            objects = {f: obj for f, obj in objects.items() if not f.endswith("/")}
+
+            self.log_writer.log(
+                "Got prediction files with absolute file name", **log_dic
+            )
+
+            outputs = {
+                **self.s3.get_objects_from_folder(
+                    "pred_good_data", "pred_data", log_dic["log_file"]
+                ),
+                **self.s3.get_objects_from_folder(
+                    "pred_bad_data", "pred_data", log_dic["log_file"]
+                ),
+            }
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return objects, outputs
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def get_pending_files(self):
+        """
+        Method Name :   get_pending_files
+        Description :   This method gets the raw files which are new or changed since they were last validated,
+                        which are the keys the shards of the raw data validation are planned on
+
+        Output      :   A sorted list of pending raw files is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.get_pending_files.__name__,
+            __file__,
+            "name_validation",
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            self.utils.create_dirs_for_good_bad_data(log_dic["log_file"])
+
+            objects, outputs = self.get_raw_objects(log_dic["log_file"])
+
+            pending = self.ledger.get_pending_files(
+                objects, outputs, log_dic["log_file"]
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return pending
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
     def validate_raw_fname(
         self, regex, LengthOfDateStampInFile, LengthOfTimeStampInFile
     ):
         """
         Method Name :   validate_raw_fname
-        Description :   This method validates the raw file name based on regex pattern and schema values
+        Description :   This method validates the raw file name based on regex pattern and schema values, only the
+                        raw files which are new or changed since they were last validated are validated, based
+                        on the ingest ledger
 
-        Output      :   Raw file names are validated, good file names are stored in good data folder and rest is stored in bad data
+        Output      :   Raw file names are validated, good file names are stored in good data folder and rest is
+                        stored in bad data, a dict of validated raw file to its ledger entry is returned
         On Failure  :   Write an exception log and then raise an exception
 
         Version     :   1.2
@@ -132,20 +358,25 @@ class Raw_Pred_Data_Validation:
         try:
             self.utils.create_dirs_for_good_bad_data(log_dic["log_file"])
 
-            onlyfiles = self.s3.get_files_from_folder(
-                "raw_pred_batch_data", "raw_pred_data", log_dic["log_file"]
+            objects, outputs = self.get_raw_objects(log_dic["log_file"])
+
+            pending = self.ledger.get_pending_files(
+                objects, outputs, log_dic["log_file"]
             )
 
-            pred_batch_files = [f.split("/")[1] for f in onlyfiles]
+            fname_pattern = get_fname_pattern(
+                regex, LengthOfDateStampInFile, LengthOfTimeStampInFile
+            )
 
             self.log_writer.log(
-                "Got prediction files with absolute file name", **log_dic
+                "Got compiled file name pattern based on regex and schema values",
+                **log_dic,
             )
 
-            for fname in pred_batch_files:
-                raw_data_pred_fname = self.utils.get_filename(
-                    "raw_pred_batch_data", fname, log_dic["log_file"]
-                )
+            copies, validated = [], {}
+
+            for raw_data_pred_fname in pending:
+                fname = raw_data_pred_fname.split("/")[1]
 
                 good_data_pred_fname = self.utils.get_filename(
                     "pred_good_data", fname, log_dic["log_file"]
@@ -159,59 +390,55 @@ class Raw_Pred_Data_Validation:
                     "Created raw,good and bad data file name", **log_dic
                 )
 
-                if match(regex, fname):
-                    splitAtDot = split(".csv", fname)
-
-                    splitAtDot = split("_", splitAtDot[0])
-
-                    if len(splitAtDot[1]) == LengthOfDateStampInFile:
-                        if len(splitAtDot[2]) == LengthOfTimeStampInFile:
-                            self.s3.copy_data(
-                                raw_data_pred_fname,
-                                "raw_pred_data",
-                                good_data_pred_fname,
-                                "pred_data",
-                                log_dic["log_file"],
-                            )
-
-                        else:
-                            self.s3.copy_data(
-                                raw_data_pred_fname,
-                                "raw_pred_data",
-                                bad_data_pred_fname,
-                                "pred_data",
-                                log_dic["log_file"],
-                            )
-
-                    else:
-                        self.s3.copy_data(
-                            raw_data_pred_fname,
-                            "raw_pred_data",
-                            bad_data_pred_fname,
-                            "pred_data",
-                            log_dic["log_file"],
-                        )
+                if fname_pattern.match(fname):
+                    dest_f = good_data_pred_fname
 
                 else:
-                    self.s3.copy_data(
-                        raw_data_pred_fname,
-                        "raw_pred_data",
-                        bad_data_pred_fname,
-                        "pred_data",
-                        log_dic["log_file"],
-                    )
+                    dest_f = bad_data_pred_fname
+
+                copies.append((raw_data_pred_fname, dest_f))
+
+                validated[raw_data_pred_fname] = {
+                    **objects[raw_data_pred_fname],
+                    "dest": dest_f,
+                }
+
+            ## a changed raw file which was validated to the other folder before is removed from there, so
+            ## the file is either in good data folder or in bad data folder
+
+            stale = [
+                self.ledger.entries[f]["dest"]
+                for f in pending
+                if f in self.ledger.entries
+                and self.ledger.entries[f]["dest"] != validated[f]["dest"]
+                and self.ledger.entries[f]["dest"] in outputs
+            ]
+
+            self.s3.delete_files(stale, "pred_data", log_dic["log_file"])
+
+            result = self.s3.copy_files(
+                copies, "raw_pred_data", "pred_data", log_dic["log_file"]
+            )
+
+            if result["failed"]:
+                raise Exception(
+                    f"Failed to copy {len(result['failed'])} files to good and bad data folders"
+                )
 
             self.log_writer.start_log("exit", **log_dic)
 
+            return validated
+
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
-    def validate_col_length(self, NumberofColumns):
+    def get_schema_violations(self, df, column_names, NumberofColumns, log_file):
         """
-        Method Name :   validate_col_length
-        Description :   This method validates the column length based on number of columns as mentioned in schema values
+        Method Name :   get_schema_violations
+        Description :   This method validates the header names, order and dtypes of the dataframe against the 
+                        schema values in a single vectorized pass, numeric columns are coerced using numpy
 
-        Output      :   The files' columns length are validated and good data is stored in good data folder and rest is stored in bad data folder
+        Output      :   The dataframe with coerced numeric columns and a list of schema violations is returned
         On Failure  :   Write an exception log and then raise an exception
 
         Version     :   1.2
@@ -219,48 +446,126 @@ class Raw_Pred_Data_Validation:
         """
         log_dic = get_log_dic(
             self.__class__.__name__,
-            self.validate_col_length.__name__,
+            self.get_schema_violations.__name__,
             __file__,
-            "col_validation",
+            log_file,
         )
 
         self.log_writer.start_log("start", **log_dic)
 
         try:
-            lst = self.s3.read_csv_from_folder(
-                "pred_good_data", "pred_data", log_dic["log_file"]
-            )
+            violations = []
+
+            if df.shape[1] != NumberofColumns:
+                violations.append(
+                    {
+                        "check": "column_count",
+                        "expected": NumberofColumns,
+                        "found": df.shape[1],
+                    }
+                )
 
-            for _, f in enumerate(lst):
-                df = f[0]
+                self.log_writer.log(
+                    f"Found {df.shape[1]} columns instead of {NumberofColumns}",
+                    **log_dic,
+                )
 
-                file = f[1]
+                self.log_writer.start_log("exit", **log_dic)
 
-                abs_f = f[2]
+                return df, violations
 
-                if df.shape[1] == NumberofColumns:
-                    pass
+            header = df.columns.to_numpy(dtype=object)
 
-                else:
-                    dest_f = self.utils.get_filename(
-                        "pred_bad_data", abs_f, log_dic["log_file"]
+            header = where(header == self.col["unnamed"], self.col["wafer"], header)
+
+            schema_header = array(list(column_names.keys()), dtype=object)
+
+            wrong_names = flatnonzero(header != schema_header)
+
+            if wrong_names.size > 0:
+                violations.append(
+                    {
+                        "check": "column_names",
+                        "columns": header[wrong_names][: self.max_report_cols].tolist(),
+                        "count": int(wrong_names.size),
+                    }
+                )
+
+            schema_dtypes = array(list(column_names.values()), dtype=object)
+
+            numeric_mask = schema_dtypes != "object"
+
+            number_mask = df.columns.isin(df.select_dtypes(include="number").columns)
+
+            coerce_mask = numeric_mask & ~number_mask
+
+            if coerce_mask.any():
+                coerce_cols = df.columns[coerce_mask]
+
+                block = df[coerce_cols]
+
+                try:
+                    coerced = block.to_numpy().astype(float64)
+
+                except (TypeError, ValueError):
+                    coerced = block.apply(to_numeric, errors="coerce").to_numpy()
+
+                wrong_values = isnan(coerced) & ~block.isna().to_numpy()
+
+                wrong_dtypes = flatnonzero(wrong_values.any(axis=0))
+
+                if wrong_dtypes.size > 0 and self.coerce_numeric is False:
+                    violations.append(
+                        {
+                            "check": "column_dtypes",
+                            "columns": coerce_cols[wrong_dtypes][
+                                : self.max_report_cols
+                            ].tolist(),
+                            "count": int(wrong_dtypes.size),
+                        }
                     )
 
-                    self.s3.move_data(
-                        file, "pred_data", dest_f, "pred_data", log_dic["log_file"]
+                else:
+                    df[list(coerce_cols)] = coerced
+
+                    self.log_writer.log(
+                        f"Coerced {coerce_cols.size} columns to numeric dtype with {int(wrong_values.sum())} invalid values",
+                        **log_dic,
                     )
 
+            null_cols = flatnonzero(df.isna().to_numpy().all(axis=0))
+
+            if null_cols.size > 0:
+                violations.append(
+                    {
+                        "check": "null_columns",
+                        "columns": df.columns[null_cols][
+                            : self.max_report_cols
+                        ].tolist(),
+                        "count": int(null_cols.size),
+                    }
+                )
+
+            self.log_writer.log(
+                f"Found {len(violations)} schema violations in the dataframe", **log_dic
+            )
+
             self.log_writer.start_log("exit", **log_dic)
 
+            return df, violations
+
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
-    def validate_missing_values_in_col(self):
+    def validate_schema(self, column_names, NumberofColumns, validated):
         """
-        Method Name :   validate_missing_values_in_col
-        Description :   This method validates the missing values in columns
+        Method Name :   validate_schema
+        Description :   This method validates the column length, column names, column dtypes and missing values 
+                        in columns based on the schema values, in a single pass over the good data files of the
+                        raw files validated in this run, which are then added to the ingest ledger
 
-        Output      :   Missing columns are validated, and good data is stored in good data folder and rest is to stored in bad data folder
+        Output      :   The files are validated, good data is stored in good data folder and rest is stored in 
+                        bad data folder along with a violation report
         On Failure  :   Write an exception log and then raise an exception
 
         Version     :   1.2
@@ -268,17 +573,30 @@ class Raw_Pred_Data_Validation:
         """
         log_dic = get_log_dic(
             self.__class__.__name__,
-            self.validate_missing_values_in_col.__name__,
+            self.validate_schema.__name__,
             __file__,
-            "missing_values_in_col",
+            "schema_validation",
         )
 
         self.log_writer.start_log("start", **log_dic)
 
         try:
-            lst = self.s3.read_csv_from_folder(
-                "pred_good_data", "pred_data", log_dic["log_file"]
-            )
+            good_files = {
+                entry["dest"]: fname
+                for fname, entry in validated.items()
+                if entry["dest"].startswith(self.dir["pred_good_data"] + "/")
+            }
+
+            lst = [
+                (
+                    self.s3.read_csv(f, "pred_data", log_dic["log_file"]),
+                    f,
+                    f.split("/")[-1],
+                )
+                for f in sorted(good_files)
+            ]
+
+            report, moves = {}, []
 
             for _, f in enumerate(lst):
                 df = f[0]
@@ -287,23 +605,22 @@ class Raw_Pred_Data_Validation:
 
                 abs_f = f[2]
 
-                count = 0
+                df, violations = self.get_schema_violations(
+                    df, column_names, NumberofColumns, log_dic["log_file"]
+                )
 
-                for cols in df:
-                    if (len(df[cols]) - df[cols].count()) == len(df[cols]):
-                        count += 1
+                if violations:
+                    report[abs_f] = violations
 
-                        dest_f = self.utils.get_filename(
-                            "pred_bad_data", abs_f, log_dic["log_file"]
-                        )
+                    dest_f = self.utils.get_filename(
+                        "pred_bad_data", abs_f, log_dic["log_file"]
+                    )
 
-                        self.s3.move_data(
-                            file, "pred_data", dest_f, "pred_data", log_dic["log_file"]
-                        )
+                    moves.append((file, dest_f))
 
-                        break
+                    validated[good_files[file]]["dest"] = dest_f
 
-                if count == 0:
+                else:
                     dest_f = self.utils.get_filename(
                         "pred_good_data", abs_f, log_dic["log_file"]
                     )
@@ -312,10 +629,193 @@ class Raw_Pred_Data_Validation:
                         df, abs_f, dest_f, "pred_data", log_dic["log_file"]
                     )
 
-                else:
-                    pass
+            result = self.s3.move_files(
+                moves, "pred_data", "pred_data", log_dic["log_file"]
+            )
+
+            if result["failed"]:
+                raise Exception(
+                    f"Failed to move {len(result['failed'])} files to bad data folder"
+                )
+
+            self.log_writer.log(
+                f"Validated {len(lst)} files, {len(report)} files moved to bad data folder",
+                **log_dic,
+            )
+
+            if report:
+                report_fname = self.utils.get_filename(
+                    "pred_bad_data",
+                    self.current_date + "-" + self.files["schema_report"],
+                    log_dic["log_file"],
+                )
+
+                self.s3.upload_json(
+                    report, report_fname, "pred_data", log_dic["log_file"]
+                )
+
+            self.ledger.update_ledger(validated, log_dic["log_file"])
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def get_event_files(self, event, log_file):
+        """
+        Method Name :   get_event_files
+        Description :   This method gets the raw files created in the raw batch folder from the records of a s3
+                        event, records of other events, buckets or folders are skipped
+
+        Output      :   A list of raw files is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.get_event_files.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            records = event.get("Records", [])
+
+            raw_fnames = [
+                unquote_plus(record["s3"]["object"]["key"])
+                for record in records
+                if record.get("eventName", "").startswith("ObjectCreated")
+                and record["s3"]["bucket"]["name"] == self.s3.bucket["raw_pred_data"]
+            ]
+
+            raw_fnames = [
+                f
+                for f in raw_fnames
+                if f.startswith(self.dir["raw_pred_batch_data"] + "/")
+                and not f.endswith("/")
+            ]
+
+            self.log_writer.log(
+                f"Got {len(raw_fnames)} raw files from {len(records)} event records",
+                **log_dic,
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return raw_fnames
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def validate_file(
+        self,
+        raw_fname,
+        regex,
+        LengthOfDateStampInFile,
+        LengthOfTimeStampInFile,
+        column_names,
+        NumberofColumns,
+    ):
+        """
+        Method Name :   validate_file
+        Description :   This method validates a single raw file on arrival, the file name, column count, column
+                        names, dtypes and null columns are validated and the file is written to good or bad data
+                        folder right away, so the batch validation only sees files which are validated already
+
+        Output      :   The file is validated and added to the ingest ledger, the validated file is returned, None
+                        if the raw file no longer exists
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.validate_file.__name__,
+            __file__,
+            "file_validation",
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            obj = self.ledger.get_raw_object(
+                raw_fname, "raw_pred_data", log_dic["log_file"]
+            )
+
+            if obj is None:
+                self.log_writer.log(f"{raw_fname} file no longer exists", **log_dic)
 
                 self.log_writer.start_log("exit", **log_dic)
 
+                return None
+
+            fname = raw_fname.split("/")[-1]
+
+            good_data_pred_fname = self.utils.get_filename(
+                "pred_good_data", fname, log_dic["log_file"]
+            )
+
+            bad_data_pred_fname = self.utils.get_filename(
+                "pred_bad_data", fname, log_dic["log_file"]
+            )
+
+            fname_pattern = get_fname_pattern(
+                regex, LengthOfDateStampInFile, LengthOfTimeStampInFile
+            )
+
+            violations = [{"check": "file_name"}]
+
+            if fname_pattern.match(fname):
+                df = self.s3.read_csv(raw_fname, "raw_pred_data", log_dic["log_file"])
+
+                df, violations = self.get_schema_violations(
+                    df, column_names, NumberofColumns, log_dic["log_file"]
+                )
+
+            if violations:
+                dest_f, stale_f = bad_data_pred_fname, good_data_pred_fname
+
+                self.s3.copy_data(
+                    raw_fname,
+                    "raw_pred_data",
+                    dest_f,
+                    "pred_data",
+                    log_dic["log_file"],
+                )
+
+                report_fname = self.utils.get_filename(
+                    "pred_bad_data",
+                    splitext(fname)[0] + "-" + self.files["schema_report"],
+                    log_dic["log_file"],
+                )
+
+                self.s3.upload_json(
+                    {fname: violations}, report_fname, "pred_data", log_dic["log_file"],
+                )
+
+            else:
+                dest_f, stale_f = good_data_pred_fname, bad_data_pred_fname
+
+                self.s3.upload_df_as_csv(
+                    df, fname, dest_f, "pred_data", log_dic["log_file"]
+                )
+
+            ## a raw file validated to the other folder before is removed from there, deleting a file which
+            ## does not exist succeeds in s3 bucket
+
+            self.s3.delete_file(stale_f, "pred_data", log_dic["log_file"])
+
+            self.ledger.add_entry(
+                raw_fname, {**obj, "dest": dest_f}, log_dic["log_file"]
+            )
+
+            self.log_writer.log(f"Validated {raw_fname} file to {dest_f}", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return dest_f
+
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
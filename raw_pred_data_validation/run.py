@@ -1,9 +1,9 @@
 from json import dumps
 
 from pred_data_validation import Raw_Pred_Data_Validation
-from utils.logger import App_Logger
-from utils.main_utils import Main_Utils
+from utils.bootstrap import get_log_writer, get_utils
 from utils.read_params import get_log_dic
+from wafer_core.shards import get_mode, run_shard_mode
 
 
 class Run:
@@ -15,7 +15,7 @@ class Run:
     """
 
     def __init__(self):
-        self.log_writer = App_Logger()
+        self.log_writer = get_log_writer()
 
         self.raw_data = Raw_Pred_Data_Validation()
 
@@ -45,19 +45,17 @@ class Run:
             (
                 LengthOfDateStampInFile,
                 LengthOfTimeStampInFile,
-                _,
+                column_names,
                 noofcolumns,
             ) = self.raw_data.values_from_schema()
 
             regex = self.raw_data.get_regex_pattern()
 
-            self.raw_data.validate_raw_fname(
+            validated = self.raw_data.validate_raw_fname(
                 regex, LengthOfDateStampInFile, LengthOfTimeStampInFile
             )
 
-            self.raw_data.validate_col_length(noofcolumns)
-
-            self.raw_data.validate_missing_values_in_col()
+            self.raw_data.validate_schema(column_names, noofcolumns, validated)
 
             self.log_writer.log("Raw Data Validation Completed !!", **log_dic)
 
@@ -66,22 +64,177 @@ class Run:
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
+    def validate_raw_files(self, event):
+        """
+        Method Name :   validate_raw_files
+        Description :   This method is used for validating the prediction batch files of a s3 object created event
+                        one by one as they arrive
+
+        Output      :   The files are validated and stored in good or bad data folder, a dict of raw file to its
+                        validated file is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.validate_raw_files.__name__,
+            __file__,
+            "raw_pred_main",
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            raw_fnames = self.raw_data.get_event_files(event, log_dic["log_file"])
+
+            validated = self.validate_files(raw_fnames)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return validated
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def validate_files(self, raw_fnames):
+        """
+        Method Name :   validate_files
+        Description :   This method is used for validating the given prediction batch files one by one, the files
+                        of a s3 object created event or of a shard
+
+        Output      :   The files are validated and stored in good or bad data folder, a dict of raw file to its
+                        validated file is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.validate_files.__name__,
+            __file__,
+            "raw_pred_main",
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            (
+                LengthOfDateStampInFile,
+                LengthOfTimeStampInFile,
+                column_names,
+                noofcolumns,
+            ) = self.raw_data.values_from_schema()
+
+            regex = self.raw_data.get_regex_pattern()
+
+            validated = {
+                raw_fname: self.raw_data.validate_file(
+                    raw_fname,
+                    regex,
+                    LengthOfDateStampInFile,
+                    LengthOfTimeStampInFile,
+                    column_names,
+                    noofcolumns,
+                )
+                for raw_fname in raw_fnames
+            }
+
+            self.log_writer.log(f"Validated {len(validated)} raw files", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return validated
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def plan_shards(self):
+        """
+        Method Name :   plan_shards
+        Description :   This method gets the keys the raw prediction data validation is sharded on, which are the
+                        raw files new or changed since they were last validated
+
+        Output      :   A sorted list of pending raw files is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        return self.raw_data.get_pending_files()
+
+    def run_shard(self, keys):
+        """
+        Method Name :   run_shard
+        Description :   This method validates the raw files of one shard, every file gets an entry file of its
+                        own in the ingest ledger
+
+        Output      :   The files of the shard are validated and stored in good or bad data folder
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        self.validate_files(keys)
+
+    def reduce_shards(self):
+        """
+        Method Name :   reduce_shards
+        Description :   This method merges the entry files the shards wrote into the ingest ledger, once all the
+                        shards are validated
+
+        Output      :   The ingest ledger is written to s3 bucket
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        self.raw_data.ledger.merge_entries("raw_pred_main")
+
 
 def lambda_handler(event, context):
     try:
-        run = Run()
+        mode = get_mode(event)
+
+        result = {}
 
-        run = run.raw_pred_data_validation()
+        if mode == "batch":
+            run = Run()
+
+            run.raw_pred_data_validation()
+
+        else:
+            result = run_shard_mode(Run(), mode, event)
 
         return {
             "statusCode": 200,
             "body": dumps("Raw Prediction Data Validation Function executed"),
+            **result,
         }
 
     except Exception as e:
         raise e
 
     finally:
-        utils = Main_Utils()
+        utils = get_utils()
+
+        utils.upload_logs()
+
+
+def file_handler(event, context):
+    try:
+        run = Run()
+
+        validated = run.validate_raw_files(event)
+
+        return {"statusCode": 200, "body": dumps(validated)}
+
+    except Exception as e:
+        raise e
+
+    finally:
+        utils = get_utils()
 
         utils.upload_logs()
@@ -3,6 +3,7 @@ from shutil import rmtree
 from s3_operations import S3_Operation
 from utils.logger import App_Logger
 from utils.read_params import get_log_dic, read_params
+from wafer_core.metrics import write_run_summary
 
 
 class Main_Utils:
@@ -46,6 +47,8 @@ class Main_Utils:
         try:
             log_folder = "/tmp" + "/" + self.log_dir
 
+            write_run_summary(log_folder)
+
             self.s3.upload_folder(log_folder, "logs", log_dic["log_file"])
 
             self.log_writer.log("Uploaded logs to logs bucket", **log_dic)
@@ -77,7 +80,7 @@ class Main_Utils:
         self.log_writer.start_log("start", **log_dic)
 
         try:
-            train_fname = "/tmp" + "/" + self.dir[key] + "/" + fname
+            train_fname = self.dir[key] + "/" + fname
 
             self.log_writer.log(f"Got the file name for {key}", **log_dic)
 
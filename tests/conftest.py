@@ -0,0 +1,42 @@
+from os import environ
+from os.path import abspath, dirname
+from sys import path
+
+from pytest import fixture
+
+ROOT = dirname(dirname(abspath(__file__)))
+
+if ROOT not in path:
+    path.insert(0, ROOT)
+
+for key, value in {
+    "AWS_DEFAULT_REGION": "us-east-1",
+    "AWS_ACCESS_KEY_ID": "testing",
+    "AWS_SECRET_ACCESS_KEY": "testing",
+}.items():
+    environ.setdefault(key, value)
+
+
+@fixture
+def aws():
+    from moto import mock_aws
+
+    from wafer_core.bootstrap import get_s3_resource
+
+    ## the s3 resource is cached per container, so it is created again inside the mock
+    get_s3_resource.cache_clear()
+
+    with mock_aws():
+        yield
+
+    get_s3_resource.cache_clear()
+
+
+@fixture
+def service():
+    from wafer_core.pipeline import service_context
+
+    def enter(stage):
+        return service_context(stage)
+
+    return enter
@@ -0,0 +1,36 @@
+from datetime import datetime
+
+
+class Clock:
+    """
+    Stand in for datetime whose now is set by the test
+    """
+
+    now_value = datetime(2024, 1, 1, 23, 59, 59)
+
+    @classmethod
+    def now(cls):
+        return cls.now_value
+
+
+def test_cached_singletons_follow_the_date(service, monkeypatch):
+    import wafer_core.bootstrap
+
+    monkeypatch.setattr(wafer_core.bootstrap, "datetime", Clock)
+
+    with service("model_training"):
+        from utils.bootstrap import get_log_writer, get_utils
+
+        log_writer, utils = get_log_writer(), get_utils()
+
+        assert log_writer.current_date == utils.current_date == "2024-01-01"
+
+        monkeypatch.setattr(Clock, "now_value", datetime(2024, 1, 2, 0, 0, 1))
+
+        assert get_log_writer() is log_writer
+
+        assert log_writer.current_date == utils.current_date == "2024-01-02"
+
+        assert log_writer.get_log_file("model_train").endswith(
+            "2024-01-02-" + log_writer.log_file["model_train"]
+        )
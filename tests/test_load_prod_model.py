@@ -0,0 +1,67 @@
+from json import dumps
+from types import SimpleNamespace
+
+from boto3 import client
+
+
+class Runs_Client:
+    """
+    Stand in for the mlflow client which records the searches of runs
+    """
+
+    def __init__(self, remote_server_uri):
+        self.searches = []
+
+    def search_runs(self, exp_ids, filter_string, order_by, max_results):
+        self.searches.append((filter_string, order_by, max_results))
+
+        return [SimpleNamespace(info=SimpleNamespace(run_id="run"))]
+
+
+def test_cluster_runs_are_scoped_to_the_training_run(aws, service, monkeypatch):
+    monkeypatch.setenv("MLFLOW_TRACKING_URI", "file:///tmp/mlruns")
+
+    with service("load_prod_model"):
+        import mlflow_operations
+        from mlflow_operations import MLFlow_Operation
+        from utils.main_utils import Main_Utils
+        from utils.read_params import read_params
+
+        config = read_params()
+
+        bucket = config["s3_bucket"]["model"]
+
+        s3 = client("s3")
+
+        s3.create_bucket(Bucket=bucket)
+
+        monkeypatch.setattr(mlflow_operations, "get_mlflow_client", Runs_Client)
+
+        utils, mlflow_op = Main_Utils(), MLFlow_Operation("load_prod_model")
+
+        ## without a train run marker the latest run of the cluster by train_date is taken
+        train_id = utils.get_train_id("model", "load_prod_model")
+
+        assert train_id is None
+
+        mlflow_op.get_best_cluster_run("1", 0, train_id)
+
+        s3.put_object(
+            Bucket=bucket,
+            Key=config["files"]["train_run"],
+            Body=dumps({"train_id": "2024-01-01-abc", "train_date": "2024-01-01"}),
+        )
+
+        train_id = utils.get_train_id("model", "load_prod_model")
+
+        mlflow_op.get_best_cluster_run("1", 0, train_id)
+
+        (latest, latest_order, _), (scoped, _, max_results) = mlflow_op.client.searches
+
+        assert latest == "tags.cluster = '0'"
+
+        assert latest_order[0] == "tags.train_date DESC"
+
+        assert scoped == "tags.cluster = '0' and tags.train_id = '2024-01-01-abc'"
+
+        assert max_results == 1
@@ -0,0 +1,64 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from wafer_core.metrics import (
+    METRICS,
+    STAGE,
+    add_count,
+    bind_spans,
+    get_emf,
+    get_summary,
+    measure,
+)
+
+
+def read_chunk(size):
+    with measure("read_chunk"):
+        add_count("s3_bytes_read", size)
+
+    return size
+
+
+def test_worker_counts_are_added_to_the_submitting_span():
+    METRICS.clear()
+
+    STAGE.clear()
+
+    with measure("copy_files"):
+        with ThreadPoolExecutor(4) as executor:
+            sizes = list(executor.map(bind_spans(read_chunk), range(1, 101)))
+
+    summary = get_summary()
+
+    assert summary["methods"]["copy_files"]["s3_bytes_read"] == sum(sizes)
+
+    assert summary["methods"]["read_chunk"]["s3_bytes_read"] == sum(sizes)
+
+    assert summary["stage"]["s3_bytes_read"] == sum(sizes)
+
+    ## the worker threads do not keep the bound spans once the work is done
+    with ThreadPoolExecutor(4) as executor:
+        list(executor.map(read_chunk, range(10)))
+
+    assert get_summary()["methods"]["copy_files"]["s3_bytes_read"] == sum(sizes)
+
+
+def test_emf_is_stage_level_by_default():
+    METRICS.clear()
+
+    STAGE.clear()
+
+    for name in ("a", "b", "c"):
+        with measure(name):
+            add_count("rows", 10)
+
+    summary = get_summary()
+
+    (doc,) = get_emf(summary, "WaferFault", "clustering")
+
+    assert doc["_aws"]["CloudWatchMetrics"][0]["Dimensions"] == [["Service"]]
+
+    assert "Method" not in doc and doc["rows"] == 30
+
+    docs = get_emf(summary, "WaferFault", "clustering", "method")
+
+    assert sorted(doc["Method"] for doc in docs) == ["a", "b", "c"]
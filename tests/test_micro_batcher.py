@@ -0,0 +1,64 @@
+from numpy import arange
+from pandas import DataFrame
+from pytest import raises
+
+
+def predict(features, log_file):
+    values = features["s0"].to_numpy()
+
+    return values * 2, values % 2
+
+
+def get_batcher(predict_func):
+    from micro_batcher import Micro_Batcher
+
+    return Micro_Batcher(predict_func, "online")
+
+
+def test_micro_batch_is_disabled_by_default(service):
+    with service("model_prediction"):
+        from utils.read_params import read_params
+
+        assert read_params()["online"]["micro_batch"]["enabled"] is False
+
+
+def test_requests_get_their_own_predictions(service):
+    with service("model_prediction"):
+        batcher = get_batcher(predict)
+
+        futures = [
+            batcher.submit(DataFrame({"s0": arange(i, i + 3)})) for i in range(0, 12, 3)
+        ]
+
+        for i, future in enumerate(futures):
+            predictions, clusters = future.result(timeout=5)
+
+            assert predictions.tolist() == [2 * v for v in range(3 * i, 3 * i + 3)]
+
+        assert batcher.get_stats()["rows"] == 12
+
+
+def test_failed_scoring_fails_the_request(service):
+    def fail(features, log_file):
+        raise ValueError("model failed")
+
+    with service("model_prediction"):
+        future = get_batcher(fail).submit(DataFrame({"s0": [1]}))
+
+        with raises(ValueError):
+            future.result(timeout=5)
+
+
+def test_dequeued_request_is_failed_when_collecting_fails(service):
+    def fail(histogram, value):
+        raise RuntimeError("stats failed")
+
+    with service("model_prediction"):
+        batcher = get_batcher(predict)
+
+        batcher.observe = fail
+
+        future = batcher.submit(DataFrame({"s0": [1]}))
+
+        with raises(Exception, match="not scored"):
+            future.result(timeout=5)
@@ -0,0 +1,140 @@
+from numpy import int64
+from numpy.random import default_rng
+from pandas import DataFrame, concat
+
+
+class Cluster_Model:
+    """
+    Stand in for a cluster model, the prediction depends on the row and on the cluster so rows scored by the
+    wrong model or scattered to the wrong position are caught
+    """
+
+    def __init__(self, idx):
+        self.idx = idx
+
+        self.rows = 0
+
+        self.calls = 0
+
+    def predict(self, X):
+        self.rows += len(X)
+
+        self.calls += 1
+
+        return (X["s0"].to_numpy() > 0).astype(int64) + 10 * self.idx
+
+
+def get_batch(n_rows, seed=0):
+    rng = default_rng(seed)
+
+    data = DataFrame(rng.normal(size=(n_rows, 4)), columns=[f"s{i}" for i in range(4)])
+
+    data.insert(0, "Wafer", [f"Wafer-{i}" for i in range(n_rows)])
+
+    ## clusters 0, 1 and 3 are interleaved, cluster 2 has a model but no rows
+
+    data["clusters"] = rng.choice([0, 1, 3], size=n_rows)
+
+    return data
+
+
+def predict_per_cluster(data, models):
+    results = []
+
+    for idx, model in models.items():
+        cluster_data = data[data["clusters"] == idx]
+
+        if cluster_data.empty:
+            continue
+
+        predictions = model.predict(
+            cluster_data.drop(labels=["Wafer", "clusters"], axis=1)
+        )
+
+        results.append(
+            DataFrame(
+                {"Wafer": cluster_data["Wafer"], "Prediction": predictions},
+                index=cluster_data.index,
+            )
+        )
+
+    return concat(results).sort_index().reset_index(drop=True)
+
+
+def get_utils(models):
+    from utils.main_utils import Main_Utils
+
+    utils = Main_Utils()
+
+    utils.registry.load_model = lambda idx, log_file: models[idx]
+
+    return utils
+
+
+def test_get_predictions_matches_per_cluster_loop(aws, service):
+    with service("model_prediction"):
+        models = {idx: Cluster_Model(idx) for idx in range(4)}
+
+        data = get_batch(1000)
+
+        sink = get_utils(models).get_predictions(data, "pred")
+
+        df = sink.to_df("pred")
+
+        expected = predict_per_cluster(
+            data, {idx: Cluster_Model(idx) for idx in range(4)}
+        )
+
+        assert df["Wafer"].tolist() == data["Wafer"].tolist()
+
+        assert df.equals(expected.astype(df.dtypes.to_dict()))
+
+        assert models[2].rows == 0
+
+        assert sum(model.rows for model in models.values()) == len(data)
+
+
+def test_get_predictions_of_given_clusters(aws, service):
+    with service("model_prediction"):
+        models = {idx: Cluster_Model(idx) for idx in range(4)}
+
+        data = get_batch(200)
+
+        sink = get_utils(models).get_predictions(data, "pred", clusters=[1, 2])
+
+        rows = sink.rows[1]
+
+        assert sorted(sink.rows) == [1]
+
+        assert (data["clusters"].to_numpy()[rows] == 1).all()
+
+        assert models[0].rows == models[3].rows == 0
+
+        assert models[1].rows == len(rows)
+
+
+def test_get_predictions_scores_each_cluster_once(aws, service):
+    with service("model_prediction"):
+        models = {idx: Cluster_Model(idx) for idx in range(4)}
+
+        data = get_batch(20000, seed=1)
+
+        df = get_utils(models).get_predictions(data, "pred").to_df("pred")
+
+        expected = predict_per_cluster(
+            data, {idx: Cluster_Model(idx) for idx in range(4)}
+        )
+
+        assert df.equals(expected.astype(df.dtypes.to_dict()))
+
+        ## every row is scored exactly once with one predict call per cluster, so the work grows with rows and
+        ## not with clusters x rows
+
+        assert {idx: model.calls for idx, model in models.items()} == {
+            0: 1,
+            1: 1,
+            2: 0,
+            3: 1,
+        }
+
+        assert sum(model.rows for model in models.values()) == len(data)
@@ -0,0 +1,211 @@
+from io import BytesIO
+from json import dumps, loads
+from os.path import exists
+from types import SimpleNamespace
+
+from boto3 import client
+from joblib import dump
+from numpy.random import default_rng
+from pandas import DataFrame
+from pytest import raises
+from sklearn.cluster import KMeans
+from sklearn.tree import DecisionTreeClassifier
+
+FEATURES = [f"s{i}" for i in range(4)]
+
+
+def put_joblib(client, bucket, key, obj):
+    f = BytesIO()
+
+    dump(obj, f)
+
+    return client.put_object(bucket, key, f.getvalue())["ETag"]
+
+
+def seed_models(s3_resource, config):
+    """
+    Trains a kmeans model and a model per cluster on synthetic wafers and writes them, the preprocessing
+    artifact and the production manifest to the local s3 stub
+    """
+    client, bucket = s3_resource.meta.client, config["s3_bucket"]
+
+    X = DataFrame(default_rng(0).normal(size=(400, 4)), columns=FEATURES)
+
+    kmeans = KMeans(n_clusters=2, n_init=10, random_state=0).fit(X)
+
+    clusters = kmeans.predict(X)
+
+    models = {"KMeans": kmeans}
+
+    for idx in range(2):
+        rows = clusters == idx
+
+        models[idx] = DecisionTreeClassifier(random_state=0).fit(
+            X[rows], (X["s0"][rows] > X["s0"][rows].median()).astype(int)
+        )
+
+    manifest = {"version": 1, "models": {}}
+
+    for idx, model in models.items():
+        key = f"trained/{idx}.sav"
+
+        etag = put_joblib(client, bucket["model"], key, model)
+
+        manifest["models"][str(idx)] = {"key": key, "etag": etag}
+
+    put_joblib(
+        client,
+        bucket["feature_store"],
+        config["files"]["preprocess_artifact"],
+        {
+            "input_cols": FEATURES,
+            "features": FEATURES,
+            "imputer": None,
+            "fill_values": X.median().to_dict(),
+        },
+    )
+
+    client.put_object(
+        bucket["model"], config["files"]["prod_manifest"], dumps(manifest)
+    )
+
+    return models
+
+
+def test_online_handler_with_local_s3(service):
+    with service("model_prediction"):
+        from online_prediction import Online_Prediction
+        from utils.local_s3 import Local_S3_Resource
+        from utils.read_params import read_params
+
+        s3_resource = Local_S3_Resource()
+
+        models = seed_models(s3_resource, read_params())
+
+        wafers = DataFrame(default_rng(1).normal(size=(8, 4)), columns=FEATURES)
+
+        wafers.insert(0, "Wafer", [f"Wafer-{i}" for i in range(8)])
+
+        wafers.loc[3, "s2"] = None
+
+        event = {"body": dumps({"wafers": wafers.to_dict(orient="records")})}
+
+        response = Online_Prediction(s3_resource).handle(event, "online")
+
+        body = loads(response["body"])
+
+        X = wafers[FEATURES].fillna(
+            DataFrame(default_rng(0).normal(size=(400, 4)), columns=FEATURES).median()
+        )
+
+        clusters = models["KMeans"].predict(X)
+
+        assert response["statusCode"] == 200
+
+        assert [p["Wafer"] for p in body["predictions"]] == wafers["Wafer"].tolist()
+
+        assert [p["Cluster"] for p in body["predictions"]] == clusters.tolist()
+
+        assert [p["Prediction"] for p in body["predictions"]] == [
+            int(models[c].predict(X.iloc[[i]])[0]) for i, c in enumerate(clusters)
+        ]
+
+        assert body["p99_ms"] >= body["p50_ms"] > 0
+
+
+def test_registry_serves_the_promoted_model_file(service):
+    with service("model_prediction"):
+        from model_registry import MANIFEST_CACHE, Model_Registry
+        from utils.local_s3 import Local_S3_Resource
+        from utils.read_params import read_params
+
+        s3_resource, config = Local_S3_Resource(), read_params()
+
+        client, bucket = s3_resource.meta.client, config["s3_bucket"]["model"]
+
+        seed_models(s3_resource, config)
+
+        registry = Model_Registry(s3_resource)
+
+        registry.cache_config = {**registry.cache_config, "disk_cache": False}
+
+        manifest = registry.get_manifest("online")
+
+        ## the manifest is revalidated with its etag once it expires, and kept when s3 answers 304
+        MANIFEST_CACHE["loaded_at"] = float("-inf")
+
+        assert registry.get_manifest("online") is manifest
+
+        entry = manifest[0]
+
+        promoted = registry.read_model(entry, "online")
+
+        version_id = client.head_object(bucket, entry["key"])["VersionId"]
+
+        ## a later training of the same day writes the same key
+        put_joblib(client, bucket, entry["key"], DecisionTreeClassifier())
+
+        with raises(Exception, match="changed since it was promoted"):
+            registry.read_model(entry, "online")
+
+        pinned = registry.read_model({**entry, "version_id": version_id}, "online")
+
+        assert (pinned.tree_.value == promoted.tree_.value).all()
+
+
+def test_online_handler_uploads_the_logs_of_every_request(aws, service):
+    with service("model_prediction"):
+        import run
+        from online_prediction import Online_Prediction
+        from utils.local_s3 import Local_S3_Resource
+        from utils.read_params import read_params
+
+        config, s3_resource = read_params(), Local_S3_Resource()
+
+        seed_models(s3_resource, config)
+
+        s3 = client("s3")
+
+        s3.create_bucket(Bucket=config["s3_bucket"]["logs"])
+
+        run.ONLINE["prediction"] = Online_Prediction(s3_resource)
+
+        ## earlier tests of the process leave the root logger on their log file, a new container starts without
+        run.get_log_writer().stop_log()
+
+        wafers = DataFrame(default_rng(1).normal(size=(2, 4)), columns=FEATURES)
+
+        wafers.insert(0, "Wafer", ["Wafer-1", "Wafer-2"])
+
+        event = {"body": dumps({"wafers": wafers.to_dict(orient="records")})}
+
+        for request_id in ("req-1", "req-2"):
+            response = run.online_handler(
+                event, SimpleNamespace(aws_request_id=request_id)
+            )
+
+            assert response["statusCode"] == 200
+
+        log_folder = "/tmp/" + config["dir"]["log"]
+
+        keys = [
+            obj["Key"]
+            for obj in s3.list_objects_v2(Bucket=config["s3_bucket"]["logs"])[
+                "Contents"
+            ]
+        ]
+
+        ## the log folder is cleared after every request and the logs of both requests are kept
+        assert not exists(log_folder)
+
+        for request_id in ("req-1", "req-2"):
+            assert (
+                log_folder + "/" + request_id + "-" + config["metrics"]["summary_file"]
+                in keys
+            )
+
+            assert any(
+                key.startswith(log_folder + "/" + request_id + "-")
+                and key.endswith(config["log"]["online"])
+                for key in keys
+            )
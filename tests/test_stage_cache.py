@@ -0,0 +1,98 @@
+from boto3 import client
+
+
+def create_buckets(read_params):
+    s3 = client("s3")
+
+    for bucket in read_params()["s3_bucket"].values():
+        s3.create_bucket(Bucket=bucket)
+
+    return s3
+
+
+class Validation_Run:
+    """
+    Stand in for the run class of raw train data validation, every shard copies its raw files to the good
+    data folder
+    """
+
+    def __init__(self):
+        from utils.read_params import read_params
+
+        self.config, self.s3 = read_params(), client("s3")
+
+    def plan_shards(self):
+        response = self.s3.list_objects_v2(
+            Bucket=self.config["s3_bucket"]["raw_train_data"], Prefix="train_batch/"
+        )
+
+        return [obj["Key"] for obj in response["Contents"]]
+
+    def run_shard(self, keys):
+        for key in keys:
+            self.s3.copy_object(
+                CopySource={
+                    "Bucket": self.config["s3_bucket"]["raw_train_data"],
+                    "Key": key,
+                },
+                Bucket=self.config["s3_bucket"]["train_data"],
+                Key=key.replace("train_batch/", "good/train/"),
+            )
+
+    def reduce_shards(self):
+        pass
+
+
+def run_train_stages(service):
+    """
+    Runs raw train data validation with plan, shard and reduce modes, then data transform train in batch
+    mode, and returns the shards of the validation and if the transform was cached
+    """
+    from wafer_core.shards import run_cached_shard_mode
+    from wafer_core.stage_cache import Stage_Cache
+
+    with service("raw_train_data_validation"):
+        plan = run_cached_shard_mode(Validation_Run, "plan", {})
+
+        for keys in plan["shards"]:
+            run_cached_shard_mode(Validation_Run, "shard", {"keys": keys})
+
+        run_cached_shard_mode(
+            Validation_Run, "reduce", {"stage_cache": plan["stage_cache"]}
+        )
+
+    with service("data_transform_train"):
+        cache = Stage_Cache({})
+
+        cached = cache.is_cached()
+
+        if cached is False:
+            cache.record()
+
+    return plan["shards"], cached
+
+
+def test_sharded_stage_invalidates_the_stages_after_it(aws, service):
+    with service("raw_train_data_validation"):
+        from utils.read_params import read_params
+
+        s3 = create_buckets(read_params)
+
+        raw_bucket = read_params()["s3_bucket"]["raw_train_data"]
+
+    s3.put_object(Bucket=raw_bucket, Key="train_batch/wafer_1.csv", Body=b"1")
+
+    assert run_train_stages(service) == ([["train_batch/wafer_1.csv"]], False)
+
+    ## nothing changed, the validation plans no shards and the transform is cached
+    assert run_train_stages(service) == ([], True)
+
+    s3.put_object(Bucket=raw_bucket, Key="train_batch/wafer_2.csv", Body=b"2")
+
+    shards, cached = run_train_stages(service)
+
+    assert shards == [["train_batch/wafer_1.csv", "train_batch/wafer_2.csv"]]
+
+    assert cached is False
+
+    assert run_train_stages(service) == ([], True)
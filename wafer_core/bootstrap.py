@@ -0,0 +1,86 @@
+from datetime import datetime
+from functools import lru_cache
+
+from boto3 import resource
+from botocore.config import Config
+
+from wafer_core.read_params import read_params
+
+
+@lru_cache(maxsize=None)
+def get_s3_resource():
+    """
+    Method Name :   get_s3_resource
+    Description :   This method gets the s3 resource which is created once per container, the connection pool
+                    is sized from s3_client.max_pool_connections so concurrent transfers do not wait on
+                    the default pool of 10 connections
+
+    Output      :   The s3 resource is returned
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = get_s3_resource.__name__
+
+    try:
+        config = read_params()
+
+        max_pool_connections = config.get_int("s3_client.max_pool_connections", 10)
+
+        s3_resource = resource(
+            "s3", config=Config(max_pool_connections=max_pool_connections)
+        )
+
+        return s3_resource
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
+
+
+def get_s3_client():
+    """
+    Method Name :   get_s3_client
+    Description :   This method gets the s3 client of the s3 resource, so both share one connection pool
+
+    Output      :   The s3 client is returned
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = get_s3_client.__name__
+
+    try:
+        return get_s3_resource().meta.client
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
+
+
+def get_current_date():
+    """
+    Method Name :   get_current_date
+    Description :   This method gets the current date used in dated files, log files and tags, the date is
+                    computed on each call and never kept by the objects created once per container, so a warm
+                    container living past midnight uses the new date
+
+    Output      :   The current date as yyyy-mm-dd is returned
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = get_current_date.__name__
+
+    try:
+        return f"{datetime.now().strftime('%Y-%m-%d')}"
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
@@ -0,0 +1,307 @@
+from threading import Lock
+
+from numpy import nan
+from pandas import to_numeric
+
+FRAMES = {}
+
+FRAMES_LOCK = Lock()
+
+STORE = {"enabled": False, "checkpoints": ()}
+
+NA_VALUES = [
+    "",
+    "#N/A",
+    "#N/A N/A",
+    "#NA",
+    "-1.#IND",
+    "-1.#QNAN",
+    "-NaN",
+    "-nan",
+    "1.#IND",
+    "1.#QNAN",
+    "<NA>",
+    "N/A",
+    "NA",
+    "NULL",
+    "NaN",
+    "None",
+    "n/a",
+    "nan",
+    "null",
+]
+
+
+def enable_frames(checkpoints):
+    """
+    Method Name :   enable_frames
+    Description :   This method enables the frame store for the stages run in this process, dataframes uploaded
+                    as csv are kept in memory and only the ones under a checkpoint are written to s3 bucket,
+                    checkpoints are (bucket, prefix) pairs with the params.yaml key of the bucket
+
+    Output      :   The frame store is enabled with the checkpoints
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = enable_frames.__name__
+
+    try:
+        with FRAMES_LOCK:
+            FRAMES.clear()
+
+            STORE.update({"enabled": True, "checkpoints": tuple(checkpoints)})
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
+
+
+def disable_frames():
+    """
+    Method Name :   disable_frames
+    Description :   This method disables the frame store and drops the dataframes kept in memory
+
+    Output      :   The frame store is disabled and emptied
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = disable_frames.__name__
+
+    try:
+        with FRAMES_LOCK:
+            FRAMES.clear()
+
+            STORE.update({"enabled": False, "checkpoints": ()})
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
+
+
+def frames_enabled():
+    """
+    Method Name :   frames_enabled
+    Description :   This method checks if the frame store is enabled for this process
+
+    Output      :   True if the frame store is enabled, False otherwise
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    return STORE["enabled"]
+
+
+def is_checkpoint(bucket, fname):
+    """
+    Method Name :   is_checkpoint
+    Description :   This method checks if the file of the bucket is under one of the checkpoints, so it is
+                    written to s3 bucket as well, every file is a checkpoint when the frame store is disabled
+
+    Output      :   True if the file has to be written to s3 bucket, False otherwise
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = is_checkpoint.__name__
+
+    try:
+        if STORE["enabled"] is False:
+            return True
+
+        return any(
+            bucket == cp_bucket and fname.startswith(cp_prefix)
+            for cp_bucket, cp_prefix in STORE["checkpoints"]
+        )
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
+
+
+def put_frame(bucket_name, fname, data_frame):
+    """
+    Method Name :   put_frame
+    Description :   This method keeps a copy of the dataframe in memory as the content of the file of the bucket,
+                    with the default index a csv file read back would have
+
+    Output      :   The dataframe is kept in the frame store
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = put_frame.__name__
+
+    try:
+        df = data_frame.reset_index(drop=True)
+
+        with FRAMES_LOCK:
+            FRAMES[(bucket_name, fname)] = df
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
+
+
+def as_parsed(data_frame):
+    """
+    Method Name :   as_parsed
+    Description :   This method converts the dataframe to the types a csv round trip would give, only the object
+                    and string columns are converted, na strings like NULL become nan and numeric strings
+                    become numbers, so a stage reading from memory gets the same dataframe as one reading the
+                    csv file
+
+    Output      :   A converted copy of the dataframe is returned
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = as_parsed.__name__
+
+    try:
+        df = data_frame.copy()
+
+        for col in df.select_dtypes(include=["object", "string"]).columns:
+            values = df[col].replace(NA_VALUES, nan)
+
+            try:
+                df[col] = to_numeric(values)
+
+            except (TypeError, ValueError):
+                df[col] = values
+
+        return df
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
+
+
+def get_frame_keys(bucket_name, fname, pattern=False):
+    """
+    Method Name :   get_frame_keys
+    Description :   This method gets the files of the bucket kept in memory which start with the file name, with
+                    pattern the file name is matched anywhere in the file
+
+    Output      :   A sorted list of files kept in memory is returned
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = get_frame_keys.__name__
+
+    try:
+        with FRAMES_LOCK:
+            keys = [key for b, key in FRAMES if b == bucket_name]
+
+        func = lambda key: fname in key if pattern is True else key.startswith(fname)
+
+        return sorted(key for key in keys if func(key))
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
+
+
+def get_frame(bucket_name, fname, pattern=False):
+    """
+    Method Name :   get_frame
+    Description :   This method gets the dataframe of the file of the bucket from memory, the same way read_csv
+                    of s3 operations matches the file name
+
+    Output      :   A parsed copy of the dataframe is returned, None if the file is not kept in memory
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = get_frame.__name__
+
+    try:
+        if STORE["enabled"] is False:
+            return None
+
+        keys = get_frame_keys(bucket_name, fname, pattern=pattern)
+
+        key = fname if fname in keys else keys[0] if len(keys) == 1 else None
+
+        if key is None:
+            return None
+
+        with FRAMES_LOCK:
+            df = FRAMES[(bucket_name, key)]
+
+        return as_parsed(df)
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
+
+
+def move_frame(from_bucket_name, from_fname, to_bucket_name, to_fname, copy=False):
+    """
+    Method Name :   move_frame
+    Description :   This method moves or copies the dataframe of a file kept in memory to another file, so moves
+                    and copies done in s3 bucket are done in the frame store as well
+
+    Output      :   True if the file was kept in memory, False otherwise
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = move_frame.__name__
+
+    try:
+        with FRAMES_LOCK:
+            func = FRAMES.get if copy is True else FRAMES.pop
+
+            df = func((from_bucket_name, from_fname), None)
+
+            if df is not None:
+                FRAMES[(to_bucket_name, to_fname)] = df
+
+        return df is not None
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
+
+
+def drop_frame(bucket_name, fname):
+    """
+    Method Name :   drop_frame
+    Description :   This method drops the dataframe of a file deleted from s3 bucket from memory
+
+    Output      :   True if the file was kept in memory, False otherwise
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = drop_frame.__name__
+
+    try:
+        with FRAMES_LOCK:
+            return FRAMES.pop((bucket_name, fname), None) is not None
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
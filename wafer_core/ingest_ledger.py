@@ -0,0 +1,303 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from json import loads
+from os.path import basename, splitext
+
+from wafer_core.frame_store import frames_enabled
+from wafer_core.logger import App_Logger
+from wafer_core.metrics import bind_spans
+from wafer_core.read_params import get_log_dic, read_params
+from wafer_core.s3_operations import S3_Operation
+
+
+class Ingest_Ledger:
+    """
+    Description :   This class shall be used for keeping the ledger of the raw batch files already validated, the
+                    ledger is a json file in the bucket of the validated data with the etag and last modified
+                    time of every raw file and the file it was validated to, so only new or changed raw files
+                    are validated in the next runs. Files validated on arrival get an entry file of their own
+                    next to the ledger, which the next batch run merges into the ledger
+    Version     :   1.2
+
+    Revisions   :   Moved to setup to cloud
+    """
+
+    def __init__(self, bucket):
+        self.config = read_params()
+
+        self.s3 = S3_Operation()
+
+        self.log_writer = App_Logger()
+
+        self.bucket = bucket
+
+        self.ledger_fname = self.config["files"]["ingest_ledger"]
+
+        self.entry_prefix = splitext(self.ledger_fname)[0] + "/"
+
+        self.entries, self.entry_fnames = {}, []
+
+    def read_ledger_json(self, fname):
+        """
+        Method Name :   read_ledger_json
+        Description :   This method reads a json file of the ledger from s3 bucket
+
+        Output      :   The dict of the json file is returned, None if the file does not exist
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        s3_client = self.s3.s3_client
+
+        try:
+            response = s3_client.get_object(
+                Bucket=self.s3.bucket[self.bucket], Key=fname
+            )
+
+            return loads(response["Body"].read())
+
+        except s3_client.exceptions.NoSuchKey:
+            return None
+
+    def get_ledger(self, log_file):
+        """
+        Method Name :   get_ledger
+        Description :   This method reads the ledger of the validated raw files from s3 bucket along with the
+                        entry files of the files validated on arrival, the ledger is not used when the stage is
+                        run in a fused pipeline, since the validated files are kept in memory and not in s3 bucket
+
+        Output      :   A dict of raw file to its ledger entry is returned, empty if there is no ledger
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.get_ledger.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            self.entries, self.entry_fnames = {}, []
+
+            if frames_enabled() is False:
+                ledger = self.read_ledger_json(self.ledger_fname)
+
+                self.entries = {} if ledger is None else ledger["files"]
+
+                self.entry_fnames = sorted(
+                    self.s3.get_objects_from_folder(
+                        self.entry_prefix, self.bucket, log_dic["log_file"]
+                    )
+                )
+
+                with ThreadPoolExecutor(self.s3.batch["max_workers"]) as executor:
+                    entry_files = list(
+                        executor.map(
+                            bind_spans(self.read_ledger_json), self.entry_fnames
+                        )
+                    )
+
+                for entry_file in entry_files:
+                    self.entries.update(entry_file or {})
+
+            self.log_writer.log(
+                f"Got {len(self.entries)} validated files from the ledger, {len(self.entry_fnames)} from entry files",
+                **log_dic,
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return self.entries
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def get_pending_files(self, objects, outputs, log_file):
+        """
+        Method Name :   get_pending_files
+        Description :   This method gets the raw files which are not validated yet, a raw file is pending when it
+                        is not in the ledger, when its etag or last modified time changed, or when the file it
+                        was validated to no longer exists
+
+        Output      :   A sorted list of pending raw files is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.get_pending_files.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            entries = self.get_ledger(log_dic["log_file"])
+
+            pending = sorted(
+                fname
+                for fname, obj in objects.items()
+                if fname not in entries
+                or entries[fname]["etag"] != obj["etag"]
+                or entries[fname]["last_modified"] != obj["last_modified"]
+                or entries[fname]["dest"] not in outputs
+            )
+
+            self.log_writer.log(
+                f"Got {len(pending)} new or changed files out of {len(objects)} files",
+                **log_dic,
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return pending
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def update_ledger(self, validated, log_file):
+        """
+        Method Name :   update_ledger
+        Description :   This method adds the raw files validated in this run to the ledger and writes the ledger
+                        to s3 bucket, the entry files merged into the ledger are deleted, the ledger is only
+                        written when files were validated or entry files were merged
+
+        Output      :   The ledger is written to s3 bucket
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.update_ledger.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            if (validated or self.entry_fnames) and frames_enabled() is False:
+                validated_at = datetime.now().isoformat()
+
+                for fname, entry in validated.items():
+                    self.entries[fname] = {**entry, "validated_at": validated_at}
+
+                self.s3.upload_json(
+                    {"updated_at": validated_at, "files": self.entries},
+                    self.ledger_fname,
+                    self.bucket,
+                    log_dic["log_file"],
+                )
+
+                self.s3.delete_files(
+                    self.entry_fnames, self.bucket, log_dic["log_file"]
+                )
+
+                self.entry_fnames = []
+
+            self.log_writer.log(
+                f"Added {len(validated)} validated files to the ledger", **log_dic
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def get_raw_object(self, fname, bucket, log_file):
+        """
+        Method Name :   get_raw_object
+        Description :   This method gets the etag and last modified time of a raw file, the same as the listing
+                        of the raw batch folder which the ledger entries are compared with
+
+        Output      :   A dict of etag and last modified time is returned, None if the file does not exist
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.get_raw_object.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            objects = self.s3.get_objects_from_folder(
+                fname, bucket, log_dic["log_file"]
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return objects.get(fname)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def add_entry(self, fname, entry, log_file):
+        """
+        Method Name :   add_entry
+        Description :   This method writes the ledger entry of a raw file validated on arrival to an entry file
+                        of its own, so concurrent validations of different files do not overwrite each other
+
+        Output      :   The entry file is written to s3 bucket
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.add_entry.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            self.s3.upload_json(
+                {fname: {**entry, "validated_at": datetime.now().isoformat()}},
+                self.entry_prefix + basename(fname) + ".json",
+                self.bucket,
+                log_dic["log_file"],
+            )
+
+            self.log_writer.log(f"Added {fname} file to the ledger", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def merge_entries(self, log_file):
+        """
+        Method Name :   merge_entries
+        Description :   This method merges the entry files of the files validated on arrival or by the shards of a
+                        sharded validation into the ledger, without validating any file
+
+        Output      :   The ledger is written to s3 bucket when there are entry files to merge
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.merge_entries.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            self.get_ledger(log_dic["log_file"])
+
+            self.log_writer.log(
+                f"Merging {len(self.entry_fnames)} entry files into the ledger",
+                **log_dic,
+            )
+
+            self.update_ledger({}, log_dic["log_file"])
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
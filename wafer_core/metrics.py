@@ -0,0 +1,430 @@
+from contextlib import contextmanager
+from functools import wraps
+from json import dump, dumps
+from os.path import join
+from resource import RUSAGE_SELF, getrusage
+from threading import Lock, local
+from time import perf_counter, thread_time, time
+
+from wafer_core.read_params import read_params
+
+SPANS = local()
+
+METRICS = {}
+
+METRICS_LOCK = Lock()
+
+STAGE = {}
+
+COUNTERS = ("s3_bytes_read", "s3_bytes_written", "rows")
+
+
+def get_stack():
+    """
+    Method Name :   get_stack
+    Description :   This method gets the stack of open spans of the current thread
+
+    Output      :   The list of open spans is returned
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = get_stack.__name__
+
+    try:
+        if not hasattr(SPANS, "stack"):
+            SPANS.stack = []
+
+        if not hasattr(SPANS, "parents"):
+            SPANS.parents = []
+
+        return SPANS.stack
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
+
+
+def start_span(name):
+    """
+    Method Name :   start_span
+    Description :   This method opens a span for the method name with the wall and cpu time of the thread
+
+    Output      :   A span is pushed on the stack of the current thread
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = start_span.__name__
+
+    try:
+        span = {"name": name, "wall": perf_counter(), "cpu": thread_time()}
+
+        span.update(dict.fromkeys(COUNTERS, 0))
+
+        with METRICS_LOCK:
+            if not STAGE:
+                usage = getrusage(RUSAGE_SELF)
+
+                STAGE.update(
+                    wall=perf_counter(),
+                    cpu=usage.ru_utime + usage.ru_stime,
+                    errors=0,
+                    **dict.fromkeys(COUNTERS, 0),
+                )
+
+        get_stack().append(span)
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
+
+
+def end_span(name, error=False):
+    """
+    Method Name :   end_span
+    Description :   This method closes the last open span of the method name and adds its wall time, cpu time,
+                    counters and the peak rss of the process to the metrics of the method, spans opened
+                    after it and never closed are dropped
+
+    Output      :   The wall time of the span in milliseconds is returned, None if no span was open
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = end_span.__name__
+
+    try:
+        stack = get_stack()
+
+        idx = next(
+            (i for i in reversed(range(len(stack))) if stack[i]["name"] == name), None
+        )
+
+        if idx is None:
+            return None
+
+        span = stack[idx]
+
+        del stack[idx:]
+
+        wall_ms = (perf_counter() - span["wall"]) * 1000
+
+        cpu_ms = (thread_time() - span["cpu"]) * 1000
+
+        peak_rss_mb = getrusage(RUSAGE_SELF).ru_maxrss / 1024
+
+        with METRICS_LOCK:
+            metric = METRICS.setdefault(
+                name,
+                {
+                    "calls": 0,
+                    "errors": 0,
+                    "wall_ms": 0.0,
+                    "cpu_ms": 0.0,
+                    "max_wall_ms": 0.0,
+                    **dict.fromkeys(COUNTERS, 0),
+                },
+            )
+
+            metric["calls"] += 1
+
+            metric["errors"] += int(error)
+
+            STAGE["errors"] = STAGE.get("errors", 0) + int(error)
+
+            metric["wall_ms"] += wall_ms
+
+            metric["cpu_ms"] += cpu_ms
+
+            metric["max_wall_ms"] = max(metric["max_wall_ms"], wall_ms)
+
+            metric["peak_rss_mb"] = max(metric.get("peak_rss_mb", 0.0), peak_rss_mb)
+
+            for counter in COUNTERS:
+                metric[counter] += span[counter]
+
+        return wall_ms
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
+
+
+def add_count(counter, value):
+    """
+    Method Name :   add_count
+    Description :   This method adds the value to the counter of every open span of the current thread and of
+                    the spans it was bound to by bind_spans, so the bytes and rows of a method include the ones
+                    of the methods it calls and of its worker threads, and to the counter of the stage
+
+    Output      :   The counter of the open spans and of the stage is increased
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = add_count.__name__
+
+    try:
+        spans = get_stack() + SPANS.parents
+
+        with METRICS_LOCK:
+            for span in spans:
+                span[counter] += value
+
+            STAGE[counter] = STAGE.get(counter, 0) + value
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
+
+
+def bind_spans(func):
+    """
+    Method Name :   bind_spans
+    Description :   This method binds the function to the open spans of the calling thread, so the bytes and
+                    rows counted while it runs in a worker thread of an executor are added to the spans of the
+                    method which submitted it
+
+    Output      :   The bound function is returned
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = bind_spans.__name__
+
+    try:
+        parents = get_stack() + SPANS.parents
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            get_stack()
+
+            outer, SPANS.parents = SPANS.parents, parents
+
+            try:
+                return func(*args, **kwargs)
+
+            finally:
+                SPANS.parents = outer
+
+        return wrapper
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
+
+
+@contextmanager
+def measure(name):
+    """
+    Method Name :   measure
+    Description :   This method measures the block of code as a span of the name, for code which does not go
+                    through the start and exit logs of the app logger
+
+    Output      :   The block is recorded in the metrics of the name
+    On Failure  :   The span is recorded as an error and the exception is raised
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    start_span(name)
+
+    try:
+        yield
+
+    except Exception:
+        end_span(name, error=True)
+
+        raise
+
+    end_span(name)
+
+
+def timed(func):
+    """
+    Method Name :   timed
+    Description :   This method decorates the function so every call is measured as a span of its qualified name
+
+    Output      :   The decorated function is returned
+    On Failure  :   The span is recorded as an error and the exception is raised
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with measure(func.__qualname__):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def get_summary():
+    """
+    Method Name :   get_summary
+    Description :   This method gets the run summary of the metrics of the stage and of every measured method,
+                    sorted by the total wall time
+
+    Output      :   A dict of the run summary is returned
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = get_summary.__name__
+
+    try:
+        with METRICS_LOCK:
+            methods = {name: dict(metric) for name, metric in METRICS.items()}
+
+            stage = dict(STAGE)
+
+        usage = getrusage(RUSAGE_SELF)
+
+        peak_rss_mb = usage.ru_maxrss / 1024
+
+        summary = {
+            "timestamp": int(time() * 1000),
+            "peak_rss_mb": peak_rss_mb,
+            "stage": {
+                "errors": stage.get("errors", 0),
+                "wall_ms": (perf_counter() - stage.get("wall", perf_counter())) * 1000,
+                "cpu_ms": (
+                    usage.ru_utime
+                    + usage.ru_stime
+                    - stage.get("cpu", usage.ru_utime + usage.ru_stime)
+                )
+                * 1000,
+                **{counter: stage.get(counter, 0) for counter in COUNTERS},
+                "peak_rss_mb": peak_rss_mb,
+            },
+            "methods": dict(sorted(methods.items(), key=lambda m: -m[1]["wall_ms"])),
+        }
+
+        return summary
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
+
+
+def get_emf(summary, namespace, service, level="stage"):
+    """
+    Method Name :   get_emf
+    Description :   This method converts the run summary to cloudwatch embedded metric format documents, one
+                    for the stage with service as dimension, or one per method with service and method as
+                    dimensions when the level is method
+
+    Output      :   A list of embedded metric format documents is returned
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = get_emf.__name__
+
+    try:
+        units = {
+            "calls": "Count",
+            "errors": "Count",
+            "wall_ms": "Milliseconds",
+            "cpu_ms": "Milliseconds",
+            "max_wall_ms": "Milliseconds",
+            "s3_bytes_read": "Bytes",
+            "s3_bytes_written": "Bytes",
+            "rows": "Count",
+            "peak_rss_mb": "Megabytes",
+        }
+
+        if level == "method":
+            dims, metrics = ["Service", "Method"], summary["methods"].items()
+
+        else:
+            dims, metrics = ["Service"], [(None, summary["stage"])]
+
+        docs = [
+            {
+                "_aws": {
+                    "Timestamp": summary["timestamp"],
+                    "CloudWatchMetrics": [
+                        {
+                            "Namespace": namespace,
+                            "Dimensions": [dims],
+                            "Metrics": [{"Name": k, "Unit": units[k]} for k in metric],
+                        }
+                    ],
+                },
+                "Service": service,
+                **({} if name is None else {"Method": name}),
+                **metric,
+            }
+            for name, metric in metrics
+        ]
+
+        return docs
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
+
+
+def write_run_summary(log_folder):
+    """
+    Method Name :   write_run_summary
+    Description :   This method writes the run summary of the metrics as json to the log folder, so it is
+                    uploaded with the logs, prints the embedded metric format documents of the stage, or of
+                    every method when metrics.emf_level is method, to stdout for cloudwatch and resets the
+                    metrics for the next run of the container
+
+    Output      :   The run summary file is written and the metrics are emitted
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = write_run_summary.__name__
+
+    try:
+        config = read_params()
+
+        summary = get_summary()
+
+        service = config.get_str("metrics.service", "wafer")
+
+        summary["service"] = service
+
+        with open(join(log_folder, config.get_str("metrics.summary_file")), "w") as f:
+            dump(summary, f, indent=2)
+
+        if config.get_bool("metrics.emf", True) is True:
+            for doc in get_emf(
+                summary,
+                config.get_str("metrics.namespace"),
+                service,
+                config.get_str("metrics.emf_level", "stage"),
+            ):
+                print(dumps(doc))
+
+        with METRICS_LOCK:
+            METRICS.clear()
+
+            STAGE.clear()
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
@@ -0,0 +1,376 @@
+"""
+In-process runner of the train and predict pipelines.
+
+Runs a subset of the stages of a pipeline one after another in this process, each stage through its own run.py
+entry point from its own service folder, the same way the step functions invoke them. With the frame store
+enabled the dataframes a stage uploads as csv are handed to the next stages in memory, and only the files under
+a --checkpoint are written to s3 bucket, so cheap stages like raw validation, transform and db operation can be
+fused in one invocation without the csv round trips between them. A checkpoint is the params.yaml key of the
+bucket followed by the prefix of the files, the files read by the first stage run after the fused ones have to
+be checkpointed.
+
+With --workers the data parallel stages are run the way the Map states of the step functions run them, the plan
+mode of the stage gets the shards, a process pool runs the shard mode on every shard and the reduce mode finishes
+the stage. The shards hand files over through s3 bucket, so sharded runs are not fused.
+
+The runner needs every service folder next to wafer_core, as in a checkout of the repository, so it is for local
+runs, tests and benchmarks only. The lambda images hold a single service folder each, and the deployed pipelines
+are the step functions.
+
+Usage : python -m wafer_core.pipeline --dag train --stages raw_train_data_validation data_transform_train
+            db_operation_train --checkpoint feature_store/
+        python -m wafer_core.pipeline --dag pred --checkpoint io_files/
+        python -m wafer_core.pipeline --dag train --workers 4
+"""
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import repeat
+from multiprocessing import get_context
+from os import chdir, getcwd, listdir
+from os.path import abspath, dirname, join, splitext
+from runpy import run_module
+from sys import exit, modules, path
+from time import perf_counter
+from traceback import format_exc
+
+from wafer_core.frame_store import disable_frames, enable_frames
+
+ROOT = dirname(dirname(abspath(__file__)))
+
+DAGS = {
+    "train": [
+        "raw_train_data_validation",
+        "data_transform_train",
+        "db_operation_train",
+        "preprocessing_train",
+        "clustering",
+        "model_training",
+        "load_prod_model",
+    ],
+    "pred": [
+        "raw_pred_data_validation",
+        "data_transform_pred",
+        "db_operation_pred",
+        "preprocessing_pred",
+        "model_prediction",
+    ],
+}
+
+SHARDED = [
+    "raw_train_data_validation",
+    "data_transform_train",
+    "db_operation_train",
+    "model_training",
+    "raw_pred_data_validation",
+    "data_transform_pred",
+    "db_operation_pred",
+    "model_prediction",
+]
+
+DEFAULT_CHECKPOINTS = ["feature_store/", "io_files/"]
+
+
+def purge_service_modules(stage):
+    """
+    Method Name :   purge_service_modules
+    Description :   This method removes the modules of the service folder from the imported modules, every
+                    service has its own run, utils and s3_operations modules, so they have to be imported again
+                    for the next stage
+
+    Output      :   The modules of the service are removed from sys.modules
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = purge_service_modules.__name__
+
+    try:
+        names = {
+            splitext(f)[0] for f in listdir(join(ROOT, stage)) if f.endswith(".py")
+        }
+
+        names.add("utils")
+
+        for name in [m for m in modules if m.split(".")[0] in names]:
+            del modules[name]
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
+
+
+@contextmanager
+def service_context(stage):
+    """
+    Method Name :   service_context
+    Description :   This method runs the block from the service folder of the stage, with the service folder
+                    first on the import path, the same as the lambda container of the service
+
+    Output      :   The block is run in the service folder and the working directory is restored
+    On Failure  :   The working directory is restored and the exception is raised
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    cwd, stage_dir = getcwd(), join(ROOT, stage)
+
+    purge_service_modules(stage)
+
+    path.insert(0, stage_dir)
+
+    chdir(stage_dir)
+
+    try:
+        yield
+
+    finally:
+        chdir(cwd)
+
+        path.remove(stage_dir)
+
+        purge_service_modules(stage)
+
+
+def invoke_stage(stage, event=None):
+    """
+    Method Name :   invoke_stage
+    Description :   This method invokes the run.py entry point of the stage, the lambda handler when the service
+                    has one, otherwise run.py is run as the main module
+
+    Output      :   The response of the lambda handler is returned, None for main modules
+    On Failure  :   The exception of the stage is raised
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    with service_context(stage):
+        run = __import__("run")
+
+        if hasattr(run, "lambda_handler"):
+            return run.lambda_handler({} if event is None else event, None)
+
+        run_module("run", run_name="__main__")
+
+
+def invoke_shard(stage, keys):
+    """
+    Method Name :   invoke_shard
+    Description :   This method invokes the shard mode of the stage on the keys of one shard, it is run in the
+                    worker processes of the local executor
+
+    Output      :   The response of the lambda handler is returned
+    On Failure  :   The exception of the stage is raised
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    return invoke_stage(stage, {"mode": "shard", "keys": keys})
+
+
+def run_sharded_stage(stage, workers, shard_size=None):
+    """
+    Method Name :   run_sharded_stage
+    Description :   This method runs the stage the way the Map state of the step function does, the shards are
+                    planned in this process, run on a pool of worker processes and reduced in this process with
+                    the stage cache state of the plan
+
+    Output      :   The number of shards the stage was run on is returned
+    On Failure  :   The exception of the stage or of one of its shards is raised
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    event = {"mode": "plan"}
+
+    if shard_size is not None:
+        event["shard_size"] = shard_size
+
+    plan = invoke_stage(stage, event)
+
+    shards = plan["shards"]
+
+    if shards:
+        with ProcessPoolExecutor(
+            min(workers, len(shards)), mp_context=get_context("spawn")
+        ) as executor:
+            list(executor.map(invoke_shard, repeat(stage), shards))
+
+    reduce_event = {"mode": "reduce"}
+
+    ## the stage cache state of the plan is passed to reduce the same as the step functions do
+    if "stage_cache" in plan:
+        reduce_event["stage_cache"] = plan["stage_cache"]
+
+    invoke_stage(stage, reduce_event)
+
+    return len(shards)
+
+
+def run_pipeline(
+    stages, checkpoints, fused=True, stop_on_error=True, workers=None, shard_size=None
+):
+    """
+    Method Name :   run_pipeline
+    Description :   This method runs the stages in this process in the given order, when fused the frame store
+                    is enabled so the stages hand dataframes over in memory and only the checkpoints are
+                    written to s3 bucket, with workers the sharded stages are run on a pool of worker
+                    processes instead, which is never fused
+
+    Output      :   A dict of stage to whether it succeeded, its error, wall time and number of shards is
+                    returned
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = run_pipeline.__name__
+
+    try:
+        results = {}
+
+        if fused is True and workers is None:
+            enable_frames(get_checkpoints(checkpoints))
+
+        try:
+            for stage in stages:
+                start, error, n_shards = perf_counter(), None, None
+
+                try:
+                    if workers is not None and stage in SHARDED:
+                        n_shards = run_sharded_stage(stage, workers, shard_size)
+
+                    else:
+                        invoke_stage(stage)
+
+                except BaseException:
+                    error = format_exc(limit=-3)
+
+                results[stage] = {
+                    "ok": error is None,
+                    "error": error,
+                    "wall_s": perf_counter() - start,
+                    "shards": n_shards,
+                }
+
+                if error is not None and stop_on_error is True:
+                    break
+
+        finally:
+            disable_frames()
+
+        return results
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
+
+
+def get_checkpoints(checkpoints):
+    """
+    Method Name :   get_checkpoints
+    Description :   This method converts checkpoints like feature_store/wafer_train_features to pairs of the
+                    params.yaml key of the bucket and the prefix of the files
+
+    Output      :   A list of bucket and prefix pairs is returned
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = get_checkpoints.__name__
+
+    try:
+        return [(cp.partition("/")[0], cp.partition("/")[2]) for cp in checkpoints]
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
+
+
+def get_stages(dag, stages):
+    """
+    Method Name :   get_stages
+    Description :   This method gets the stages of the pipeline to run in the order of the pipeline, all the
+                    stages of the pipeline when none are given
+
+    Output      :   A list of stages is returned
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = get_stages.__name__
+
+    try:
+        unknown = set(stages or []) - set(DAGS[dag])
+
+        if unknown:
+            raise Exception(f"{sorted(unknown)} are not stages of {dag} pipeline")
+
+        return [stage for stage in DAGS[dag] if not stages or stage in stages]
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
+
+
+def main():
+    parser = ArgumentParser(description=__doc__)
+
+    parser.add_argument("--dag", choices=sorted(DAGS), default="train")
+
+    parser.add_argument("--stages", nargs="+")
+
+    parser.add_argument(
+        "--checkpoint",
+        action="append",
+        metavar="BUCKET/PREFIX",
+        help=f"files written to s3 bucket, default {' '.join(DEFAULT_CHECKPOINTS)}",
+    )
+
+    parser.add_argument("--no-fuse", action="store_true")
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="run the sharded stages on a pool of worker processes, implies --no-fuse",
+    )
+
+    parser.add_argument(
+        "--shard-size", type=int, help="keys per shard, default from params.yaml"
+    )
+
+    args = parser.parse_args()
+
+    stages = get_stages(args.dag, args.stages)
+
+    results = run_pipeline(
+        stages,
+        DEFAULT_CHECKPOINTS if args.checkpoint is None else args.checkpoint,
+        fused=not args.no_fuse,
+        workers=args.workers,
+        shard_size=args.shard_size,
+    )
+
+    for stage, result in results.items():
+        status = "" if result["ok"] else "  (failed)"
+
+        shards = "" if result["shards"] is None else f"  ({result['shards']} shards)"
+
+        print(f"{stage:<28}{result['wall_s']:>10.2f} s{shards}{status}")
+
+        if result["ok"] is False:
+            print("    " + result["error"].strip().splitlines()[-1])
+
+    if any(result["ok"] is False for result in results.values()):
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+from collections.abc import Mapping
+from os import environ, stat
+from os.path import abspath
+from types import MappingProxyType
+
+from yaml import load
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+
+except ImportError:
+    from yaml import SafeLoader
+
+CONFIG_CACHE = {}
+
+ENV_PREFIX = "PARAMS__"
+
+
+class Config(Mapping):
+    """
+    Description :   This class shall be used for reading the parameters of params.yaml, the parameters are
+                    frozen once loaded and sections are returned as copies, so no caller can change the
+                    config shared by the process
+    Version     :   1.2
+
+    Revisions   :   Moved to setup to cloud
+    """
+
+    def __init__(self, params, mtime):
+        self.params = self.freeze(params)
+
+        self.mtime = mtime
+
+    def freeze(self, value):
+        if isinstance(value, dict):
+            return MappingProxyType({k: self.freeze(v) for k, v in value.items()})
+
+        if isinstance(value, list):
+            return tuple(self.freeze(v) for v in value)
+
+        return value
+
+    def thaw(self, value):
+        if isinstance(value, Mapping):
+            return {k: self.thaw(v) for k, v in value.items()}
+
+        if isinstance(value, tuple):
+            return [self.thaw(v) for v in value]
+
+        return value
+
+    def __getitem__(self, key):
+        return self.thaw(self.params[key])
+
+    def __iter__(self):
+        return iter(self.params)
+
+    def __len__(self):
+        return len(self.params)
+
+    def get_value(self, path, default=None):
+        """
+        Method Name :   get_value
+        Description :   This method gets the parameter at the dotted path like s3_bucket.model
+
+        Output      :   A copy of the parameter is returned, or default if the path is not present
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.get_value.__name__
+
+        try:
+            value = self.params
+
+            for key in path.split("."):
+                if not isinstance(value, Mapping) or key not in value:
+                    return default
+
+                value = value[key]
+
+            return self.thaw(value)
+
+        except Exception as e:
+            raise Exception(
+                f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+            )
+
+    def get_typed(self, path, value_type, default=None):
+        """
+        Method Name :   get_typed
+        Description :   This method gets the parameter at the dotted path and checks or converts it to the
+                        type, so a wrong value fails when it is read and not deep inside a service
+
+        Output      :   The parameter of the type is returned, or default if the path is not present
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        method_name = self.get_typed.__name__
+
+        try:
+            value = self.get_value(path, default)
+
+            if value is None or isinstance(value, value_type):
+                return value
+
+            if value_type is bool and isinstance(value, str):
+                if value.lower() not in ("true", "false"):
+                    raise ValueError(f"{value} is not a bool")
+
+                return value.lower() == "true"
+
+            if value_type in (list, dict, bool):
+                raise TypeError(f"{path} is not of type {value_type.__name__}")
+
+            return value_type(value)
+
+        except Exception as e:
+            raise Exception(
+                f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+            )
+
+    def get_str(self, path, default=None):
+        return self.get_typed(path, str, default)
+
+    def get_int(self, path, default=None):
+        return self.get_typed(path, int, default)
+
+    def get_float(self, path, default=None):
+        return self.get_typed(path, float, default)
+
+    def get_bool(self, path, default=None):
+        return self.get_typed(path, bool, default)
+
+    def get_list(self, path, default=None):
+        return self.get_typed(path, list, default)
+
+    def get_dict(self, path, default=None):
+        return self.get_typed(path, dict, default)
+
+
+def get_env_overrides():
+    """
+    Method Name :   get_env_overrides
+    Description :   This method gets the parameter overrides from the environment, PARAMS__S3_BUCKET__MODEL
+                    overrides s3_bucket.model and the values are parsed as yaml
+
+    Output      :   A sorted tuple of the override variables and values is returned
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = get_env_overrides.__name__
+
+    try:
+        overrides = tuple(
+            sorted((k, v) for k, v in environ.items() if k.startswith(ENV_PREFIX))
+        )
+
+        return overrides
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
+
+
+def apply_env_overrides(params, overrides):
+    """
+    Method Name :   apply_env_overrides
+    Description :   This method applies the environment overrides to the parsed parameters, the keys are
+                    matched case insensitive so PARAMS__KMEANS__RANDOM_STATE overrides KMeans.random_state
+
+    Output      :   The parameters with the overrides applied are returned
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = apply_env_overrides.__name__
+
+    try:
+        for var, value in overrides:
+            node = params
+
+            keys = var[len(ENV_PREFIX) :].split("__")
+
+            for i, name in enumerate(keys):
+                key = next(
+                    (k for k in node if str(k).lower() == name.lower()), name.lower()
+                )
+
+                if i == len(keys) - 1:
+                    node[key] = load(value, Loader=SafeLoader)
+
+                else:
+                    if not isinstance(node.get(key), dict):
+                        node[key] = {}
+
+                    node = node[key]
+
+        return params
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
+
+
+def read_params(config_path="params.yaml"):
+    """
+    Method Name :   read_params
+    Description :   This method reads the parameters from params.yaml file, the file is parsed once per process
+                    with the C yaml loader when available and parsed again only when its mtime changes,
+                    the environment overrides are applied on each parse, the cache is keyed by the absolute
+                    path so services sharing a process keep their own params
+
+    Output      :   An immutable config of the params.yaml file is returned
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = read_params.__name__
+
+    try:
+        config_path = abspath(config_path)
+
+        mtime = stat(config_path).st_mtime_ns
+
+        config = CONFIG_CACHE.get(config_path)
+
+        if config is None or config.mtime != mtime:
+            with open(config_path) as f:
+                params = load(f, Loader=SafeLoader) or {}
+
+            params = apply_env_overrides(params, get_env_overrides())
+
+            CONFIG_CACHE[config_path] = Config(params, mtime)
+
+        return CONFIG_CACHE[config_path]
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
+
+
+def get_log_dic(class_name, method_name, file, log_file):
+    """
+    Method Name :   get_log_dic
+    Description :   This method gets extra log params as dict
+    
+    Output      :   Parameters are read from the params.yaml file
+    On Failure  :   Write an exception log and then raise an exception
+    
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    _method_name = get_log_dic.__name__
+
+    try:
+        log_dic = {
+            "class_name": class_name,
+            "method_name": method_name,
+            "file": file,
+            "log_file": log_file,
+        }
+
+        return log_dic
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {_method_name}, Error : {str(e)}"
+        )
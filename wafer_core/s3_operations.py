@@ -0,0 +1,1019 @@
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from json import dumps, loads
+from os import listdir, remove
+from os.path import getsize, join
+
+from botocore.exceptions import ClientError
+from pandas import read_csv
+
+from wafer_core.bootstrap import get_s3_resource
+from wafer_core.frame_store import (
+    drop_frame,
+    frames_enabled,
+    get_frame,
+    get_frame_keys,
+    is_checkpoint,
+    move_frame,
+    put_frame,
+)
+from wafer_core.logger import App_Logger
+from wafer_core.metrics import add_count, bind_spans
+from wafer_core.read_params import get_log_dic, read_params
+
+
+class S3_Operation:
+    """
+    Description :   This class shall be used for all the s3 bucket operations of the services, buckets are given
+                    by their params.yaml key and files by their key in the bucket, the services subclass it
+                    to map their own file and folder keys
+    Version     :   1.2
+
+    Revisions   :   Moved to setup to cloud
+    """
+
+    def __init__(self, s3_resource=None):
+        self.log_writer = App_Logger()
+
+        self.s3_resource = get_s3_resource() if s3_resource is None else s3_resource
+
+        self.s3_client = self.s3_resource.meta.client
+
+        self.config = read_params()
+
+        self.bucket = self.config["s3_bucket"]
+
+        self.files = self.config.get("files", {})
+
+        self.dir = self.config.get("dir", {})
+
+        self.batch = self.config.get("s3_batch", {})
+
+    def read_object(self, object, log_file, decode=True, make_readable=False):
+        """
+        Method Name :   read_object
+        Description :   This method reads the object with kwargs
+
+        Output      :   A object is read with kwargs
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.read_object.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            body = object.get()["Body"].read()
+
+            add_count("s3_bytes_read", len(body))
+
+            func = lambda: body.decode() if decode is True else body
+
+            self.log_writer.log(
+                f"Read the s3 object with decode as {decode}", **log_dic
+            )
+
+            conv_func = lambda: StringIO(func()) if make_readable is True else func()
+
+            self.log_writer.log(
+                f"read the s3 object with make_readable as {make_readable}", **log_dic
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return conv_func()
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def read_text(self, fname, bucket, log_file):
+        """
+        Method Name :   read_text
+        Description :   This method reads the text data from s3 bucket
+
+        Output      :   Text data is read from s3 bucket
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.read_text.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            txt_obj = self.get_file_object(
+                self.files[fname], bucket, log_dic["log_file"]
+            )
+
+            content = self.read_object(txt_obj, log_dic["log_file"])
+
+            self.log_writer.log(
+                f"Read {fname} file as text from {bucket} bucket", **log_dic
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return content
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def read_json(self, fname, bucket, log_file):
+        """
+        Method Name :   read_json
+        Description :   This method reads the json data from s3 bucket
+
+        Output      :   Json data is read from s3 bucket
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.read_json.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            f_obj = self.get_file_object(self.files[fname], bucket, log_dic["log_file"])
+
+            json_content = self.read_object(f_obj, log_dic["log_file"])
+
+            dic = loads(json_content)
+
+            self.log_writer.log(f"Read {fname} from {bucket} bucket", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return dic
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def get_etag(self, fname, bucket, log_file):
+        """
+        Method Name :   get_etag
+        Description :   This method gets the etag of the file from s3 bucket without downloading the file
+
+        Output      :   The etag of the file is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.get_etag.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            response = self.s3_client.head_object(
+                Bucket=self.bucket[bucket], Key=self.files[fname]
+            )
+
+            etag = response["ETag"]
+
+            self.log_writer.log(
+                f"Got {etag} etag for {fname} file from {bucket} bucket", **log_dic
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return etag
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def get_df_from_object(self, object, log_file):
+        """
+        Method Name :   get_df_from_object
+        Description :   This method gets dataframe from object 
+
+        Output      :   Dataframe is read from the object
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.get_df_from_object.__name__,
+            __file__,
+            log_file,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            content = self.read_object(object, log_dic["log_file"], make_readable=True)
+
+            df = read_csv(content)
+
+            add_count("rows", len(df))
+
+            self.log_writer.log("Got the dataframe from object", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return df
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def read_csv(self, fname, bucket, log_file, pattern=False):
+        """
+        Method Name :   read_csv
+        Description :   This method reads the csv data from s3 bucket, or from memory when the file is kept in
+                        the frame store
+
+        Output      :   A dataframe of the csv file is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.read_csv.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            df = get_frame(self.bucket[bucket], fname, pattern=pattern)
+
+            if df is not None:
+                add_count("rows", len(df))
+
+                self.log_writer.log(
+                    f"Read {fname} csv file of {bucket} bucket from memory", **log_dic
+                )
+
+            else:
+                csv_obj = self.get_file_object(
+                    fname, bucket, log_dic["log_file"], pattern=pattern
+                )
+
+                df = self.get_df_from_object(csv_obj, log_dic["log_file"])
+
+                self.log_writer.log(
+                    f"Read {fname} csv file from {bucket} bucket", **log_dic
+                )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return df
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def read_csv_from_folder(self, folder_name, bucket, log_file, fnames=None):
+        """
+        Method Name :   read_csv_from_folder
+        Description :   This method reads the csv files from folder, only the given files of the folder when
+                        fnames is set, which is how a shard of a stage reads its files
+
+        Output      :   A list of tuple of dataframe, along with absolute file name and file name is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.read_csv_from_folder.__name__,
+            __file__,
+            log_file,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            files = self.get_files_from_folder(folder_name, bucket, log_dic["log_file"])
+
+            lst = [
+                (self.read_csv(f, bucket, log_dic["log_file"]), f, f.split("/")[-1])
+                for f in files
+                if f.endswith(".csv") and (fnames is None or f in fnames)
+            ]
+
+            self.log_writer.log(
+                f"Read {len(lst)} csv files from {folder_name} folder from {bucket} bucket",
+                **log_dic,
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return lst
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def create_folder(self, folder_name, bucket, log_file):
+        """
+        Method Name :   create_folder
+        Description :   This method creates a folder in s3 bucket
+
+        Output      :   A folder is created in s3 bucket 
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.create_folder.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            self.s3_resource.Object(self.bucket[bucket], self.dir[folder_name]).load()
+
+            self.log_writer.log(f"Folder {folder_name} already exists.", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "404":
+                self.log_writer.log(
+                    f"{folder_name} folder does not exist,creating new one", **log_dic
+                )
+
+                folder_obj = self.dir[folder_name] + "/"
+
+                self.s3_client.put_object(Bucket=self.bucket[bucket], Key=folder_obj)
+
+                self.log_writer.log(
+                    f"{folder_name} folder created in {bucket} bucket", **log_dic
+                )
+
+            else:
+                self.log_writer.log(
+                    f"Error occured in creating {folder_name} folder", **log_dic
+                )
+
+                self.log_writer.exception_log(e, **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def upload_file(self, from_fname, to_fname, bucket, log_file, delete=True):
+        """
+        Method Name :   upload_file
+        Description :   This method uploades a file to s3 bucket with kwargs
+
+        Output      :   A file is uploaded to s3 bucket
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.upload_file.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            self.log_writer.log(
+                f"Uploading {from_fname} to s3 bucket {bucket}", **log_dic
+            )
+
+            self.s3_client.upload_file(from_fname, self.bucket[bucket], to_fname)
+
+            add_count("s3_bytes_written", getsize(from_fname))
+
+            self.log_writer.log(
+                f"Uploaded {from_fname} to s3 bucket {bucket}", **log_dic
+            )
+
+            del_func = lambda file: remove(file) if delete is True else None
+
+            del_func(from_fname)
+
+            self.log_writer.log(f"Delete was set to {delete}", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def download_file(self, fname, bucket, local_fname, log_file):
+        """
+        Method Name :   download_file
+        Description :   This method downloads a file from s3 bucket to the local file
+
+        Output      :   The file is downloaded from s3 bucket to the local file
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.download_file.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            self.s3_client.download_file(self.bucket[bucket], fname, local_fname)
+
+            add_count("s3_bytes_read", getsize(local_fname))
+
+            self.log_writer.log(
+                f"Downloaded {fname} from s3 bucket {bucket} to {local_fname}",
+                **log_dic,
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def get_bucket(self, bucket, log_file):
+        """
+        Method Name :   get_bucket
+        Description :   This method gets the bucket from s3 
+
+        Output      :   A s3 bucket name is returned based on the bucket
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.get_bucket.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            bucket = self.s3_resource.Bucket(self.bucket[bucket])
+
+            self.log_writer.log(f"Got {bucket} bucket", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return bucket
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def copy_data(self, from_fname, from_bucket, to_fname, to_bucket, log_file):
+        """
+        Method Name :   copy_data
+        Description :   This method copies the data from one bucket to another bucket
+
+        Output      :   The data is copied from one bucket to another
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.copy_data.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            copy_source = {"Bucket": self.bucket[from_bucket], "Key": from_fname}
+
+            self.s3_client.copy(copy_source, self.bucket[to_bucket], to_fname)
+
+            self.log_writer.log(
+                f"Copied data from bucket {from_bucket} to bucket {to_bucket}",
+                **log_dic,
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def delete_file(self, fname, bucket, log_file):
+        """
+        Method Name :   delete_file
+        Description :   This method delete the file from s3 bucket
+
+        Output      :   The file is deleted from s3 bucket
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.delete_file.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            self.s3_resource.Object(self.bucket[bucket], fname).delete()
+
+            drop_frame(self.bucket[bucket], fname)
+
+            self.log_writer.log(f"Deleted {fname} from bucket {bucket}", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def move_data(self, from_fname, from_bucket, to_fname, to_bucket, log_file):
+        """
+        Method Name :   move_data
+        Description :   This method moves the data from one bucket to other bucket
+
+        Output      :   The data is moved from one bucket to another
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.move_data.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            self.copy_data(
+                from_fname, from_bucket, to_fname, to_bucket, log_dic["log_file"]
+            )
+
+            self.delete_file(from_fname, from_bucket, log_dic["log_file"])
+
+            self.log_writer.log(
+                f"Moved {from_fname} from bucket {from_bucket} to {to_bucket}",
+                **log_dic,
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def copy_files(self, copies, from_bucket, to_bucket, log_file):
+        """
+        Method Name :   copy_files
+        Description :   This method copies a list of files from one bucket to another bucket concurrently using 
+                        server side copy, failed copies are retried, files kept in the frame store are copied
+                        in memory as well
+
+        Output      :   A dict with copied files and failed files along with the error is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.copy_files.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            copied, failed, pending = [], {}, list(copies)
+
+            for attempt in range(1, self.batch["max_retries"] + 1):
+                if not pending:
+                    break
+
+                with ThreadPoolExecutor(self.batch["max_workers"]) as executor:
+                    futures = {
+                        executor.submit(
+                            bind_spans(self.s3_client.copy_object),
+                            CopySource={
+                                "Bucket": self.bucket[from_bucket],
+                                "Key": from_fname,
+                            },
+                            Bucket=self.bucket[to_bucket],
+                            Key=to_fname,
+                        ): (from_fname, to_fname)
+                        for from_fname, to_fname in pending
+                    }
+
+                pending, failed = [], {}
+
+                for future, (from_fname, to_fname) in futures.items():
+                    if future.exception() is None:
+                        copied.append((from_fname, to_fname))
+
+                    else:
+                        pending.append((from_fname, to_fname))
+
+                        failed[from_fname] = str(future.exception())
+
+                self.log_writer.log(
+                    f"Attempt {attempt} copied {len(futures) - len(pending)} files, {len(pending)} files failed",
+                    **log_dic,
+                )
+
+            for from_fname, to_fname in copies:
+                in_memory = move_frame(
+                    self.bucket[from_bucket],
+                    from_fname,
+                    self.bucket[to_bucket],
+                    to_fname,
+                    copy=True,
+                )
+
+                if in_memory is True and from_fname in failed:
+                    del failed[from_fname]
+
+                    copied.append((from_fname, to_fname))
+
+            self.log_writer.log(
+                f"Copied {len(copied)} files from bucket {from_bucket} to bucket {to_bucket}",
+                **log_dic,
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return {"copied": copied, "failed": failed}
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def delete_files(self, fnames, bucket, log_file):
+        """
+        Method Name :   delete_files
+        Description :   This method deletes a list of files from s3 bucket using multi object delete requests 
+                        of up to 1000 keys, failed deletes are retried, files kept in the frame store are
+                        dropped as well
+
+        Output      :   A dict with deleted files and failed files along with the error is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.delete_files.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            size = self.batch["delete_batch_size"]
+
+            failed, pending = {}, list(fnames)
+
+            for attempt in range(1, self.batch["max_retries"] + 1):
+                if not pending:
+                    break
+
+                failed = {}
+
+                for i in range(0, len(pending), size):
+                    response = self.s3_client.delete_objects(
+                        Bucket=self.bucket[bucket],
+                        Delete={
+                            "Objects": [{"Key": f} for f in pending[i : i + size]],
+                            "Quiet": True,
+                        },
+                    )
+
+                    failed.update(
+                        {
+                            err["Key"]: err["Message"]
+                            for err in response.get("Errors", [])
+                        }
+                    )
+
+                pending = list(failed)
+
+                self.log_writer.log(
+                    f"Attempt {attempt} of deleting files from bucket {bucket}, {len(pending)} files failed",
+                    **log_dic,
+                )
+
+            for f in fnames:
+                drop_frame(self.bucket[bucket], f)
+
+            deleted = [f for f in fnames if f not in failed]
+
+            self.log_writer.log(
+                f"Deleted {len(deleted)} files from bucket {bucket}", **log_dic
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return {"deleted": deleted, "failed": failed}
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def move_files(self, moves, from_bucket, to_bucket, log_file):
+        """
+        Method Name :   move_files
+        Description :   This method moves a list of files from one bucket to other bucket, copies are done 
+                        concurrently and the source files are deleted in batches
+
+        Output      :   A dict with moved files and failed files along with the error is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.move_files.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            copy_result = self.copy_files(
+                moves, from_bucket, to_bucket, log_dic["log_file"]
+            )
+
+            delete_result = self.delete_files(
+                [from_fname for from_fname, _ in copy_result["copied"]],
+                from_bucket,
+                log_dic["log_file"],
+            )
+
+            moved = [
+                (from_fname, to_fname)
+                for from_fname, to_fname in copy_result["copied"]
+                if from_fname not in delete_result["failed"]
+            ]
+
+            failed = {**copy_result["failed"], **delete_result["failed"]}
+
+            self.log_writer.log(
+                f"Moved {len(moved)} files from bucket {from_bucket} to {to_bucket}, {len(failed)} files failed",
+                **log_dic,
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return {"moved": moved, "failed": failed}
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def get_files_from_folder(self, folder_name, bucket, log_file, pattern=False):
+        """
+        Method Name :   get_files_from_folder
+        Description :   This method gets the files a folder in s3 bucket, along with the files of the folder
+                        kept in the frame store
+
+        Output      :   A list of files is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.get_files_from_folder.__name__,
+            __file__,
+            log_file,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            lst = self.get_file_object(
+                folder_name, bucket, log_dic["log_file"], pattern=pattern
+            )
+
+            lst = lst if isinstance(lst, list) else [lst]
+
+            list_of_files = [object.key for object in lst]
+
+            list_of_files += [
+                f
+                for f in get_frame_keys(self.bucket[bucket], folder_name, pattern)
+                if f not in list_of_files
+            ]
+
+            self.log_writer.log(f"Got list of files from bucket {bucket}", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return list_of_files
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def get_objects_from_folder(self, folder_name, bucket, log_file):
+        """
+        Method Name :   get_objects_from_folder
+        Description :   This method lists the files of a folder in s3 bucket along with their etag and last
+                        modified time, without reading the files
+
+        Output      :   A dict of file to its etag and last modified time is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.get_objects_from_folder.__name__,
+            __file__,
+            log_file,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            paginator = self.s3_client.get_paginator("list_objects_v2")
+
+            pages = paginator.paginate(Bucket=self.bucket[bucket], Prefix=folder_name)
+
+            objects = {
+                obj["Key"]: {
+                    "etag": obj["ETag"].strip('"'),
+                    "last_modified": obj["LastModified"].isoformat(),
+                }
+                for page in pages
+                for obj in page.get("Contents", [])
+            }
+
+            self.log_writer.log(
+                f"Got {len(objects)} objects of {folder_name} folder from {bucket} bucket",
+                **log_dic,
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return objects
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def get_file_object(self, fname, bucket, log_file, pattern=False):
+        """
+        Method Name :   get_file_object
+        Description :   This method gets the file object from s3 bucket, with pattern the file name is matched
+                        anywhere in the key instead of as a prefix
+
+        Output      :   A file object is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.get_file_object.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            bucket = self.get_bucket(bucket, log_dic["log_file"])
+
+            if pattern is False:
+                lst_objs = [object for object in bucket.objects.filter(Prefix=fname)]
+
+            else:
+                lst_objs = [
+                    object for object in bucket.objects.all() if fname in object.key
+                ]
+
+            self.log_writer.log(f"Got {fname} from bucket {bucket}", **log_dic)
+
+            func = lambda x: x[0] if len(x) == 1 else x
+
+            file_objs = func(lst_objs)
+
+            self.log_writer.log(f"Got the file object from bucket {bucket}", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return file_objs
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def upload_df_as_csv(self, data_frame, local_fname, bucket_fname, bucket, log_file):
+        """
+        Method Name :   upload_df_as_csv
+        Description :   This method uploades a dataframe as csv file to s3 bucket, when the frame store is
+                        enabled the dataframe is kept in memory and only uploaded if the file is a checkpoint
+
+        Output      :   A dataframe is uploaded as csv file to s3 bucket
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.upload_df_as_csv.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            add_count("rows", len(data_frame))
+
+            if frames_enabled() is True:
+                put_frame(self.bucket[bucket], bucket_fname, data_frame)
+
+                self.log_writer.log(
+                    f"Kept dataframe in memory as {bucket_fname} file of {bucket} bucket",
+                    **log_dic,
+                )
+
+            if is_checkpoint(bucket, bucket_fname) is True:
+                data_frame.to_csv(local_fname, index=None, header=True)
+
+                self.log_writer.log(
+                    f"Created a local copy of dataframe with name {local_fname}",
+                    **log_dic,
+                )
+
+                self.upload_file(local_fname, bucket_fname, bucket, log_dic["log_file"])
+
+                self.log_writer.log(
+                    f"Uploaded dataframe as csv to {bucket} as {bucket_fname} file",
+                    **log_dic,
+                )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def upload_json(self, dic, fname, bucket, log_file):
+        """
+        Method Name :   upload_json
+        Description :   This method uploades a dictionary as json file to s3 bucket
+
+        Output      :   A dictionary is uploaded as json file to s3 bucket
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.upload_json.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            body = dumps(dic)
+
+            self.s3_client.put_object(Bucket=self.bucket[bucket], Key=fname, Body=body)
+
+            add_count("s3_bytes_written", len(body))
+
+            self.log_writer.log(
+                f"Uploaded {fname} json file to {bucket} bucket", **log_dic
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def upload_folder(self, folder, bucket, log_file):
+        """
+        Method Name :   upload_folder
+        Description :   This method uploades the folder to s3 bucket
+
+        Output      :   The files of the folder are uploaded to s3 bucket
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.upload_folder.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            lst = listdir(folder)
+
+            self.log_writer.log("Got a list of files from folder", **log_dic)
+
+            for f in lst:
+                local_f = join(folder, f)
+
+                dest_f = folder + "/" + f
+
+                self.upload_file(
+                    local_f, dest_f, bucket, log_dic["log_file"], delete=False
+                )
+
+            self.log_writer.log("Uploaded folder to s3 bucket", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
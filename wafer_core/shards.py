@@ -0,0 +1,142 @@
+from wafer_core.read_params import read_params
+from wafer_core.stage_cache import Stage_Cache
+
+MODES = ["batch", "plan", "shard", "reduce"]
+
+
+def get_mode(event):
+    """
+    Method Name :   get_mode
+    Description :   This method gets the mode the stage is invoked in from the event, batch runs the whole stage,
+                    plan gets the shards of the stage, shard runs the stage on the keys of one shard and reduce
+                    finishes the stage after all the shards are run
+
+    Output      :   The mode of the event is returned, batch when the event has no mode
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = get_mode.__name__
+
+    try:
+        mode = event.get("mode", "batch")
+
+        if mode not in MODES:
+            raise Exception(f"{mode} is not one of {MODES} modes")
+
+        return mode
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
+
+
+def get_shards(keys, shard_size):
+    """
+    Method Name :   get_shards
+    Description :   This method splits the keys of a stage, files or clusters, into shards of shard size keys
+
+    Output      :   A list of shards is returned, each shard is a list of keys
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = get_shards.__name__
+
+    try:
+        keys = list(keys)
+
+        return [keys[i : i + shard_size] for i in range(0, len(keys), shard_size)]
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
+
+
+def run_shard_mode(run, mode, event):
+    """
+    Method Name :   run_shard_mode
+    Description :   This method runs the plan, shard or reduce mode of a stage with the plan_shards, run_shard and
+                    reduce_shards methods of its run class, the shard size is taken from the event or from the
+                    shards section of params.yaml
+
+    Output      :   A dict of the shards for plan mode, of the keys for shard mode and empty for reduce mode is
+                    returned, which the step function or the local executor passes on
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = run_shard_mode.__name__
+
+    try:
+        if mode == "plan":
+            shard_size = event.get("shard_size", read_params()["shards"]["shard_size"])
+
+            return {"shards": get_shards(run.plan_shards(), shard_size)}
+
+        if mode == "shard":
+            run.run_shard(event["keys"])
+
+            return {"keys": event["keys"]}
+
+        if mode == "reduce":
+            run.reduce_shards()
+
+            return {}
+
+        raise Exception(f"{mode} mode is not a shard mode")
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
+
+
+def run_cached_shard_mode(run_class, mode, event):
+    """
+    Method Name :   run_cached_shard_mode
+    Description :   This method runs the plan, shard or reduce mode of a stage which has a stage cache, plan mode
+                    plans no shards when the stage is cached and otherwise passes the fingerprint and start time
+                    of the stage in stage_cache of its result, which reduce mode gets in its event to record the
+                    outputs of all the shards and the latest fingerprint of the stage for the stages after it
+
+    Output      :   The result of run_shard_mode is returned, with the stage cache state for plan mode
+    On Failure  :   Write an exception log and then raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    method_name = run_cached_shard_mode.__name__
+
+    try:
+        if mode == "plan":
+            cache = Stage_Cache(event)
+
+            if cache.is_cached() is True:
+                return {"shards": [], "stage_cache": {"cached": True}}
+
+            result = run_shard_mode(run_class(), mode, event)
+
+            return {**result, "stage_cache": cache.get_state()}
+
+        if mode == "reduce":
+            if event.get("stage_cache", {}).get("cached") is True:
+                return {}
+
+            result = run_shard_mode(run_class(), mode, event)
+
+            Stage_Cache(event).record()
+
+            return result
+
+        return run_shard_mode(run_class(), mode, event)
+
+    except Exception as e:
+        raise Exception(
+            f"Exception occured in {__file__}, Method : {method_name}, Error : {str(e)}"
+        )
@@ -0,0 +1,512 @@
+from datetime import datetime, timedelta, timezone
+from hashlib import sha256
+from json import dumps, loads
+from os import environ, getcwd, walk
+from os.path import abspath, dirname, join
+
+from wafer_core.bootstrap import get_current_date
+from wafer_core.frame_store import frames_enabled
+from wafer_core.logger import App_Logger
+from wafer_core.read_params import ENV_PREFIX, get_log_dic, read_params
+from wafer_core.s3_operations import S3_Operation
+
+
+class Stage_Cache:
+    """
+    Description :   This class shall be used for skipping a stage whose inputs did not change since it last ran,
+                    the fingerprint of the stage is the hash of its input objects, the fingerprints of its
+                    upstream stages, its params.yaml and its code, and the outputs the stage wrote for a
+                    fingerprint are recorded in a cache manifest in the logs bucket
+    Version     :   1.2
+
+    Revisions   :   Moved to setup to cloud
+    """
+
+    def __init__(self, event=None):
+        self.config = read_params()
+
+        self.cache_config = self.config["stage_cache"]
+
+        self.stage = self.config["metrics"]["service"]
+
+        self.s3 = S3_Operation()
+
+        self.log_writer = App_Logger()
+
+        self.event = {} if event is None else event
+
+        self.force = self.event.get("force", self.cache_config["force"]) is True
+
+        self.prefix = self.cache_config["prefix"]
+
+        ## the reduce mode of a sharded stage gets the fingerprint and start time from the plan mode
+        state = self.event.get("stage_cache", {})
+
+        self.started_at = (
+            datetime.fromisoformat(state["started_at"])
+            if "started_at" in state
+            else datetime.now(timezone.utc)
+        )
+
+        self.fingerprint = state.get("fingerprint")
+
+    @property
+    def current_date(self):
+        return get_current_date()
+
+    def get_cache_key(self, stage, name):
+        """
+        Method Name :   get_cache_key
+        Description :   This method gets the key of a json file of the stage cache in logs bucket
+
+        Output      :   The key of the json file is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        return self.prefix + "/" + stage + "/" + name + ".json"
+
+    def read_cache_json(self, key):
+        """
+        Method Name :   read_cache_json
+        Description :   This method reads a json file of the stage cache from logs bucket
+
+        Output      :   The dict of the json file is returned, None if the file does not exist
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        s3_client = self.s3.s3_client
+
+        try:
+            response = s3_client.get_object(Bucket=self.s3.bucket["logs"], Key=key)
+
+            return loads(response["Body"].read())
+
+        except s3_client.exceptions.NoSuchKey:
+            return None
+
+    def get_objects(self, locations, log_file):
+        """
+        Method Name :   get_objects
+        Description :   This method lists the objects of the locations, a location is the params.yaml key of the
+                        bucket followed by the prefix of the objects
+
+        Output      :   A list of dicts of bucket, key, etag and last modified time of the objects is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.get_objects.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            paginator = self.s3.s3_client.get_paginator("list_objects_v2")
+
+            objects = []
+
+            for location in locations:
+                bucket, _, prefix = location.partition("/")
+
+                pages = paginator.paginate(Bucket=self.s3.bucket[bucket], Prefix=prefix)
+
+                objects += [
+                    {
+                        "bucket": bucket,
+                        "key": obj["Key"],
+                        "etag": obj["ETag"].strip('"'),
+                        "last_modified": obj["LastModified"],
+                    }
+                    for page in pages
+                    for obj in page.get("Contents", [])
+                ]
+
+            self.log_writer.log(
+                f"Got {len(objects)} objects from {len(locations)} locations", **log_dic
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return sorted(objects, key=lambda obj: (obj["bucket"], obj["key"]))
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def get_code_version(self):
+        """
+        Method Name :   get_code_version
+        Description :   This method gets the version of the code of the stage, the CODE_VERSION environment
+                        variable when the build sets it, otherwise the hash of the python files of the service
+                        and of wafer_core
+
+        Output      :   The code version is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        if "CODE_VERSION" in environ:
+            return environ["CODE_VERSION"]
+
+        code_hash = sha256()
+
+        folders = sorted({abspath(getcwd()), dirname(abspath(__file__))})
+
+        for folder in folders:
+            for root, dirs, files in walk(folder):
+                dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+
+                for f in sorted(f for f in files if f.endswith(".py")):
+                    with open(join(root, f), "rb") as code:
+                        code_hash.update(code.read())
+
+        return code_hash.hexdigest()
+
+    def get_params_hash(self):
+        """
+        Method Name :   get_params_hash
+        Description :   This method gets the hash of params.yaml along with the environment overrides of the
+                        params, overrides of the stage_cache section do not change the hash
+
+        Output      :   The hash of the params is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        params_hash = sha256()
+
+        with open("params.yaml", "rb") as f:
+            params_hash.update(f.read())
+
+        overrides = sorted(
+            (k, v)
+            for k, v in environ.items()
+            if k.startswith(ENV_PREFIX)
+            and not k.startswith(ENV_PREFIX + "STAGE_CACHE__")
+        )
+
+        params_hash.update(dumps(overrides).encode())
+
+        return params_hash.hexdigest()
+
+    def get_fingerprint(self, log_file):
+        """
+        Method Name :   get_fingerprint
+        Description :   This method gets the fingerprint of the stage from the etags of its inputs, the latest
+                        fingerprints of its upstream stages, its params and its code version, so a change
+                        anywhere upstream changes the fingerprint of every stage after it
+
+        Output      :   The fingerprint of the stage is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.get_fingerprint.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            inputs = self.get_objects(self.cache_config["inputs"], log_dic["log_file"])
+
+            upstream = {}
+
+            for stage in self.cache_config["upstream"]:
+                latest = self.read_cache_json(self.get_cache_key(stage, "latest"))
+
+                upstream[stage] = None if latest is None else latest["fingerprint"]
+
+            fingerprint = sha256(
+                dumps(
+                    {
+                        "stage": self.stage,
+                        "params": self.get_params_hash(),
+                        "code": self.get_code_version(),
+                        "upstream": upstream,
+                        "inputs": [
+                            [obj["bucket"], obj["key"], obj["etag"]] for obj in inputs
+                        ],
+                    }
+                ).encode()
+            ).hexdigest()
+
+            self.log_writer.log(
+                f"Got {fingerprint} fingerprint for {self.stage} stage", **log_dic
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return fingerprint
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def restore_dated_outputs(self, manifest, objects, log_file):
+        """
+        Method Name :   restore_dated_outputs
+        Description :   This method copies the cached outputs whose key has the date of the cached run to the key
+                        with the current date, since the next stages read files of the current date
+
+        Output      :   The dated outputs are copied to the current date in s3 bucket
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.restore_dated_outputs.__name__,
+            __file__,
+            log_file,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            existing = {(obj["bucket"], obj["key"]) for obj in objects}
+
+            copies = [
+                (
+                    out["bucket"],
+                    out["key"],
+                    out["key"].replace(manifest["date"], self.current_date),
+                )
+                for out in manifest["outputs"]
+                if manifest["date"] != self.current_date
+                and manifest["date"] in out["key"]
+            ]
+
+            copies = [c for c in copies if (c[0], c[2]) not in existing]
+
+            for bucket, from_key, to_key in copies:
+                self.s3.s3_client.copy_object(
+                    CopySource={"Bucket": self.s3.bucket[bucket], "Key": from_key},
+                    Bucket=self.s3.bucket[bucket],
+                    Key=to_key,
+                )
+
+            self.log_writer.log(
+                f"Restored {len(copies)} outputs of {manifest['date']} to {self.current_date}",
+                **log_dic,
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def is_cached(self):
+        """
+        Method Name :   is_cached
+        Description :   This method checks if the outputs of the stage exist for its fingerprint, a stage is cached
+                        when a cache manifest was recorded for the fingerprint and every output it lists still
+                        has the recorded etag, forced stages and stages of a fused pipeline are never cached
+
+        Output      :   True if the stage can be skipped, False otherwise
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.is_cached.__name__, __file__, "stage_cache"
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            if self.cache_config["enabled"] is False or frames_enabled() is True:
+                self.log_writer.log(
+                    "Stage cache is disabled or the stage is run in a fused pipeline",
+                    **log_dic,
+                )
+
+                self.log_writer.start_log("exit", **log_dic)
+
+                return False
+
+            self.fingerprint = self.get_fingerprint(log_dic["log_file"])
+
+            manifest = self.read_cache_json(
+                self.get_cache_key(self.stage, self.fingerprint)
+            )
+
+            cached = False
+
+            if self.force is True:
+                self.log_writer.log(f"Forced rerun of {self.stage} stage", **log_dic)
+
+            elif manifest is None:
+                self.log_writer.log(
+                    f"No cached outputs of {self.stage} stage for the fingerprint",
+                    **log_dic,
+                )
+
+            else:
+                objects = self.get_objects(
+                    self.cache_config["outputs"], log_dic["log_file"]
+                )
+
+                etags = {(obj["bucket"], obj["key"]): obj["etag"] for obj in objects}
+
+                missing = [
+                    out["key"]
+                    for out in manifest["outputs"]
+                    if etags.get((out["bucket"], out["key"])) != out["etag"]
+                ]
+
+                if missing:
+                    self.log_writer.log(
+                        f"{len(missing)} cached outputs of {self.stage} stage are missing or changed",
+                        **log_dic,
+                    )
+
+                else:
+                    self.restore_dated_outputs(manifest, objects, log_dic["log_file"])
+
+                    self.write_latest(log_dic["log_file"])
+
+                    cached = True
+
+                    self.log_writer.log(
+                        f"Skipping {self.stage} stage, outputs of {manifest['created_at']} run are cached",
+                        **log_dic,
+                    )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return cached
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def get_state(self):
+        """
+        Method Name :   get_state
+        Description :   This method gets the fingerprint and the start time of the stage, which the plan mode of
+                        a sharded stage passes to its reduce mode so the outputs of all the shards are recorded
+                        for the fingerprint computed before they ran
+
+        Output      :   A dict of the fingerprint and the start time of the stage is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        return {
+            "fingerprint": self.fingerprint,
+            "started_at": self.started_at.isoformat(),
+        }
+
+    def write_latest(self, log_file):
+        """
+        Method Name :   write_latest
+        Description :   This method writes the fingerprint of the stage as its latest fingerprint, which is read
+                        by the stages after it
+
+        Output      :   The latest fingerprint of the stage is written to logs bucket
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        self.s3.upload_json(
+            {"fingerprint": self.fingerprint, "updated_at": datetime.now().isoformat()},
+            self.get_cache_key(self.stage, "latest"),
+            "logs",
+            log_file,
+        )
+
+    def record(self):
+        """
+        Method Name :   record
+        Description :   This method records the outputs the stage wrote during this run in the cache manifest of
+                        its fingerprint, and deletes the cache manifests of the stage older than the retention
+
+        Output      :   The cache manifest is written to logs bucket
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.record.__name__, __file__, "stage_cache"
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            if self.fingerprint is None:
+                self.log_writer.log(
+                    "Stage cache is disabled or no fingerprint was computed for the stage",
+                    **log_dic,
+                )
+
+                self.log_writer.start_log("exit", **log_dic)
+
+                return
+
+            skew = timedelta(seconds=self.cache_config["clock_skew_s"])
+
+            outputs = [
+                {"bucket": obj["bucket"], "key": obj["key"], "etag": obj["etag"]}
+                for obj in self.get_objects(
+                    self.cache_config["outputs"], log_dic["log_file"]
+                )
+                if obj["last_modified"] >= self.started_at - skew
+            ]
+
+            manifest = {
+                "stage": self.stage,
+                "fingerprint": self.fingerprint,
+                "date": self.current_date,
+                "created_at": datetime.now().isoformat(),
+                "outputs": outputs,
+            }
+
+            self.s3.upload_json(
+                manifest,
+                self.get_cache_key(self.stage, self.fingerprint),
+                "logs",
+                log_dic["log_file"],
+            )
+
+            self.write_latest(log_dic["log_file"])
+
+            self.log_writer.log(
+                f"Recorded {len(outputs)} outputs of {self.stage} stage", **log_dic
+            )
+
+            retention = timedelta(days=self.cache_config["retention_days"])
+
+            expired = [
+                obj["key"]
+                for obj in self.get_objects(
+                    ["logs/" + self.prefix + "/" + self.stage + "/"],
+                    log_dic["log_file"],
+                )
+                if obj["last_modified"] < self.started_at - retention
+                and obj["key"] != self.get_cache_key(self.stage, "latest")
+            ]
+
+            for key in expired:
+                self.s3.delete_file(key, "logs", log_dic["log_file"])
+
+            self.log_writer.log(
+                f"Deleted {len(expired)} cache manifests older than {retention.days} days",
+                **log_dic,
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)